@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class AggregateFunction(Enum):
+    COUNT = 'COUNT'
+    SUM = 'SUM'
+    MIN = 'MIN'
+    MAX = 'MAX'
+    MEAN = 'MEAN'
+    DISTINCT = 'DISTINCT'
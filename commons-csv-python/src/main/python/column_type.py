@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class ColumnType(Enum):
+    BOOL = 'BOOL'
+    INT = 'INT'
+    FLOAT = 'FLOAT'
+    DATE = 'DATE'
+    STRING = 'STRING'
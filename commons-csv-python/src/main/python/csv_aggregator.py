@@ -0,0 +1,337 @@
+import os
+from datetime import date, datetime
+from main.python.aggregate_function import AggregateFunction
+from main.python.closeable import Closeable
+from main.python.column_type import ColumnType
+from main.python.csv_record import CSVRecord
+from main.python.hash_partitions import HashPartitions
+from main.python.pretty_list import PrettyList
+
+
+class Aggregate:
+    NUMERIC = {AggregateFunction.SUM, AggregateFunction.MEAN}
+
+    def __init__(self, function, column=None, type=None, name=None):
+        """
+        An aggregate computed per group.
+
+        Null and missing values are ignored. Values are converted to type
+        before they are aggregated; if no type is given, SUM and MEAN read
+        numbers and the other functions compare strings.
+
+        :param function: The AggregateFunction.
+        :param column: The name or 0-based index of the aggregated column.
+            If None, COUNT counts records.
+        :param type: The ColumnType of the column, may be None.
+        :param name: The name of the result column, derived from the
+            function and column if None.
+        :raises ValueError: If column is None for another function than
+            COUNT.
+        """
+        if column is None and function is not AggregateFunction.COUNT:
+            raise ValueError(f"{function.value} requires a column")
+        self.function = function
+        self.column = column
+        self.type = type
+        if name is None:
+            name = function.value.lower() if column is None \
+                else f"{function.value.lower()}_{column}"
+        self.name = name
+
+    def _convert(self, value, record_number):
+        type = self.type
+        try:
+            if type is None:
+                if self.function not in Aggregate.NUMERIC:
+                    return value
+                try:
+                    return int(value)
+                except ValueError:
+                    return float(value)
+            if type is ColumnType.STRING:
+                return value
+            if type is ColumnType.INT:
+                return int(value)
+            if type is ColumnType.FLOAT:
+                return float(value)
+            if type is ColumnType.DATE:
+                return datetime.fromisoformat(value)
+            lower = value.lower()
+            if lower in ("true", "false"):
+                return lower == "true"
+        except ValueError:
+            pass
+        raise ValueError(f"Value {value!r} of column {self.column} in record "
+                         f"{record_number} is not a {(type or ColumnType.FLOAT).value}")
+
+    def __repr__(self):
+        return f"Aggregate [function={self.function}, column={self.column}, name={self.name}]"
+
+
+def _initial(function):
+    if function is AggregateFunction.COUNT:
+        return 0
+    if function is AggregateFunction.MEAN:
+        return [0, 0]
+    if function is AggregateFunction.DISTINCT:
+        return set()
+    return None
+
+
+def _merge(function, state, other):
+    if function is AggregateFunction.COUNT:
+        return state + other
+    if function is AggregateFunction.MEAN:
+        return [state[0] + other[0], state[1] + other[1]]
+    if function is AggregateFunction.DISTINCT:
+        state |= other
+        return state
+    if state is None:
+        return other
+    if other is None:
+        return state
+    if function is AggregateFunction.SUM:
+        return state + other
+    if function is AggregateFunction.MIN:
+        return other if other < state else state
+    return other if other > state else state
+
+
+def _format(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class CSVAggregator(Closeable):
+    def __init__(self, group_by, aggregates, max_groups=100000, partitions=16,
+                 temp_dir=None):
+        """
+        Groups records by columns and aggregates other columns in one pass.
+
+        Groups are kept in a hash table. When it holds more than max_groups
+        groups, the partial aggregates are written to partition files by the
+        hash of their group and the table is cleared. At the end every
+        partition is read back and its partial aggregates are merged. A
+        partition that still holds more than max_groups groups is split
+        again with a different hash, so memory stays bounded by max_groups.
+
+        Groups come out in the order they first appeared, unless groups were
+        spilled; they then come out partition by partition.
+
+        :param group_by: The names or 0-based indexes of the grouping
+            columns, may be empty to aggregate all records.
+        :param aggregates: The Aggregates to compute.
+        :param max_groups: The number of groups kept in memory.
+        :param partitions: The number of partition files when spilling.
+        :param temp_dir: The directory of the partition files, the system
+            default if None.
+        :raises ValueError: If no aggregates are given or max_groups or
+            partitions is not positive.
+        """
+        if not aggregates:
+            raise ValueError("aggregates must not be empty")
+        if max_groups < 1 or partitions < 1:
+            raise ValueError("max_groups and partitions must be positive")
+        self.group_by = list(group_by)
+        self.aggregates = list(aggregates)
+        self.max_groups = max_groups
+        self.partitions = partitions
+        self.temp_dir = temp_dir
+        self.groups = {}
+        self.spilled = None
+        self.spill_count = 0
+        self.group_indexes = None
+        self.aggregate_indexes = None
+        self.functions = [aggregate.function for aggregate in self.aggregates]
+
+    @staticmethod
+    def aggregate(parser, group_by, aggregates, **options):
+        """
+        Aggregates the remaining records of a parser.
+
+        :param parser: The CSVParser.
+        :param group_by: The grouping columns, see CSVAggregator.
+        :param aggregates: The Aggregates to compute.
+        :param options: Further CSVAggregator arguments.
+        :return: A generator over one CSVRecord per group.
+        :raises IOError: On parse error or input read-failure.
+        """
+        aggregator = CSVAggregator(group_by, aggregates, **options)
+        for record in parser:
+            aggregator.add(record)
+        return aggregator.records()
+
+    @staticmethod
+    def _resolve(column, mapping):
+        if isinstance(column, str):
+            if mapping is None or column not in mapping:
+                raise ValueError(f"Mapping for {column} not found")
+            return mapping[column]
+        return column
+
+    def get_header(self):
+        """
+        :return: The names of the result columns, the grouping columns
+            followed by the aggregates.
+        """
+        return [str(column) for column in self.group_by] + \
+            [aggregate.name for aggregate in self.aggregates]
+
+    def add(self, record):
+        """
+        Adds a record to its group.
+
+        :param record: The CSVRecord.
+        :raises ValueError: If a column is not in the header map or a value
+            does not convert to the type of its aggregate.
+        """
+        if self.group_indexes is None:
+            mapping = record.mapping
+            self.group_indexes = [CSVAggregator._resolve(column, mapping)
+                                  for column in self.group_by]
+            self.aggregate_indexes = [
+                None if aggregate.column is None
+                else CSVAggregator._resolve(aggregate.column, mapping)
+                for aggregate in self.aggregates
+            ]
+        values = record._values
+        length = len(values)
+        key = tuple(values[i] if i < length else None for i in self.group_indexes)
+        states = self.groups.get(key)
+        if states is None:
+            if len(self.groups) >= self.max_groups:
+                self._spill()
+            states = self.groups[key] = [_initial(f) for f in self.functions]
+
+        for i, (aggregate, index) in enumerate(zip(self.aggregates, self.aggregate_indexes)):
+            function = aggregate.function
+            if index is None:
+                states[i] += 1
+                continue
+            value = values[index] if index < length else None
+            if value is None:
+                continue
+            if function is AggregateFunction.COUNT:
+                states[i] += 1
+                continue
+            value = aggregate._convert(value, record.record_number)
+            if function is AggregateFunction.MEAN:
+                states[i][0] += value
+                states[i][1] += 1
+            elif function is AggregateFunction.DISTINCT:
+                states[i].add(value)
+            else:
+                states[i] = _merge(function, states[i], value)
+
+    def _spill(self):
+        if self.spilled is None:
+            self.spilled = HashPartitions(self.partitions, self.temp_dir)
+        for key, states in self.groups.items():
+            self.spilled.add(key, (key, states))
+        self.groups = {}
+        self.spill_count += 1
+
+    def _merged_groups(self):
+        if self.spilled is None:
+            yield from self.groups.items()
+            return
+        self._spill()
+        self.spilled.finish()
+        try:
+            for index in range(self.partitions):
+                yield from self._merge_partition(self.spilled, index, 1)
+        finally:
+            self.close()
+
+    def _merge_partition(self, partitions, index, level):
+        groups = {}
+        entries = partitions.read(index)
+        for key, states in entries:
+            current = groups.get(key)
+            if current is None:
+                if len(groups) >= self.max_groups:
+                    break
+                groups[key] = states
+            else:
+                groups[key] = [_merge(f, a, b) for f, a, b
+                               in zip(self.functions, current, states)]
+        else:
+            os.remove(partitions.get_path(index))
+            yield from groups.items()
+            return
+
+        # Too many groups, split the partition with a different hash
+        count = max(2, self.partitions)
+        with HashPartitions(count, self.temp_dir, salt=level) as split:
+            for group in groups.items():
+                split.add(group[0], group)
+            groups = None
+            split.add(key, (key, states))
+            for key, states in entries:
+                split.add(key, (key, states))
+            split.finish()
+            os.remove(partitions.get_path(index))
+            for split_index in range(count):
+                yield from self._merge_partition(split, split_index, level + 1)
+
+    def rows(self):
+        """
+        Finishes the aggregation. Can only be called once.
+
+        :return: A generator over the values of each group, as lists: the
+            grouping values followed by the aggregates. Numbers, dates and
+            booleans are formatted as strings.
+        """
+        for key, states in self._merged_groups():
+            row = list(key)
+            for function, state in zip(self.functions, states):
+                if function is AggregateFunction.MEAN:
+                    state = state[0] / state[1] if state[1] else None
+                elif function is AggregateFunction.DISTINCT:
+                    state = len(state)
+                row.append(_format(state))
+            yield row
+
+    def records(self):
+        """
+        Finishes the aggregation. Can only be called once.
+
+        :return: A generator over one CSVRecord per group, mapped by
+            get_header().
+        """
+        mapping = {name: i for i, name in enumerate(self.get_header())}
+        for record_number, row in enumerate(self.rows(), 1):
+            yield CSVRecord._of(PrettyList(row), mapping, None, record_number, 0)
+
+    def print_to(self, printer):
+        """
+        Finishes the aggregation and prints one record per group.
+
+        :param printer: The CSVPrinter.
+        :return: The number of groups printed.
+        """
+        count = 0
+        for row in self.rows():
+            printer.print_record(row)
+            count += 1
+        return count
+
+    def get_spill_count(self):
+        """
+        :return: How often the groups in memory were written to the
+            partition files.
+        """
+        return self.spill_count
+
+    def close(self):
+        """
+        Deletes the partition files without finishing the aggregation.
+        """
+        if self.spilled is not None:
+            self.spilled.close()
+            self.spilled = None
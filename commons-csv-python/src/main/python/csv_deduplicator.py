@@ -0,0 +1,242 @@
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import tempfile
+from main.python.csv_record import CSVRecord
+from main.python.hash_partitions import HashPartitions, read_partition
+from main.python.pretty_list import PrettyList
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Set membership with a bounded rate of false positives and no false
+        negatives, in a fixed number of bits.
+
+        The bits and hash count are sized so that the false positive rate
+        stays at error_rate until capacity keys were added.
+
+        :param capacity: The expected number of keys.
+        :param error_rate: The false positive rate at capacity.
+        :raises ValueError: If capacity is not positive or error_rate is not
+            between 0 and 1.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, key):
+        """
+        Adds a key.
+
+        :param key: The key, as bytes.
+        :return: Whether the key may have been added before; False means it
+            certainly was not.
+        """
+        present = True
+        bits = self.bits
+        for position in self._positions(key):
+            byte = position >> 3
+            mask = 1 << (position & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class CSVDeduplicator:
+    def __init__(self, keys=None, approximate=False, error_rate=0.001,
+                 capacity=10000000, max_keys=1000000, partitions=16, temp_dir=None):
+        """
+        Drops records whose key columns repeat an earlier record, in one pass.
+
+        The first record of every key is kept, with its record number.
+
+        In exact mode, kept records are passed on as they are read while the
+        keys seen so far fit in memory. Past max_keys keys, the keys seen and
+        all further records are hash-partitioned to temporary files; each
+        partition is deduplicated on its own at the end and the kept records
+        are merged back into file order. Memory is bounded by max_keys plus
+        the keys of one partition.
+
+        In approximate mode, keys are tracked in a BloomFilter, so memory is
+        fixed and everything streams, but a unique record is dropped as
+        duplicate with probability error_rate while fewer than capacity keys
+        have been seen.
+
+        :param keys: The names or 0-based indexes of the key columns, the
+            whole record if None.
+        :param approximate: Whether to use a BloomFilter.
+        :param error_rate: The false positive rate of the BloomFilter.
+        :param capacity: The number of keys the BloomFilter is sized for.
+        :param max_keys: The number of keys kept in memory in exact mode.
+        :param partitions: The number of partition files in exact mode.
+        :param temp_dir: The directory of the temporary files, the system
+            default if None.
+        :raises ValueError: If max_keys or partitions is not positive.
+        """
+        if max_keys < 1 or partitions < 1:
+            raise ValueError("max_keys and partitions must be positive")
+        self.keys = list(keys) if keys is not None else None
+        self.approximate = approximate
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.partitions = partitions
+        self.temp_dir = temp_dir
+        self.record_count = 0
+        self.kept_count = 0
+        self.spilled = False
+
+    def _key_function(self, header_map):
+        if self.keys is None:
+            return tuple
+        indexes = []
+        for column in self.keys:
+            if isinstance(column, str):
+                if not header_map or column not in header_map:
+                    raise ValueError(f"Mapping for {column} not found")
+                column = header_map[column]
+            indexes.append(column)
+
+        def key(values):
+            length = len(values)
+            return tuple(values[i] if i < length else None for i in indexes)
+        return key
+
+    def dedup(self, parser):
+        """
+        Deduplicates the remaining records of a parser.
+
+        :param parser: The CSVParser.
+        :return: A generator over the kept CSVRecords, in file order.
+        :raises ValueError: If a key column is not in the header map.
+        :raises IOError: On parse error or input read-failure.
+        """
+        key = self._key_function(parser.get_header_map())
+        self.record_count = self.kept_count = 0
+        self.spilled = False
+        if self.approximate:
+            seen = BloomFilter(self.capacity, self.error_rate)
+            for record in parser:
+                self.record_count += 1
+                if not seen.add(repr(key(record._values)).encode("utf-8")):
+                    self.kept_count += 1
+                    yield record
+            return
+
+        seen = set()
+        records = iter(parser)
+        for record in records:
+            self.record_count += 1
+            record_key = key(record._values)
+            if record_key in seen:
+                continue
+            seen.add(record_key)
+            self.kept_count += 1
+            yield record
+            if len(seen) > self.max_keys:
+                break
+        else:
+            return
+
+        self.spilled = True
+        mapping = parser.get_header_map()
+        partitions = HashPartitions(self.partitions, self.temp_dir)
+        kept_paths = []
+        try:
+            for record_key in seen:
+                partitions.add(record_key, (record_key, None))
+            seen = None
+            for record in records:
+                self.record_count += 1
+                record_key = key(record._values)
+                partitions.add(record_key, (record_key, (
+                    record.record_number, record.character_position,
+                    record.comment, list(record._values)
+                )))
+            partitions.finish()
+
+            for index in range(self.partitions):
+                fd, path = tempfile.mkstemp(suffix=".kept", dir=self.temp_dir)
+                kept_paths.append(path)
+                with os.fdopen(fd, "wb") as out:
+                    seen = set()
+                    batch = []
+                    for record_key, entry in partitions.read(index):
+                        if record_key in seen:
+                            continue
+                        seen.add(record_key)
+                        if entry is not None:
+                            batch.append(entry)
+                            if len(batch) >= 1000:
+                                pickle.dump(batch, out, pickle.HIGHEST_PROTOCOL)
+                                batch = []
+                    if batch:
+                        pickle.dump(batch, out, pickle.HIGHEST_PROTOCOL)
+                    seen = None
+                os.remove(partitions.get_path(index))
+
+            for number, position, comment, values in heapq.merge(
+                    *(read_partition(path) for path in kept_paths),
+                    key=lambda entry: entry[0]):
+                self.kept_count += 1
+                yield CSVRecord._of(PrettyList(values), mapping, comment, number, position)
+        finally:
+            partitions.close()
+            for path in kept_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def print_to(self, parser, printer, number_column=False):
+        """
+        Deduplicates the remaining records of a parser and prints them.
+
+        :param parser: The CSVParser.
+        :param printer: The CSVPrinter.
+        :param number_column: Whether to print the record number of each
+            kept record as first column.
+        :return: The number of records printed.
+        :raises IOError: On parse error or input read-failure.
+        """
+        count = 0
+        for record in self.dedup(parser):
+            if number_column:
+                printer.print_record([str(record.record_number)] + list(record._values))
+            else:
+                printer.print_record(record._values)
+            count += 1
+        return count
+
+    def get_record_count(self):
+        return self.record_count
+
+    def get_duplicate_count(self):
+        """
+        :return: The number of records dropped by the last dedup() so far.
+        """
+        return self.record_count - self.kept_count
+
+    def is_spilled(self):
+        """
+        :return: Whether the last dedup() exceeded max_keys and used
+            partition files.
+        """
+        return self.spilled
@@ -0,0 +1,276 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from main.python.hash_partitions import HashPartitions, read_partition
+
+
+class RecordDiff:
+    ADDED = "added"
+    REMOVED = "removed"
+    CHANGED = "changed"
+
+    def __init__(self, kind, key, old_record_number, new_record_number,
+                 old_values, new_values, changed_columns):
+        """
+        A record that differs between two versions of a keyed CSV file.
+
+        :param kind: ADDED, REMOVED or CHANGED.
+        :param key: The tuple of key values.
+        :param old_record_number: The record number in the old file, None if
+            added.
+        :param new_record_number: The record number in the new file, None if
+            removed.
+        :param old_values: The values in the old file, None if added.
+        :param new_values: The values in the new file, None if removed.
+        :param changed_columns: The 0-based indexes of the columns that
+            differ, None unless changed.
+        """
+        self.kind = kind
+        self.key = key
+        self.old_record_number = old_record_number
+        self.new_record_number = new_record_number
+        self.old_values = old_values
+        self.new_values = new_values
+        self.changed_columns = changed_columns
+
+    @staticmethod
+    def _value(values, index):
+        return values[index] if index < len(values) else None
+
+    def get_changes(self):
+        """
+        :return: A list of (column index, old value, new value) of the
+            changed columns, empty unless changed.
+        """
+        if self.changed_columns is None:
+            return []
+        return [(i, RecordDiff._value(self.old_values, i), RecordDiff._value(self.new_values, i))
+                for i in self.changed_columns]
+
+    def __eq__(self, other):
+        return isinstance(other, RecordDiff) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash((self.kind, self.key, self.old_record_number, self.new_record_number))
+
+    def _key(self):
+        return (self.kind, self.key, self.old_record_number, self.new_record_number,
+                self.old_values, self.new_values, self.changed_columns)
+
+    def __repr__(self):
+        return (f"RecordDiff({self.kind}, key={self.key}, old={self.old_record_number}, "
+                f"new={self.new_record_number}, changed={self.changed_columns})")
+
+
+def _diff_rows(old_rows, new_rows, key_indexes, columns):
+    # Records with the same key are matched in file order
+    old = {}
+    for key, number, values in old_rows:
+        entries = old.get(key)
+        if entries is None:
+            entries = old[key] = deque()
+        entries.append((number, values))
+
+    value = RecordDiff._value
+    diffs = []
+    for key, number, values in new_rows:
+        entries = old.get(key)
+        if not entries:
+            diffs.append(RecordDiff(RecordDiff.ADDED, key, None, number, None, values, None))
+            continue
+        old_number, old_values = entries.popleft()
+        if not entries:
+            del old[key]
+        compared = columns
+        if compared is None:
+            compared = [i for i in range(max(len(old_values), len(values)))
+                        if i not in key_indexes]
+        changed = [i for i in compared if value(old_values, i) != value(values, i)]
+        if changed:
+            diffs.append(RecordDiff(RecordDiff.CHANGED, key, old_number, number,
+                                    old_values, values, changed))
+    for key, entries in old.items():
+        for number, values in entries:
+            diffs.append(RecordDiff(RecordDiff.REMOVED, key, number, None, values, None, None))
+    return diffs
+
+
+def _diff_partition(old_path, new_path, key_indexes, columns):
+    return _diff_rows(read_partition(old_path), read_partition(new_path),
+                      key_indexes, columns)
+
+
+class CSVDiffer:
+    def __init__(self, keys, columns=None, partitions=16, use_processes=False,
+                 max_workers=None, executor=None, temp_dir=None):
+        """
+        Compares two versions of a CSV file by key columns.
+
+        Both inputs are hash-partitioned by key into temporary files, so
+        matching records end up in the same partition. Each pair of
+        partitions is then compared in memory on a pool. The memory used is
+        about one partition of the old input per worker, so partitions should
+        be chosen such that a partition fits in memory. With one partition
+        the inputs are compared in memory without temporary files.
+
+        Records with equal keys are matched in file order, unmatched ones are
+        reported as added or removed. Within a partition, added and changed
+        records come in the order of the new input, followed by the removed
+        records. The order of the partitions is unspecified.
+
+        :param keys: The names or 0-based indexes of the key columns.
+        :param columns: The names or indexes of the compared columns, all
+            other columns if None.
+        :param partitions: The number of partitions.
+        :param use_processes: Whether to compare partitions in a process pool
+            instead of a thread pool. Ignored if executor is given.
+        :param max_workers: Number of workers of the pool created.
+        :param executor: An existing concurrent.futures.Executor to use. It is
+            not shut down by the differ.
+        :param temp_dir: The directory of the partition files, the system
+            default if None.
+        :raises ValueError: If no keys are given or partitions is not
+            positive.
+        """
+        if not keys:
+            raise ValueError("keys must not be empty")
+        if partitions < 1:
+            raise ValueError("partitions must be positive")
+        self.keys = list(keys)
+        self.columns = list(columns) if columns is not None else None
+        self.partitions = partitions
+        self.use_processes = use_processes
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = executor
+        self.temp_dir = temp_dir
+        self.names = None
+        self.key_indexes = None
+
+    @staticmethod
+    def _resolve(column, header_map):
+        if isinstance(column, str):
+            if not header_map or column not in header_map:
+                raise ValueError(f"Mapping for {column} not found")
+            return header_map[column]
+        return column
+
+    def _create_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(self.max_workers)
+        return ThreadPoolExecutor(self.max_workers)
+
+    @staticmethod
+    def _rows(parser, key_indexes):
+        for record in parser:
+            values = list(record._values)
+            length = len(values)
+            key = tuple(values[i] if i < length else None for i in key_indexes)
+            yield key, record.record_number, values
+
+    def diff(self, old_parser, new_parser):
+        """
+        Compares the remaining records of two parsers.
+
+        :param old_parser: The CSVParser of the old version.
+        :param new_parser: The CSVParser of the new version.
+        :return: A generator over the RecordDiffs.
+        :raises ValueError: If the header maps differ or a column is not in
+            the header map.
+        :raises IOError: On parse error or input read-failure.
+        """
+        header_map = old_parser.get_header_map()
+        if header_map != new_parser.get_header_map():
+            raise ValueError("The header maps of the inputs differ")
+        self.names = old_parser.get_header_names()
+        key_indexes = self.key_indexes = [CSVDiffer._resolve(key, header_map)
+                                          for key in self.keys]
+        columns = None
+        if self.columns is not None:
+            columns = [CSVDiffer._resolve(column, header_map) for column in self.columns]
+
+        if self.partitions == 1:
+            yield from _diff_rows(CSVDiffer._rows(old_parser, key_indexes),
+                                  CSVDiffer._rows(new_parser, key_indexes),
+                                  key_indexes, columns)
+            return
+
+        old_partitions = HashPartitions(self.partitions, self.temp_dir)
+        new_partitions = None
+        executor = None
+        in_flight = deque()
+        try:
+            new_partitions = HashPartitions(self.partitions, self.temp_dir)
+            for partitions, parser in ((old_partitions, old_parser),
+                                       (new_partitions, new_parser)):
+                for row in CSVDiffer._rows(parser, key_indexes):
+                    partitions.add(row[0], row)
+                partitions.finish()
+
+            executor = self.executor or self._create_executor()
+            for index in range(self.partitions):
+                in_flight.append(executor.submit(
+                    _diff_partition, old_partitions.get_path(index),
+                    new_partitions.get_path(index), key_indexes, columns
+                ))
+                while len(in_flight) >= self.max_workers:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if executor is not None and self.executor is None:
+                executor.shutdown()
+            old_partitions.close()
+            if new_partitions is not None:
+                new_partitions.close()
+
+    def _column_name(self, index):
+        if self.names is not None and index < len(self.names) and self.names[index] is not None:
+            return self.names[index]
+        return str(index)
+
+    def get_header(self):
+        """
+        Returns the header of the rows printed by print_to(), known once the
+        diff has started.
+
+        :return: "change", the key columns, "column", "old_value" and
+            "new_value".
+        """
+        return ["change"] + [self._column_name(key) if isinstance(key, int) else key
+                             for key in self.keys] + ["column", "old_value", "new_value"]
+
+    def print_to(self, old_parser, new_parser, printer):
+        """
+        Compares two parsers and prints the differences.
+
+        Changed records are printed as one row per changed column with its
+        old and new value, added and removed records as one row per column
+        other than the keys with its new or old value. Records with only key
+        columns are printed as one row without column.
+
+        :param old_parser: The CSVParser of the old version.
+        :param new_parser: The CSVParser of the new version.
+        :param printer: The CSVPrinter.
+        :return: The number of RecordDiffs.
+        :raises IOError: On parse error or input read-failure.
+        """
+        count = 0
+        for diff in self.diff(old_parser, new_parser):
+            key = list(diff.key)
+            if diff.kind == RecordDiff.CHANGED:
+                changes = diff.get_changes()
+            elif diff.kind == RecordDiff.ADDED:
+                changes = [(i, None, value) for i, value in enumerate(diff.new_values)
+                           if i not in self.key_indexes]
+            else:
+                changes = [(i, value, None) for i, value in enumerate(diff.old_values)
+                           if i not in self.key_indexes]
+            for index, old_value, new_value in changes:
+                printer.print_record([diff.kind] + key +
+                                     [self._column_name(index), old_value, new_value])
+            if not changes:
+                printer.print_record([diff.kind] + key + [None, None, None])
+            count += 1
+        return count
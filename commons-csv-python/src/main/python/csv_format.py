@@ -6,6 +6,7 @@ import sqlite3
 from main.python.csv_printer import CSVPrinter
 from main.python.csv_parser import CSVParser
 from main.python.quote_mode import QuoteMode
+from main.python.parse_engine import ParseEngine
 from main.python.constants import Constants
 from main.python.java_handler import Types, convert_to_python_enum, java_handler
 
@@ -42,6 +43,10 @@ class CSVFormat:
         trim: bool,
         trailing_delimiter: bool,
         auto_flush: bool,
+        engine: ParseEngine = None,
+        max_field_size: int = None,
+        max_record_size: int = None,
+        max_columns: int = None,
     ):
         self.delimiter = delimiter
         self.quote_character = quote_char
@@ -60,6 +65,10 @@ class CSVFormat:
         self.trailing_delimiter = trailing_delimiter
         self.trim = trim
         self.auto_flush = auto_flush
+        self.engine = engine
+        self.max_field_size = max_field_size
+        self.max_record_size = max_record_size
+        self.max_columns = max_columns
         self.validate()
 
     @staticmethod
@@ -88,6 +97,25 @@ class CSVFormat:
             False,
         )
 
+    @staticmethod
+    def sniff(sample_or_path, charset="utf-8", sample_size=64 * 1024):
+        """
+        Infers the format of an input from a bounded sample.
+
+        Detects the delimiter, quote character, escape character, null
+        string, record separator, comment marker and whether the first record
+        is a header. Only the first sample_size bytes are read from a file.
+
+        :param sample_or_path: An os.PathLike path, a file-like object, bytes,
+            or the sample text.
+        :param charset: The charset used to decode files and bytes.
+        :param sample_size: The maximum size of the sample.
+        :return: A predefined format such as EXCEL, TDF or MYSQL if it matches
+            the sample, otherwise a format derived from DEFAULT.
+        """
+        from main.python.csv_sniffer import CSVSniffer
+        return CSVSniffer(sample_size, charset).sniff(sample_or_path)
+
     @staticmethod
     def value_of(format: str):
         return CSVFormat.Predefined.value_of(format).get_format()
@@ -151,6 +179,9 @@ class CSVFormat:
     def get_delimiter(self):
         return self.delimiter
 
+    def get_engine(self):
+        return self.engine
+
     def get_escape_character(self):
         return self.escape_character
 
@@ -176,6 +207,15 @@ class CSVFormat:
     def get_ignore_surrounding_spaces(self):
         return self.ignore_surrounding_spaces
 
+    def get_max_columns(self):
+        return self.max_columns
+
+    def get_max_field_size(self):
+        return self.max_field_size
+
+    def get_max_record_size(self):
+        return self.max_record_size
+
     def get_null_string(self):
         return self.null_string
 
@@ -545,6 +585,12 @@ class CSVFormat:
                     )
                 duplicate_check.add(hdr)
 
+        for name, limit in (("max_field_size", self.max_field_size),
+                            ("max_record_size", self.max_record_size),
+                            ("max_columns", self.max_columns)):
+            if limit is not None and limit < 1:
+                raise ValueError(f"{name} must be positive, got {limit}")
+
     def with_allow_missing_column_names(
             self, allow_missing_column_names=True
     ):
@@ -566,6 +612,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_auto_flush(self, auto_flush):
@@ -587,6 +637,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_comment_marker(self, comment_marker: str):
@@ -612,6 +666,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_delimiter(self, delimiter: str):
@@ -635,6 +693,46 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
+        )
+
+    def with_engine(self, engine: ParseEngine):
+        """
+        Selects the engine that splits the input into tokens.
+
+        ParseEngine.NUMPY locates fields with vectorized NumPy operations.
+        It is used for formats without escape character and comment marker
+        that do not ignore surrounding spaces, and falls back to the Lexer
+        when NumPy is not installed or the input needs the Lexer's rules.
+
+        :param engine: The ParseEngine, None for the default Lexer.
+        :return: A new CSVFormat that is equal to this but with the engine.
+        """
+        return CSVFormat(
+            self.delimiter,
+            self.quote_character,
+            self.quote_mode,
+            self.comment_marker,
+            self.escape_character,
+            self.ignore_surrounding_spaces,
+            self.ignore_empty_lines,
+            self.record_separator,
+            self.null_string,
+            self.header_comments,
+            self.header,
+            self.skip_header_record,
+            self.allow_missing_column_names,
+            self.ignore_header_case,
+            self.trim,
+            self.trailing_delimiter,
+            self.auto_flush,
+            engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_escape(self, escape: str):
@@ -658,6 +756,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_first_record_as_header(self):
@@ -703,6 +805,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_header_comments(self, *header_comments):
@@ -724,6 +830,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_ignore_empty_lines(self, ignore_empty_lines: bool = True):
@@ -745,6 +855,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_ignore_header_case(self, ignore_header_case: bool = True):
@@ -766,6 +880,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_ignore_surrounding_spaces(
@@ -789,6 +907,119 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
+        )
+
+    def with_max_columns(self, max_columns: int):
+        """
+        Limits the number of values of a record.
+
+        Parsing fails with an IOError naming the line once a record has more
+        values than the limit.
+
+        :param max_columns: The maximum number of values, None for no limit.
+        :return: A new CSVFormat that is equal to this but with the limit.
+        :raises ValueError: If the limit is not positive.
+        """
+        return CSVFormat(
+            self.delimiter,
+            self.quote_character,
+            self.quote_mode,
+            self.comment_marker,
+            self.escape_character,
+            self.ignore_surrounding_spaces,
+            self.ignore_empty_lines,
+            self.record_separator,
+            self.null_string,
+            self.header_comments,
+            self.header,
+            self.skip_header_record,
+            self.allow_missing_column_names,
+            self.ignore_header_case,
+            self.trim,
+            self.trailing_delimiter,
+            self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            max_columns,
+        )
+
+    def with_max_field_size(self, max_field_size: int):
+        """
+        Limits the length of a single value.
+
+        The Lexer fails with an IOError naming the line as soon as a value
+        grows over the limit, so an unterminated quote cannot pull the rest of
+        the input into one token.
+
+        :param max_field_size: The maximum value length in characters, None for
+            no limit.
+        :return: A new CSVFormat that is equal to this but with the limit.
+        :raises ValueError: If the limit is not positive.
+        """
+        return CSVFormat(
+            self.delimiter,
+            self.quote_character,
+            self.quote_mode,
+            self.comment_marker,
+            self.escape_character,
+            self.ignore_surrounding_spaces,
+            self.ignore_empty_lines,
+            self.record_separator,
+            self.null_string,
+            self.header_comments,
+            self.header,
+            self.skip_header_record,
+            self.allow_missing_column_names,
+            self.ignore_header_case,
+            self.trim,
+            self.trailing_delimiter,
+            self.auto_flush,
+            self.engine,
+            max_field_size,
+            self.max_record_size,
+            self.max_columns,
+        )
+
+    def with_max_record_size(self, max_record_size: int):
+        """
+        Limits the length of a record in the input.
+
+        Parsing fails with an IOError naming the line as soon as a record
+        spans more input characters than the limit, delimiters, quotes and
+        line breaks included.
+
+        :param max_record_size: The maximum record length in characters, None
+            for no limit.
+        :return: A new CSVFormat that is equal to this but with the limit.
+        :raises ValueError: If the limit is not positive.
+        """
+        return CSVFormat(
+            self.delimiter,
+            self.quote_character,
+            self.quote_mode,
+            self.comment_marker,
+            self.escape_character,
+            self.ignore_surrounding_spaces,
+            self.ignore_empty_lines,
+            self.record_separator,
+            self.null_string,
+            self.header_comments,
+            self.header,
+            self.skip_header_record,
+            self.allow_missing_column_names,
+            self.ignore_header_case,
+            self.trim,
+            self.trailing_delimiter,
+            self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            max_record_size,
+            self.max_columns,
         )
 
     def with_null_string(self, null_string: str):
@@ -810,6 +1041,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_quote(self, quote_char: str):
@@ -833,6 +1068,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_quote_mode(self, quote_mode_policy: QuoteMode):
@@ -853,7 +1092,11 @@ class CSVFormat:
             self.ignore_header_case,
             self.trim,
             self.trailing_delimiter,
-            self.auto_flush
+            self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_record_separator(self, record_separator: str):
@@ -875,6 +1118,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_skip_header_record(self, skip_header_record: bool = True):
@@ -896,6 +1143,10 @@ class CSVFormat:
             self.trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_system_record_separator(self):
@@ -920,6 +1171,10 @@ class CSVFormat:
             self.trim,
             trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
     def with_trim(self, trim: bool = True):
@@ -941,6 +1196,10 @@ class CSVFormat:
             trim,
             self.trailing_delimiter,
             self.auto_flush,
+            self.engine,
+            self.max_field_size,
+            self.max_record_size,
+            self.max_columns,
         )
 
 
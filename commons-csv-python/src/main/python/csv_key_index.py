@@ -0,0 +1,277 @@
+import codecs
+import os
+import sqlite3
+from pathlib import Path
+from main.python.closeable import Closeable
+from main.python.csv_push_parser import CSVPushParser
+from main.python.csv_sidecar import CSVSidecar
+from main.python.csv_tail import CSVTail
+
+
+class CSVKeyIndex(Closeable):
+    SUFFIX = ".csvkey"
+    VERSION = 1
+    CHUNK_SIZE = 1024 * 1024
+    BATCH_SIZE = 10000
+
+    def __init__(self, path, charset, format, column, index_path=None):
+        """
+        Persistent index from the values of one column to the records
+        holding them.
+
+        The index is an SQLite database next to the CSV file storing the
+        record number, byte offset and character offset of every record by
+        its value. Lookups seek to the matching records and parse only them.
+        Like CSVSidecar, the index stores the size and modification time of
+        the CSV file and a fingerprint of the format and charset, and is
+        rebuilt by open() when any of them changes.
+
+        The charset must encode decoded text back to the same bytes.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the CSV file.
+        :param format: The CSVFormat used for CSV parsing.
+        :param column: The name or 0-based index of the indexed column.
+        :param index_path: Where to store the index, defaults to the CSV
+            file's path with the column and SUFFIX appended.
+        """
+        self.path = Path(path)
+        self.charset = charset
+        self.format = format
+        self.column = column
+        self.index_path = Path(index_path) if index_path is not None \
+            else self.path.with_name(f"{self.path.name}.{column}{CSVKeyIndex.SUFFIX}")
+        self.connection = None
+        self.header_map = None
+
+    def _expected_meta(self):
+        stat = self.path.stat()
+        return {
+            "version": str(CSVKeyIndex.VERSION),
+            "column": repr(self.column),
+            "size": str(stat.st_size),
+            "mtime_ns": str(stat.st_mtime_ns),
+            "fingerprint": CSVSidecar.fingerprint(self.format, self.charset).hex(),
+        }
+
+    def is_valid(self):
+        """
+        Returns whether the index exists and matches the CSV file and format.
+
+        :return: True if load() would succeed.
+        """
+        if not self.index_path.exists():
+            return False
+        try:
+            connection = sqlite3.connect(self.index_path)
+            try:
+                meta = dict(connection.execute("SELECT key, value FROM meta"))
+            finally:
+                connection.close()
+        except sqlite3.DatabaseError:
+            return False
+        return meta == self._expected_meta()
+
+    def _scan(self):
+        # Yields (value, record number, byte offset, character offset) of
+        # every record, tracking byte offsets by encoding the text between
+        # consecutive records
+        parser = CSVPushParser(self.format, self.charset)
+        decoder = codecs.getincrementaldecoder(self.charset)()
+        encoder = codecs.getincrementalencoder(self.charset)()
+        column = self.column
+        pending = ""
+        char_position = 0
+        byte_position = 0
+        with open(self.path, "rb") as f:
+            while True:
+                data = f.read(CSVKeyIndex.CHUNK_SIZE)
+                text = decoder.decode(data, not data)
+                pending += text
+                records = parser.feed(text) if data else parser.close()
+                if isinstance(column, str):
+                    if parser.header_map is None or column not in parser.header_map:
+                        if parser.header_pending and data:
+                            continue
+                        raise ValueError(f"Mapping for {column} not found")
+                    column = parser.header_map[column]
+                for record in records:
+                    skipped = record.character_position - char_position
+                    byte_position += len(encoder.encode(pending[:skipped]))
+                    pending = pending[skipped:]
+                    char_position = record.character_position
+                    values = record._values
+                    yield (values[column] if column < len(values) else None,
+                           record.record_number, byte_position, char_position)
+                if not data:
+                    return
+
+    def build(self):
+        """
+        Scans the CSV file and writes the index.
+
+        The index is written to a temporary file first and then moved into
+        place, so readers never see a partial index.
+
+        :return: self, loaded.
+        :raises ValueError: If the column is not in the header map.
+        :raises IOError: On parse error or input read-failure.
+        """
+        self.close()
+        meta = self._expected_meta()
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        if temp_path.exists():
+            temp_path.unlink()
+        try:
+            connection = sqlite3.connect(temp_path)
+            try:
+                connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                connection.execute(
+                    "CREATE TABLE records (value TEXT, record_number INTEGER, "
+                    "byte_offset INTEGER, char_offset INTEGER)"
+                )
+                rows = self._scan()
+                while True:
+                    batch = [row for _, row in zip(range(CSVKeyIndex.BATCH_SIZE), rows)]
+                    if not batch:
+                        break
+                    connection.executemany("INSERT INTO records VALUES (?, ?, ?, ?)", batch)
+                connection.execute("CREATE INDEX records_value ON records (value, record_number)")
+                connection.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+                connection.commit()
+            finally:
+                connection.close()
+            os.replace(temp_path, self.index_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return self.load()
+
+    def load(self):
+        """
+        Opens the index.
+
+        :return: self, or None if the index is missing or stale.
+        """
+        if not self.is_valid():
+            return None
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.index_path, check_same_thread=False)
+        return self
+
+    def open(self):
+        """
+        Loads the index, building it first if it is missing or stale.
+
+        :return: self.
+        :raises IOError: On parse error or input read-failure.
+        """
+        return self.load() or self.build()
+
+    def _require_connection(self):
+        if self.connection is None:
+            raise ValueError("CSVKeyIndex is not loaded")
+        return self.connection
+
+    def lookup(self, value):
+        """
+        :param value: The value, None for null values.
+        :return: A list of (record number, byte offset, character offset) of
+            the records holding the value, in file order.
+        """
+        return self._require_connection().execute(
+            "SELECT record_number, byte_offset, char_offset FROM records "
+            "WHERE value IS ? ORDER BY record_number", (value,)
+        ).fetchall()
+
+    def get_record_count(self):
+        return self._require_connection().execute(
+            "SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def find(self, value):
+        """
+        Reads the records holding a value.
+
+        :param value: The value, None for null values.
+        :return: The list of CSVRecords, in file order, with their record
+            numbers and character positions.
+        :raises IOError: On parse error or input read-failure.
+        """
+        locations = self.lookup(value)
+        if not locations:
+            return []
+        if self.header_map is None:
+            self.header_map = CSVTail(self.path, self.charset, self.format).get_header_map()
+        records = []
+        with open(self.path, "rb") as f:
+            for record_number, byte_offset, char_offset in locations:
+                parser = CSVPushParser(self.format, self.charset, char_offset,
+                                       record_number, self.header_map)
+                f.seek(byte_offset)
+                parsed = []
+                while not parsed:
+                    data = f.read(CSVTail.BLOCK_SIZE)
+                    parsed = parser.feed(data) if data else parser.close()
+                    if not data:
+                        break
+                records.extend(parsed[:1])
+        return records
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class CSVTable(Closeable):
+    def __init__(self, path, charset, format, index_dir=None):
+        """
+        Point lookups of records in a CSV file through CSVKeyIndexes, one per
+        looked-up column, built on first use and kept next to the file.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the CSV file.
+        :param format: The CSVFormat used for CSV parsing.
+        :param index_dir: The directory of the indexes, the directory of the
+            CSV file if None.
+        """
+        self.path = Path(path)
+        self.charset = charset
+        self.format = format
+        self.index_dir = Path(index_dir) if index_dir is not None else None
+        self.indexes = {}
+
+    def index(self, column):
+        """
+        Returns the index of a column, building it if missing or stale.
+
+        :param column: The name or 0-based index of the column.
+        :return: The loaded CSVKeyIndex.
+        :raises IOError: On parse error or input read-failure.
+        """
+        index = self.indexes.get(column)
+        if index is None or index.load() is None:
+            index_path = None
+            if self.index_dir is not None:
+                index_path = self.index_dir / f"{self.path.name}.{column}{CSVKeyIndex.SUFFIX}"
+            if index is not None:
+                index.close()
+            index = CSVKeyIndex(self.path, self.charset, self.format, column, index_path)
+            self.indexes[column] = index.open()
+        return index
+
+    def find(self, column, value):
+        """
+        Reads the records whose column holds a value.
+
+        :param column: The name or 0-based index of the column.
+        :param value: The value, None for null values.
+        :return: The list of CSVRecords, in file order.
+        :raises IOError: On parse error or input read-failure.
+        """
+        return self.index(column).find(value)
+
+    def close(self):
+        for index in self.indexes.values():
+            index.close()
+        self.indexes.clear()
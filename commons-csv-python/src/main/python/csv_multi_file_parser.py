@@ -0,0 +1,139 @@
+import glob
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from main.python.csv_parser import CSVParser
+from main.python.csv_record_batch import CSVRecordBatch
+
+
+def _parse_file(path, charset, format):
+    try:
+        with open(path, encoding=charset, newline="") as f:
+            parser = CSVParser(f, format)
+            records = parser.get_records()
+    except IOError as e:
+        raise IOError(f"Error parsing {path}: {e}")
+    return parser.get_header_map(), CSVRecordBatch(records)
+
+
+class CSVMultiFileParser:
+    def __init__(self, paths, charset, format, ordered=True, use_processes=False,
+                 max_workers=None, max_in_flight=None, executor=None):
+        """
+        Parses many files concurrently on a pool.
+
+        Every file is parsed as a whole by one worker, so the memory used is
+        bounded by the max_in_flight largest files. Parsing is CPU bound, so
+        a process pool scales with the cores while a thread pool mainly
+        overlaps opening and reading the files.
+
+        :param paths: A directory, whose files are parsed in name order; a
+            glob pattern, whose matches are parsed in name order; or an
+            iterable of paths.
+        :param charset: The charset of the files.
+        :param format: The CSVFormat of the files.
+        :param ordered: Whether to yield the files in the order of paths,
+            instead of the order they finish parsing in.
+        :param use_processes: Whether to use a process pool instead of a
+            thread pool. Ignored if executor is given.
+        :param max_workers: Number of workers of the pool created.
+        :param max_in_flight: Maximum number of files parsed but not yet
+            consumed, defaults to twice the number of workers.
+        :param executor: An existing concurrent.futures.Executor to use. It is
+            not shut down by the parser.
+        :raises ValueError: If format is None or max_in_flight is not
+            positive.
+        """
+        if format is None:
+            raise ValueError("format must not be None")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+        self.paths = CSVMultiFileParser.expand(paths)
+        self.charset = charset
+        self.format = format
+        self.ordered = ordered
+        self.use_processes = use_processes
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.executor = executor
+        self.header_map = None
+        self.header_seen = False
+
+    @staticmethod
+    def expand(paths):
+        """
+        :param paths: A directory, a glob pattern or an iterable of paths.
+        :return: The list of paths to parse.
+        """
+        if isinstance(paths, (str, os.PathLike)):
+            path = Path(paths)
+            if path.is_dir():
+                return sorted(p for p in path.iterdir() if p.is_file())
+            if path.is_file():
+                return [path]
+            return [Path(p) for p in sorted(glob.glob(str(paths), recursive=True))
+                    if os.path.isfile(p)]
+        return [Path(p) for p in paths]
+
+    def _create_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(self.max_workers)
+        return ThreadPoolExecutor(self.max_workers)
+
+    def _check_header(self, path, header_map):
+        if not self.header_seen:
+            self.header_map = header_map
+            self.header_seen = True
+        elif header_map != self.header_map:
+            raise ValueError(f"The header of {path} differs from the header of "
+                             f"the other files: {list(header_map or [])} != "
+                             f"{list(self.header_map or [])}")
+
+    def __iter__(self):
+        """
+        Yields the records of all files.
+
+        :return: A generator over (path, CSVRecord) pairs. The records keep
+            their per-file record numbers and positions.
+        :raises ValueError: If the header map of a file differs from that of
+            the first file yielded.
+        :raises IOError: On parse error or input read-failure, naming the
+            file.
+        """
+        executor = self.executor or self._create_executor()
+        pending = deque(self.paths)
+        in_flight = {}
+        order = deque()
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < self.max_in_flight:
+                    path = pending.popleft()
+                    future = executor.submit(_parse_file, path, self.charset, self.format)
+                    in_flight[future] = path
+                    if self.ordered:
+                        order.append(future)
+                if self.ordered:
+                    done = [order.popleft()]
+                else:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = in_flight.pop(future)
+                    header_map, records = future.result()
+                    self._check_header(path, header_map)
+                    for record in records:
+                        yield path, record
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if self.executor is None:
+                executor.shutdown()
+
+    def get_paths(self):
+        return list(self.paths)
+
+    def get_header_map(self):
+        """
+        :return: The header map shared by the files yielded so far.
+        """
+        return self.header_map
@@ -0,0 +1,167 @@
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from main.python.csv_parser import CSVParser
+
+
+class CSVParseCache:
+    RECORDS = "records"
+    COLUMNS = "columns"
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        In-memory LRU cache of parsed CSV files.
+
+        Entries are keyed by the file's resolved path, size and modification
+        time plus the CSVFormat, so a modified file or a different format is
+        parsed again. The least recently used entries are evicted once the
+        estimated size of all cached entries exceeds max_bytes.
+
+        Cached records and columns are shared between callers and must be
+        treated as read-only.
+
+        :param max_bytes: The maximum estimated size of all cached entries.
+        :raises ValueError: If max_bytes is negative.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _format_key(format):
+        # CSVFormat equality ignores these settings, but they change the
+        # parsed values.
+        return (
+            format,
+            format.get_trim(),
+            format.get_trailing_delimiter(),
+            format.get_allow_missing_column_names(),
+            format.get_ignore_header_case(),
+        )
+
+    @staticmethod
+    def _estimate_size(values):
+        size = sys.getsizeof(values)
+        for value in values:
+            if value is not None:
+                size += sys.getsizeof(value)
+        return size
+
+    def _lookup(self, path, charset, format, kind):
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = (str(path), stat.st_size, stat.st_mtime_ns, charset,
+               CSVParseCache._format_key(format), kind)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return key, entry[0]
+            self.misses += 1
+        return key, None
+
+    def _store(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def parse(self, path, charset, format):
+        """
+        Returns the records of a CSV file, parsing it on a cache miss.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the file.
+        :param format: The CSVFormat used for CSV parsing.
+        :return: The list of CSVRecords.
+        :raises IOError: On parse error or input read-failure.
+        """
+        key, records = self._lookup(path, charset, format, CSVParseCache.RECORDS)
+        if records is not None:
+            return records
+        with CSVParser.parse(Path(path), charset, format) as parser:
+            records = parser.get_records()
+        size = sys.getsizeof(records)
+        for record in records:
+            size += sys.getsizeof(record) + CSVParseCache._estimate_size(record._values)
+        self._store(key, records, size)
+        return records
+
+    def parse_columns(self, path, charset, format):
+        """
+        Returns the values of a CSV file by column, parsing it on a cache miss.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the file.
+        :param format: The CSVFormat used for CSV parsing.
+        :return: A dict from column name, or 0-based index if the format
+            defines no header, to the list of the column's values. Short
+            records contribute None to the columns they lack.
+        :raises IOError: On parse error or input read-failure.
+        """
+        key, columns = self._lookup(path, charset, format, CSVParseCache.COLUMNS)
+        if columns is not None:
+            return columns
+        with CSVParser.parse(Path(path), charset, format) as parser:
+            header_map = parser.get_header_map()
+            values = []
+            row_count = 0
+            for record in parser:
+                for i, value in enumerate(record._values):
+                    if i == len(values):
+                        values.append([None] * row_count)
+                    values[i].append(value)
+                row_count += 1
+                for column in values:
+                    if len(column) < row_count:
+                        column.append(None)
+        if header_map:
+            columns = {
+                name: values[i] if i < len(values) else [None] * row_count
+                for name, i in header_map.items()
+            }
+        else:
+            columns = dict(enumerate(values))
+        size = sys.getsizeof(columns)
+        for column in values:
+            size += CSVParseCache._estimate_size(column)
+        self._store(key, columns, size)
+        return columns
+
+    def invalidate(self, path=None):
+        """
+        Drops the cached entries of one file, or of all files.
+
+        :param path: The path of the file, None to clear the whole cache.
+        """
+        resolved = str(Path(path).resolve()) if path is not None else None
+        with self.lock:
+            for key in list(self.entries):
+                if resolved is None or key[0] == resolved:
+                    self.size -= self.entries.pop(key)[1]
+
+    def get_hits(self):
+        return self.hits
+
+    def get_misses(self):
+        return self.misses
+
+    def get_size(self):
+        return self.size
+
+    def __len__(self):
+        return len(self.entries)
@@ -1,3 +1,5 @@
+import queue
+import threading
 from urllib.parse import urlparse, ParseResult
 from pathlib import Path
 from collections.abc import Iterator
@@ -7,8 +9,13 @@ from main.python.token import Token
 from main.python.constants import Constants
 from main.python.csv_record import CSVRecord
 from main.python.closeable import Closeable
+from main.python.field_sink import FieldHandle, FieldSinkToken
 from main.python.case_sensitive_dict import CaseInsensitiveDict
 from main.python.java_handler import java_handler
+from main.python.parse_engine import ParseEngine
+from main.python.pretty_list import PrettyList
+from main.python.spilling_record_list import SpillingRecordList
+from main.python.vectorized_lexer import VectorizedLexer
 
 
 @java_handler
@@ -41,9 +48,23 @@ class CSVParser(Closeable):
         self.reusable_token = Token()
         self.record_number = record_number - 1
         self.header_map = {}
+        self.intern_tables = None
+        self.intern_auto = False
+        self.intern_max_cardinality = 0
+        self.wide_rows = False
+        self.field_columns = None
+        self.limited = (format.get_max_record_size() is not None
+                        or format.get_max_columns() is not None)
+        self.wide_width = 0
+        self.header_names = None
         
         self.format = format
-        self.lexer = Lexer(format, ExtendedBufferedReader(reader, from_java))
+        buffered_reader = ExtendedBufferedReader(reader, from_java)
+        self.lexer = None
+        if format.get_engine() == ParseEngine.NUMPY and not from_java:
+            self.lexer = VectorizedLexer.create(format, buffered_reader.getvalue())
+        if self.lexer is None:
+            self.lexer = Lexer(format, buffered_reader)
         self.csv_record_iterator = CSVParser.CSVRecordIterator(self)
         self.header_map = self.initialize_header()
         
@@ -113,13 +134,95 @@ class CSVParser(Closeable):
 
         return CSVParser(reader, csv_format)
 
+    @staticmethod
+    def parse_many(paths, charset, csv_format, ordered=True, use_processes=False,
+                   max_workers=None, max_in_flight=None, executor=None):
+        """
+        Parses many files concurrently on a thread or process pool.
+
+        :param paths: A directory, a glob pattern or an iterable of paths.
+        :param charset: The charset of the files.
+        :param csv_format: The CSVFormat of the files.
+        :param ordered: Whether to yield the files in the order of paths,
+            instead of the order they finish parsing in.
+        :param use_processes: Whether to use a process pool.
+        :param max_workers: Number of workers of the pool.
+        :param max_in_flight: Maximum number of files parsed but not yet
+            consumed, defaults to twice the number of workers.
+        :param executor: An existing concurrent.futures.Executor to use
+            instead of a new pool. It is not shut down by the parser.
+        :return: A CSVMultiFileParser, iterating over (path, CSVRecord) pairs
+            with per-file record numbers. It raises ValueError if the header
+            maps of the files differ.
+        """
+        from main.python.csv_multi_file_parser import CSVMultiFileParser
+        return CSVMultiFileParser(paths, charset, csv_format, ordered,
+                                  use_processes, max_workers, max_in_flight, executor)
+
+    @staticmethod
+    def tail(path, charset, csv_format, n, index=None):
+        """
+        Returns the last n records of a file, reading it from the end.
+
+        Record numbers and character positions are only known when a valid
+        RecordOffsetIndex is given, they are None otherwise.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the file.
+        :param csv_format: The CSVFormat of the file.
+        :param n: The number of records.
+        :param index: An optional RecordOffsetIndex of the file.
+        :return: The list of up to n CSVRecords, in file order.
+        :raises IOError: On parse error or input read-failure.
+        """
+        from main.python.csv_tail import CSVTail
+        return CSVTail(path, charset, csv_format, index).read(n)
+
     def add_record_value(self, last_record):
+        if self.field_columns is not None and self._add_sink_value(last_record):
+            return
         input_content = self.reusable_token.get_content()
         input_clean = input_content.strip() if self.format.trim else input_content
         if last_record and input_clean == "" and self.format.get_trailing_delimiter():
             return
         null_string = self.format.null_string
-        self.record_list.append(None if input_clean == null_string else input_clean)
+        if input_clean == null_string:
+            self.record_list.append(None)
+        elif self.intern_tables is not None:
+            self.record_list.append(self._intern(len(self.record_list), input_clean))
+        else:
+            self.record_list.append(input_clean)
+
+    def _add_sink_value(self, last_record):
+        token = self.reusable_token
+        column = len(self.record_list)
+        handle = token.finish(not (last_record and self.format.get_trailing_delimiter()))
+        # Prepare the token for the next field
+        token.column = 0 if last_record else column + 1
+        token.record_number = self.record_number + (2 if last_record else 1)
+        token.force = token.column in self.field_columns
+        if handle is None:
+            return False
+        self.record_list.append(handle)
+        return True
+
+    def _intern(self, column, value):
+        tables = self.intern_tables
+        if column >= len(tables):
+            if not self.intern_auto:
+                return value
+            tables.extend({} for _ in range(column + 1 - len(tables)))
+        table = tables[column]
+        if table is None:
+            return value
+        shared = table.get(value)
+        if shared is None:
+            if len(table) >= self.intern_max_cardinality:
+                # Too many distinct values to be worth sharing
+                tables[column] = None
+                return value
+            shared = table[value] = value
+        return shared
 
     def close(self):
         """
@@ -127,9 +230,121 @@ class CSVParser(Closeable):
 
         :raises IOError: If an I/O error occurs
         """
+        if isinstance(self.csv_record_iterator, CSVParser.ReadAheadRecordIterator):
+            self.csv_record_iterator.shutdown()
         if self.lexer != None:
             self.lexer.close()
 
+    def enable_read_ahead(self, queue_size=16, batch_size=256):
+        """
+        Parses records ahead on a background thread.
+
+        A producer thread parses records into a bounded queue while the
+        caller consumes them through iteration, preserving their order.
+        Exceptions raised while parsing are re-raised to the consumer, and
+        close() stops the producer thread. Once enabled, records must only be
+        read by iterating over the parser.
+
+        :param queue_size: Maximum number of batches parsed ahead.
+        :param batch_size: Number of records handed over per batch.
+        :return: This parser.
+        :raises ValueError: If queue_size or batch_size is not positive.
+        """
+        if queue_size < 1 or batch_size < 1:
+            raise ValueError("queue_size and batch_size must be positive")
+        if not isinstance(self.csv_record_iterator, CSVParser.ReadAheadRecordIterator):
+            self.csv_record_iterator = CSVParser.ReadAheadRecordIterator(
+                self, queue_size, batch_size
+            )
+        return self
+
+    def enable_interning(self, columns=None, max_cardinality=1024):
+        """
+        Shares one string object between all equal values of a column.
+
+        Columns that repeat a few values, such as country codes or status
+        flags, then hold references to shared strings instead of a new string
+        per record. A column stops being interned once it has more than
+        max_cardinality distinct values, already shared values stay shared.
+
+        :param columns: The names or 0-based indexes of the columns to
+            intern, None to intern every column.
+        :param max_cardinality: The number of distinct values per column
+            above which interning of the column is dropped.
+        :return: This parser.
+        :raises ValueError: If a column name is not in the header map or
+            max_cardinality is not positive.
+        """
+        if max_cardinality < 1:
+            raise ValueError("max_cardinality must be positive")
+        self.intern_auto = columns is None
+        self.intern_max_cardinality = max_cardinality
+        self.intern_tables = []
+        for column in columns or ():
+            if isinstance(column, str):
+                if not self.header_map or column not in self.header_map:
+                    raise ValueError(f"Mapping for {column} not found")
+                column = self.header_map[column]
+            if column >= len(self.intern_tables):
+                self.intern_tables.extend([None] * (column + 1 - len(self.intern_tables)))
+            self.intern_tables[column] = {}
+        return self
+
+    def enable_field_sink(self, threshold=1024 * 1024, columns=None, sink_factory=None):
+        """
+        Writes large field values to sinks instead of keeping them in records.
+
+        A field longer than threshold characters, or any field of the given
+        columns, is written to a sink while it is being read, and the record
+        holds a FieldHandle in its place. Handles are owned by the caller,
+        who should close them when done. Values are trimmed and read as null
+        as they are without a sink, the length compared to threshold is that
+        of the trimmed value, and nulls and comments never go to a sink.
+
+        :param threshold: The length above which a value goes to a sink.
+        :param columns: The names or 0-based indexes of columns whose values
+            always go to a sink.
+        :param sink_factory: Called with the record number and 0-based column
+            of the field, returns a writable text stream. Defaults to
+            FieldHandle.temporary_file.
+        :return: This parser.
+        :raises ValueError: If a column name is not in the header map or the
+            threshold is negative.
+        """
+        if threshold < 0:
+            raise ValueError("threshold must not be negative")
+        indexes = set()
+        for column in columns or ():
+            if isinstance(column, str):
+                if not self.header_map or column not in self.header_map:
+                    raise ValueError(f"Mapping for {column} not found")
+                column = self.header_map[column]
+            indexes.add(column)
+        token = FieldSinkToken(threshold, sink_factory or FieldHandle.temporary_file,
+                               self.format.trim, self.format.get_ignore_surrounding_spaces(),
+                               self.format.null_string)
+        token.record_number = self.record_number + 1
+        token.force = 0 in indexes
+        self.reusable_token = token
+        self.field_columns = indexes
+        return self
+
+    def enable_wide_rows(self):
+        """
+        Switches to a record loop tuned for records with thousands of fields.
+
+        Values are written into a list preallocated to the width of the header,
+        or of the previous record, and handed to the CSVRecord without being
+        copied. The per-field settings of the format are looked up once per
+        record instead of once per field. Records are the same as those of the
+        default loop. The default loop is kept while a field sink is enabled.
+
+        :return: This parser.
+        """
+        self.wide_rows = True
+        self.wide_width = len(self.header_map) if self.header_map else 0
+        return self
+
     def get_current_line_number(self):
         """
         Returns the current line number in the input stream.
@@ -159,6 +374,21 @@ class CSVParser(Closeable):
         """
         return self.header_map.copy() if self.header_map else None
 
+    def get_header_names(self):
+        """
+        Returns the column names indexed by column, built once from the header
+        map and shared by all callers.
+
+        :return: A list with the name of each column, None for unnamed
+            columns, or None if the format defines no header.
+        """
+        if self.header_names is None and self.header_map:
+            names = [None] * (max(self.header_map.values()) + 1)
+            for name, index in self.header_map.items():
+                names[index] = name
+            self.header_names = names
+        return self.header_names
+
     def get_record_number(self):
         """
         Returns the current record number in the input stream.
@@ -193,6 +423,43 @@ class CSVParser(Closeable):
         
         return records
 
+    def get_records_spilling(self, max_bytes=64 * 1024 * 1024, batch_size=1000):
+        """
+        Like get_records(), but keeps at most max_bytes of records in memory
+        and spills older batches to a temporary file.
+
+        :param max_bytes: The memory budget for records.
+        :param batch_size: The number of records spilled at once.
+        :return: A SpillingRecordList supporting len(), indexing and
+            iteration. Close it to delete the temporary file.
+        :raises IOError: On parse error or input read-failure
+        """
+        records = SpillingRecordList(max_bytes, batch_size)
+        try:
+            while True:
+                rec = self.next_record()
+                if rec is None:
+                    break
+                records.append(rec)
+        except IOError as e:
+            records.close()
+            raise IOError(f"Error parsing CSV data: {e}")
+        return records
+
+    def sample(self, k, column=None, seed=None):
+        """
+        Returns a uniform random sample of the remaining records, reading
+        them in one pass and keeping only the sample in memory.
+
+        :param k: The sample size, per distinct value of column if given.
+        :param column: The name or index of the column to stratify by.
+        :param seed: The seed of the random generator, for repeatable samples.
+        :return: The list of sampled CSVRecords, in file order.
+        :raises IOError: On parse error or input read-failure
+        """
+        from main.python.csv_sampler import CSVSampler
+        return CSVSampler.sample(self, k, column, seed)
+
     def initialize_header(self):
         """
         Initializes the name to index mapping if the format defines a header.
@@ -282,8 +549,121 @@ class CSVParser(Closeable):
 
         def remove(self):
             raise NotImplementedError("remove() method is not supported")
+
+    class ReadAheadRecordIterator(Iterator):
+        END = object()
+
+        def __init__(self, csv_parser, queue_size, batch_size):
+            self.csv_parser = csv_parser
+            self.batch_size = batch_size
+            self.queue = queue.Queue(queue_size)
+            self.stopped = threading.Event()
+            self.finished = False
+            self.batch = []
+            self.position = 0
+            self.thread = threading.Thread(
+                target=self._produce, name="CSVParser-read-ahead", daemon=True
+            )
+            self.thread.start()
+
+        def _put(self, item):
+            while not self.stopped.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def _produce(self):
+            batch = []
+            try:
+                while not self.stopped.is_set():
+                    record = self.csv_parser.next_record()
+                    if record is None:
+                        break
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        if not self._put(batch):
+                            return
+                        batch = []
+                end = CSVParser.ReadAheadRecordIterator.END
+            except BaseException as e:
+                # Records parsed before the error are still delivered first
+                end = e
+            if batch and not self._put(batch):
+                return
+            self._put(end)
+
+        def has_next(self):
+            if self.position < len(self.batch):
+                return True
+            if self.finished:
+                return False
+            item = self.queue.get()
+            if item is CSVParser.ReadAheadRecordIterator.END:
+                self.finished = True
+                return False
+            if isinstance(item, BaseException):
+                self.finished = True
+                raise item
+            self.batch = item
+            self.position = 0
+            return True
+
+        def __next__(self):
+            if not self.has_next():
+                raise StopIteration("No more CSV records available")
+            record = self.batch[self.position]
+            self.position += 1
+            return record
+
+        def shutdown(self):
+            """
+            Stops the producer thread and discards records parsed ahead.
+            """
+            self.stopped.set()
+            self.thread.join()
+            # Wake up a consumer blocked on the queue
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.queue.put_nowait(CSVParser.ReadAheadRecordIterator.END)
+            self.finished = True
+            self.batch = []
+            self.position = 0
+
+        def remove(self):
+            raise NotImplementedError("remove() method is not supported")
         
+    def check_limits(self, start_char_position, column_count):
+        """
+        Fails if the record being parsed exceeds a limit of the format.
+
+        :param start_char_position: The position at which the record started.
+        :param column_count: The number of values parsed so far.
+        :raises IOError: If the record has too many values or is too long.
+        """
+        max_columns = self.format.get_max_columns()
+        if max_columns is not None and column_count > max_columns:
+            raise IOError(
+                f"(line {self.get_current_line_number()}) record exceeds the "
+                f"maximum of {max_columns} columns"
+            )
+        max_record_size = self.format.get_max_record_size()
+        if max_record_size is not None and \
+                self.lexer.get_character_position() + self.character_offset \
+                - start_char_position > max_record_size:
+            raise IOError(
+                f"(line {self.get_current_line_number()}) record exceeds the "
+                f"maximum size of {max_record_size} characters"
+            )
+
     def next_record(self):
+        if self.wide_rows and self.field_columns is None:
+            return self._next_wide_record()
         self.record_list.clear()
         sb = None   
         result = None
@@ -297,11 +677,9 @@ class CSVParser(Closeable):
                 self.add_record_value(False)
             elif self.reusable_token.get_type() == Token.Type.EORECORD:
                 self.add_record_value(True)
-                break
             elif self.reusable_token.get_type() == Token.Type.EOF:
                 if self.reusable_token.is_ready:
                     self.add_record_value(True)
-                break
             elif self.reusable_token.get_type() == Token.Type.INVALID:
                 raise IOError(f"(line {self.get_current_line_number()}) invalid parse sequence")
             elif self.reusable_token.get_type() == Token.Type.COMMENT:
@@ -313,6 +691,8 @@ class CSVParser(Closeable):
                 self.reusable_token.set_type(Token.Type.TOKEN)  # Read another token
             else:
                 raise ValueError(f"Unexpected Token type: {self.reusable_token.get_type()}")
+            if self.limited:
+                self.check_limits(start_char_position, len(self.record_list))
             
             if self.reusable_token.get_type() != Token.Type.TOKEN:
                 break
@@ -324,3 +704,70 @@ class CSVParser(Closeable):
                                self.record_number, start_char_position)
 
         return result
+
+    def _next_wide_record(self):
+        token = self.reusable_token
+        next_token = self.lexer.next_token
+        TOKEN = Token.Type.TOKEN
+        EORECORD = Token.Type.EORECORD
+        EOF = Token.Type.EOF
+        COMMENT = Token.Type.COMMENT
+        trim = self.format.trim
+        trailing_delimiter = self.format.get_trailing_delimiter()
+        null_string = self.format.null_string
+        intern = self.intern_tables is not None
+
+        width = self.wide_width
+        values = PrettyList([None] * width)
+        count = 0
+        sb = None
+        start_char_position = self.lexer.get_character_position() + self.character_offset
+
+        while True:
+            token.reset()
+            next_token(token)
+            token_type = token.type
+
+            if token_type is TOKEN or token_type is EORECORD or \
+                    (token_type is EOF and token.is_ready):
+                content = token.content
+                if trim:
+                    content = content.strip()
+                if token_type is TOKEN or content != "" or not trailing_delimiter:
+                    if content == null_string:
+                        content = None
+                    elif intern:
+                        content = self._intern(count, content)
+                    if count < width:
+                        values[count] = content
+                    else:
+                        values.append(content)
+                    count += 1
+                if self.limited:
+                    self.check_limits(start_char_position, count)
+                if token_type is TOKEN:
+                    continue
+                break
+            elif token_type is EOF:
+                break
+            elif token_type is COMMENT:
+                if sb is None:
+                    sb = []
+                else:
+                    sb.append(Constants.LF)
+                sb.append(token.content)
+            elif token_type is Token.Type.INVALID:
+                raise IOError(f"(line {self.get_current_line_number()}) invalid parse sequence")
+            else:
+                raise ValueError(f"Unexpected Token type: {token_type}")
+
+        if count == 0:
+            return None
+        if count < width:
+            del values[count:]
+        if not self.header_map:
+            self.wide_width = count
+        self.record_number += 1
+        comment = "".join(sb) if sb else None
+        return CSVRecord._of(values, self.header_map, comment,
+                             self.record_number, start_char_position)
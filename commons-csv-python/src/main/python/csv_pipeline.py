@@ -0,0 +1,111 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from main.python.csv_record_batch import CSVRecordBatch
+
+
+def _transform_batch(transform, records):
+    results = []
+    for record in records:
+        result = transform(record)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+class CSVPipeline:
+    def __init__(self, parser, transform, printer=None, use_processes=False,
+                 max_workers=None, batch_size=1000, max_in_flight=None,
+                 executor=None):
+        """
+        Runs a per-record transform over a parser's records on a pool.
+
+        Records are handed to the pool in batches and the results come back
+        in the original record order. At most max_in_flight batches are
+        submitted but not yet consumed, which bounds the memory used.
+
+        The transform receives a CSVRecord and returns the values to print,
+        or None to drop the record. With a process pool, the transform must
+        be picklable, e.g. a module-level function.
+
+        :param parser: The CSVParser supplying the records. Must not be None.
+        :param transform: The per-record transform. Must not be None.
+        :param printer: Optional CSVPrinter the results are printed to.
+        :param use_processes: Whether to use a process pool instead of a
+            thread pool. Ignored if executor is given.
+        :param max_workers: Number of workers of the pool created.
+        :param batch_size: Number of records per submitted batch.
+        :param max_in_flight: Maximum number of pending batches, defaults to
+            twice the number of workers.
+        :param executor: An existing concurrent.futures.Executor to use. It is
+            not shut down by the pipeline.
+        :raises ValueError: If parser or transform is None, or a size is not
+            positive.
+        """
+        if parser is None or transform is None:
+            raise ValueError("parser and transform must not be None")
+        if batch_size < 1 or (max_in_flight is not None and max_in_flight < 1):
+            raise ValueError("batch_size and max_in_flight must be positive")
+
+        self.parser = parser
+        self.transform = transform
+        self.printer = printer
+        self.use_processes = use_processes
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.executor = executor
+
+    def _create_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(self.max_workers)
+        return ThreadPoolExecutor(self.max_workers)
+
+    def results(self):
+        """
+        Yields the transformed records in their original order.
+
+        :return: A generator over the non-None transform results.
+        """
+        executor = self.executor or self._create_executor()
+        in_flight = deque()
+        try:
+            batch = []
+            for record in self.parser:
+                batch.append(record)
+                if len(batch) < self.batch_size:
+                    continue
+                in_flight.append(
+                    executor.submit(
+                        _transform_batch, self.transform, CSVRecordBatch(batch)
+                    )
+                )
+                batch = []
+                while len(in_flight) >= self.max_in_flight:
+                    yield from in_flight.popleft().result()
+            if batch:
+                in_flight.append(
+                    executor.submit(
+                        _transform_batch, self.transform, CSVRecordBatch(batch)
+                    )
+                )
+            while in_flight:
+                yield from in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if self.executor is None:
+                executor.shutdown()
+
+    def run(self):
+        """
+        Runs the pipeline to completion, printing results if a printer is set.
+
+        :return: The number of results produced.
+        """
+        count = 0
+        for result in self.results():
+            if self.printer is not None:
+                self.printer.print_record(result)
+            count += 1
+        return count
@@ -0,0 +1,315 @@
+import math
+import re
+from datetime import datetime
+from main.python.column_type import ColumnType
+
+
+class HyperLogLog:
+    def __init__(self, precision=12):
+        """
+        Approximate distinct counter with a fixed memory footprint.
+
+        Uses 2 ** precision one-byte registers, the standard error of the
+        estimate is about 1.04 / sqrt(2 ** precision). Values are hashed with
+        hash(), so estimates of different processes cannot be merged.
+
+        :param precision: The number of index bits, between 4 and 16.
+        :raises ValueError: If precision is out of range.
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self.rank_bits = 64 - precision
+        self.rank_mask = (1 << self.rank_bits) - 1
+
+    def add(self, value):
+        h = hash(value) & 0xFFFFFFFFFFFFFFFF
+        index = h >> self.rank_bits
+        rank = self.rank_bits - (h & self.rank_mask).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+class FrequentValues:
+    def __init__(self, capacity):
+        """
+        Approximate most frequent values with bounded memory.
+
+        Counts at most 2 * capacity values. When more are seen, the counts
+        are lowered by the count of the capacity-th most frequent value and
+        values dropping to zero are forgotten. Reported counts are therefore
+        lower bounds, which are exact until the first such compaction.
+
+        :param capacity: The number of values guaranteed to be kept.
+        """
+        self.capacity = capacity
+        self.counts = {}
+        self.exact = True
+
+    def add(self, value):
+        counts = self.counts
+        counts[value] = counts.get(value, 0) + 1
+        if len(counts) > 2 * self.capacity:
+            threshold = sorted(counts.values(), reverse=True)[self.capacity]
+            self.counts = {v: c - threshold for v, c in counts.items() if c > threshold}
+            self.exact = False
+
+    def top(self, k):
+        """
+        :param k: The number of values to return.
+        :return: Up to k (value, count) pairs, most frequent first.
+        """
+        return sorted(self.counts.items(), key=lambda item: -item[1])[:k]
+
+
+class ColumnStats:
+    INT_PATTERN = re.compile(r"[+-]?\d+")
+    FLOAT_PATTERN = re.compile(r"[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?")
+    DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}([T ].*)?")
+    BOOL_VALUES = {"true", "false"}
+    NUMERIC = {ColumnType.INT, ColumnType.FLOAT}
+
+    def __init__(self, name, index, top_k, precision):
+        """
+        Statistics of one column, updated value by value.
+
+        :param name: The column name, None if the column has no header.
+        :param index: The 0-based column index.
+        :param top_k: The number of most frequent values to report.
+        :param precision: The HyperLogLog precision of the distinct count.
+        """
+        self.name = name
+        self.index = index
+        self.top_k = top_k
+        self.count = 0
+        self.non_null_count = 0
+        self.min_length = None
+        self.max_length = None
+        self.candidates = {ColumnType.BOOL, ColumnType.INT,
+                           ColumnType.FLOAT, ColumnType.DATE}
+        self.minimum = None
+        self.maximum = None
+        self.total = 0
+        self.distinct = HyperLogLog(precision)
+        self.frequent = FrequentValues(max(64, 8 * top_k))
+
+    @staticmethod
+    def _is_date(value):
+        if not ColumnStats.DATE_PATTERN.fullmatch(value):
+            return False
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return False
+        return True
+
+    def add(self, value):
+        """
+        Adds a non-null value.
+
+        :param value: The value.
+        """
+        self.non_null_count += 1
+        length = len(value)
+        if self.min_length is None or length < self.min_length:
+            self.min_length = length
+        if self.max_length is None or length > self.max_length:
+            self.max_length = length
+        self.distinct.add(value)
+        self.frequent.add(value)
+
+        candidates = self.candidates
+        if not candidates:
+            return
+        if candidates & ColumnStats.NUMERIC:
+            number = None
+            if ColumnType.INT in candidates and ColumnStats.INT_PATTERN.fullmatch(value):
+                number = int(value)
+            elif ColumnStats.FLOAT_PATTERN.fullmatch(value):
+                number = float(value)
+                candidates.discard(ColumnType.INT)
+            else:
+                candidates -= ColumnStats.NUMERIC
+                self.minimum = self.maximum = None
+            if number is not None:
+                # Numbers are neither booleans nor dates
+                candidates.discard(ColumnType.BOOL)
+                candidates.discard(ColumnType.DATE)
+                if self.minimum is None or number < self.minimum:
+                    self.minimum = number
+                if self.maximum is None or number > self.maximum:
+                    self.maximum = number
+                self.total += number
+                return
+        if ColumnType.BOOL in candidates and value.lower() not in ColumnStats.BOOL_VALUES:
+            candidates.discard(ColumnType.BOOL)
+        if ColumnType.DATE in candidates and not ColumnStats._is_date(value):
+            candidates.discard(ColumnType.DATE)
+
+    def get_name(self):
+        return self.name
+
+    def get_index(self):
+        return self.index
+
+    def get_count(self):
+        return self.count
+
+    def get_null_count(self):
+        """
+        :return: The number of records in which the value is null, i.e. equal
+            to the format's null string, or missing.
+        """
+        return self.count - self.non_null_count
+
+    def get_min_length(self):
+        return self.min_length
+
+    def get_max_length(self):
+        return self.max_length
+
+    def get_type(self):
+        """
+        Returns the most specific type all non-null values conform to.
+
+        :return: The ColumnType, or None if the column has no non-null values.
+        """
+        if not self.non_null_count:
+            return None
+        for column_type in (ColumnType.INT, ColumnType.FLOAT,
+                            ColumnType.BOOL, ColumnType.DATE):
+            if column_type in self.candidates:
+                return column_type
+        return ColumnType.STRING
+
+    def _is_numeric(self):
+        return self.get_type() in ColumnStats.NUMERIC
+
+    def get_min(self):
+        return self.minimum if self._is_numeric() else None
+
+    def get_max(self):
+        return self.maximum if self._is_numeric() else None
+
+    def get_mean(self):
+        return self.total / self.non_null_count if self._is_numeric() else None
+
+    def get_distinct_count(self):
+        """
+        :return: The approximate number of distinct non-null values.
+        """
+        if self.frequent.exact:
+            return len(self.frequent.counts)
+        return self.distinct.count()
+
+    def get_top_values(self):
+        """
+        :return: Up to top_k (value, count) pairs, most frequent first. The
+            counts are lower bounds for columns with many distinct values.
+        """
+        return self.frequent.top(self.top_k)
+
+    def to_map(self):
+        column_type = self.get_type()
+        return {
+            "name": self.name,
+            "index": self.index,
+            "count": self.get_count(),
+            "null_count": self.get_null_count(),
+            "min_length": self.min_length,
+            "max_length": self.max_length,
+            "type": column_type.value if column_type is not None else None,
+            "min": self.get_min(),
+            "max": self.get_max(),
+            "mean": self.get_mean(),
+            "distinct_count": self.get_distinct_count(),
+            "top_values": self.get_top_values(),
+        }
+
+    def __repr__(self):
+        return f"ColumnStats({self.to_map()})"
+
+
+class CSVProfiler:
+    def __init__(self, header_map=None, top_k=10, precision=12):
+        """
+        Computes per-column statistics in a single pass over the records.
+
+        Memory is bounded per column: the distinct count is a HyperLogLog
+        estimate and the most frequent values are tracked approximately, so
+        no values are kept beyond a fixed number per column.
+
+        :param header_map: The header map naming the columns, may be None.
+        :param top_k: The number of most frequent values reported per column.
+        :param precision: The HyperLogLog precision, see HyperLogLog.
+        :raises ValueError: If top_k is negative.
+        """
+        if top_k < 0:
+            raise ValueError("top_k must not be negative")
+        self.names = {}
+        if header_map:
+            self.names = {index: name for name, index in header_map.items()}
+        self.top_k = top_k
+        self.precision = precision
+        self.columns = []
+        self.record_count = 0
+
+    @staticmethod
+    def profile(parser, top_k=10, precision=12):
+        """
+        Profiles all remaining records of a parser.
+
+        :param parser: The CSVParser.
+        :param top_k: The number of most frequent values reported per column.
+        :param precision: The HyperLogLog precision, see HyperLogLog.
+        :return: The list of ColumnStats, in column order.
+        :raises IOError: On parse error or input read-failure.
+        """
+        profiler = CSVProfiler(parser.get_header_map(), top_k, precision)
+        for record in parser:
+            profiler.add(record)
+        return profiler.get_columns()
+
+    def add(self, record):
+        columns = self.columns
+        values = record._values
+        while len(columns) < len(values):
+            index = len(columns)
+            columns.append(ColumnStats(self.names.get(index), index,
+                                       self.top_k, self.precision))
+        for column, value in zip(columns, values):
+            if value is not None:
+                column.add(value)
+        self.record_count += 1
+
+    def get_columns(self):
+        """
+        Returns the statistics of every column seen so far.
+
+        Columns named by the header map are included even if no record had
+        a value for them.
+
+        :return: The list of ColumnStats, in column order.
+        """
+        if self.names:
+            while len(self.columns) <= max(self.names):
+                index = len(self.columns)
+                self.columns.append(ColumnStats(self.names.get(index), index,
+                                                self.top_k, self.precision))
+        for column in self.columns:
+            column.count = self.record_count
+        return list(self.columns)
+
+    def get_record_count(self):
+        return self.record_count
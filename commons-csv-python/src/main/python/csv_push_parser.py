@@ -0,0 +1,132 @@
+import codecs
+from io import StringIO
+from main.python.csv_parser import CSVParser
+from main.python.extended_buffered_reader import ExtendedBufferedReader
+from main.python.lexer import Lexer
+from main.python.record_boundary_scanner import RecordBoundaryScanner
+
+
+class CSVPushParser(CSVParser):
+    def __init__(self, format, charset="utf-8", character_offset=0,
+                 record_number=1, header_map=None):
+        """
+        CSV parser that is fed with chunks of input instead of reading them.
+
+        Each call to feed() returns the records that were completed by the
+        chunk. Partial records, including quoted fields spanning several
+        chunks, are carried over until the rest of their input arrives.
+        Only the incomplete tail of the input is buffered.
+
+        :param format: The CSVFormat used for CSV parsing. Must not be None.
+        :param charset: The charset used to decode chunks given as bytes.
+        :param character_offset: Lexer offset when the parser does not start
+            parsing at the beginning of the source.
+        :param record_number: The next record number to assign.
+        :param header_map: A header map to use instead of the one defined by
+            the format, for example when resuming in the middle of a source.
+            No header record is read from the input if it is given.
+        :raises ValueError: If the format is None.
+        """
+        if format is None:
+            raise ValueError("format must not be None")
+
+        self.decoder = codecs.getincrementaldecoder(charset)()
+        self.scanner = RecordBoundaryScanner(format)
+        self.pending = []
+        self.pending_offset = 0
+        self.base_offset = character_offset
+        self.line_count = 0
+        self.first_eol = None
+        self.closed = False
+        self.preset_header_map = header_map
+        format_header = format.get_header()
+        self.header_pending = (
+            header_map is None
+            and format_header is not None
+            and (len(format_header) == 0 or format.get_skip_header_record())
+        )
+        super().__init__(StringIO(), format, character_offset, record_number)
+
+    def initialize_header(self):
+        if self.preset_header_map is not None:
+            return self.preset_header_map
+        if self.header_pending:
+            # Deferred until the first record has been fed
+            return None
+        return super().initialize_header()
+
+    def feed(self, chunk):
+        """
+        Adds the next chunk of input.
+
+        :param chunk: The next chunk, as str or as bytes in the parser's charset.
+        :return: The records completed by this chunk, may be empty.
+        :raises IOError: On parse error or if the parser is closed.
+        """
+        if self.closed:
+            raise IOError("CSVPushParser has been closed")
+        if not isinstance(chunk, str):
+            chunk = self.decoder.decode(chunk)
+        return self._push(chunk, False)
+
+    def close(self):
+        """
+        Signals the end of input and closes the parser.
+
+        :return: The records held back until the end of input, may be empty.
+        :raises IOError: On parse error, e.g. an unterminated quoted field.
+        """
+        if self.closed:
+            return []
+        try:
+            return self._push(self.decoder.decode(b"", True), True)
+        finally:
+            self.closed = True
+            self.pending = []
+            self.lexer.close()
+
+    def is_closed(self):
+        return self.closed
+
+    def get_first_end_of_line(self):
+        return self.first_eol
+
+    def _push(self, text, final):
+        boundaries = self.scanner.scan(text, final)
+        if text:
+            self.pending.append(text)
+        if not boundaries and not final:
+            return []
+
+        buffered = "".join(self.pending)
+        cut = len(buffered) if final else boundaries[-1] - self.pending_offset
+        complete = buffered[:cut]
+        self.pending = [buffered[cut:]] if cut < len(buffered) else []
+        offset = self.pending_offset
+        self.pending_offset += cut
+        return self._parse_slice(complete, offset, final)
+
+    def _parse_slice(self, text, offset, final):
+        reader = ExtendedBufferedReader(StringIO(text))
+        reader._eol_counter = self.line_count
+        self.lexer = Lexer(self.format, reader)
+        self.character_offset = self.base_offset + offset
+
+        if self.header_pending:
+            header_record_number = self.record_number
+            header_map = super().initialize_header()
+            if self.record_number != header_record_number or final:
+                self.header_pending = False
+                self.header_map = header_map
+
+        records = []
+        while True:
+            record = self.next_record()
+            if record is None:
+                break
+            records.append(record)
+
+        self.line_count = reader._eol_counter
+        if self.first_eol is None:
+            self.first_eol = self.lexer.get_first_eol()
+        return records
@@ -22,6 +22,26 @@ class CSVRecord:
         self.comment = comment
         self.character_position = character_position
 
+    @staticmethod
+    def _of(values, mapping, comment, record_number, character_position):
+        # Takes ownership of a PrettyList instead of copying it
+        record = CSVRecord.__new__(CSVRecord)
+        record.record_number = record_number
+        record._values = values
+        record.mapping = mapping
+        record.comment = comment
+        record.character_position = character_position
+        return record
+
+    def __reduce__(self):
+        # Plain list and positional state instead of the PrettyList subclass
+        # and the instance dict, which keeps pickles small
+        return (
+            CSVRecord,
+            (list(self._values), self.mapping, self.comment,
+             self.record_number, self.character_position),
+        )
+
     def get(self, e):
         if isinstance(e, str):
             return self.get_by_name(e)
@@ -88,7 +108,7 @@ class CSVRecord:
             else 0
         )
 
-        return self.mapping == None or len_mapping == self._len_values()
+        return self.mapping is None or len_mapping == self._len_values()
 
     def has_comment(self) -> bool:
         return self.comment != None
@@ -102,12 +122,21 @@ class CSVRecord:
     def __iter__(self) -> iter:
         return iter(self.to_list())
 
-    def __put_in_python(self, map_: dict) -> dict:
-        if self.mapping == None:
+    def __put_in_python(self, map_: dict, columns=None) -> dict:
+        if self.mapping is None:
+            return map_
+        values = self._values
+        size = self._len_values()
+        if columns is not None:
+            mapping = self.mapping
+            for name in columns:
+                col = mapping.get(name)
+                if col is not None and col < size:
+                    map_[name] = values[col]
             return map_
         for name, col in self.mapping.items():
-            if col < self._len_values():
-                map_[name] = self._values[col]
+            if col < size:
+                map_[name] = values[col]
         return map_
 
     def __put_in_java(self, map_):
@@ -125,9 +154,18 @@ class CSVRecord:
                     map_[name] = self._values[col]
         return map_
 
-    def put_in(self, map_: dict) -> dict:
-        if isinstance(map_, dict):
-            return self.__put_in_python(map_)
+    def put_in(self, map_: dict, columns=None) -> dict:
+        """
+        Puts the mapped values of this record into a map.
+
+        :param map_: The map to populate.
+        :param columns: The names of the columns to put, None for all mapped
+            columns. Limiting the columns keeps the cost independent of the
+            width of the record.
+        :return: The given map.
+        """
+        if isinstance(map_, dict) or columns is not None:
+            return self.__put_in_python(map_, columns)
         else:
             return self.__put_in_java(map_)
 
@@ -137,8 +175,8 @@ class CSVRecord:
     def to_list(self) -> list:
         return list(self._values)
 
-    def to_map(self) -> dict:
-        return self.put_in({})
+    def to_map(self, columns=None) -> dict:
+        return self.put_in({}, columns)
 
     def __str__(self) -> str:
         return (
@@ -0,0 +1,115 @@
+from array import array
+from main.python.csv_record import CSVRecord
+
+
+def _narrow(values):
+    # Smallest unsigned array type able to hold all values
+    largest = max(values, default=0)
+    for typecode in ("B", "H", "I", "Q"):
+        if largest < 1 << (8 * array(typecode).itemsize):
+            return array(typecode, values)
+    raise OverflowError("value too large to pack")
+
+
+class CSVRecordBatch:
+    def __init__(self, records):
+        """
+        A sequence of CSVRecords with a compact pickled form.
+
+        When pickled, the values of all records are packed into a single
+        string plus an array of value lengths, and header maps shared by
+        several records are written once. This keeps the cost of sending
+        records to other processes low. Unknown record numbers and positions
+        are kept as None, and batches holding values other than strings,
+        such as FieldHandles, are pickled as plain lists of records.
+
+        :param records: The CSVRecords of the batch.
+        """
+        self.records = list(records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __reduce__(self):
+        mappings = []
+        mapping_ids = {}
+        mapping_indexes = []
+        sizes = []
+        record_numbers = []
+        positions = []
+        lengths = []
+        comments = {}
+        heap = []
+
+        for i, record in enumerate(self.records):
+            mapping = record.mapping
+            index = mapping_ids.get(id(mapping))
+            if index is None:
+                index = mapping_ids[id(mapping)] = len(mappings)
+                mappings.append(mapping)
+            mapping_indexes.append(index)
+            if record.comment is not None:
+                comments[i] = record.comment
+            record_numbers.append(record.record_number)
+            positions.append(record.character_position)
+            values = record._values
+            sizes.append(len(values))
+            for value in values:
+                if value is None:
+                    # Lengths are stored off by one, 0 stands for None
+                    lengths.append(0)
+                elif not isinstance(value, str):
+                    return CSVRecordBatch, (self.records,)
+                else:
+                    lengths.append(len(value) + 1)
+                    heap.append(value)
+
+        # Records read from the end of a file have no numbers and positions,
+        # those are kept as lists
+        first_number = 0
+        if None not in record_numbers:
+            first_number = record_numbers[0] if record_numbers else 0
+            if record_numbers == list(range(first_number, first_number + len(record_numbers))):
+                record_numbers = None
+        if None not in positions:
+            if min(positions, default=0) < 0:
+                positions = array("q", positions)
+            else:
+                positions = _narrow(positions)
+
+        return (
+            CSVRecordBatch._unpack,
+            (mappings, _narrow(mapping_indexes) if len(mappings) > 1 else None,
+             _narrow(sizes), first_number, record_numbers, positions,
+             _narrow(lengths), "".join(heap), comments),
+        )
+
+    @staticmethod
+    def _unpack(mappings, mapping_indexes, sizes, first_number, record_numbers,
+                positions, lengths, heap, comments):
+        records = []
+        value_index = 0
+        offset = 0
+        for i, size in enumerate(sizes):
+            values = []
+            for length in lengths[value_index:value_index + size]:
+                if length == 0:
+                    values.append(None)
+                else:
+                    values.append(heap[offset:offset + length - 1])
+                    offset += length - 1
+            value_index += size
+            records.append(CSVRecord(
+                values,
+                mappings[mapping_indexes[i] if mapping_indexes else 0],
+                comments.get(i),
+                first_number + i if record_numbers is None else record_numbers[i],
+                positions[i],
+            ))
+        return CSVRecordBatch(records)
@@ -0,0 +1,190 @@
+import math
+import random
+from main.python.csv_push_parser import CSVPushParser
+from main.python.csv_tail import CSVTail
+
+
+class ReservoirSampler:
+    def __init__(self, k, rng=None):
+        """
+        Keeps a uniform random sample of k items from a stream of unknown
+        length.
+
+        Uses Algorithm L: after the reservoir is full, the number of items
+        to skip before the next replacement is drawn directly, so random
+        numbers are only drawn for the O(k log(n/k)) items that are kept.
+
+        :param k: The sample size.
+        :param rng: The random.Random to draw from, a new one if None.
+        :raises ValueError: If k is negative.
+        """
+        if k < 0:
+            raise ValueError("k must not be negative")
+        self.k = k
+        self.rng = rng if rng is not None else random.Random()
+        # (arrival index, item)
+        self.reservoir = []
+        self.count = 0
+        self.w = 1.0
+        self.next_index = 0
+
+    def _draw_next(self):
+        self.w *= math.exp(math.log(1.0 - self.rng.random()) / self.k)
+        skip = math.floor(math.log(1.0 - self.rng.random()) / math.log1p(-self.w)) \
+            if self.w < 1.0 else 0
+        self.next_index += skip + 1
+
+    def add(self, item):
+        index = self.count
+        self.count += 1
+        if len(self.reservoir) < self.k:
+            self.reservoir.append((index, item))
+            if len(self.reservoir) == self.k:
+                self.next_index = index
+                self._draw_next()
+        elif index == self.next_index and self.k > 0:
+            self.reservoir[self.rng.randrange(self.k)] = (index, item)
+            self._draw_next()
+
+    def get_count(self):
+        return self.count
+
+    def get_sample(self):
+        """
+        :return: The sampled items, in stream order.
+        """
+        return [item for _, item in sorted(self.reservoir, key=lambda entry: entry[0])]
+
+
+class CSVSampler:
+    def __init__(self, k, column=None, seed=None):
+        """
+        Samples k records uniformly at random in a single pass, or k records
+        per distinct value of a column when stratifying.
+
+        :param k: The sample size, per stratum if column is given.
+        :param column: The name or index of the column to stratify by.
+        :param seed: The seed of the random generator, for repeatable samples.
+        :raises ValueError: If k is negative.
+        """
+        if k < 0:
+            raise ValueError("k must not be negative")
+        self.k = k
+        self.column = column
+        self.rng = random.Random(seed)
+        self.reservoir = ReservoirSampler(k, self.rng) if column is None else None
+        self.strata = {}
+        self.record_count = 0
+
+    @staticmethod
+    def sample(parser, k, column=None, seed=None):
+        """
+        Samples the remaining records of a parser.
+
+        :param parser: The CSVParser.
+        :param k: The sample size, per stratum if column is given.
+        :param column: The name or index of the column to stratify by.
+        :param seed: The seed of the random generator.
+        :return: The list of sampled CSVRecords, in file order.
+        :raises IOError: On parse error or input read-failure.
+        """
+        sampler = CSVSampler(k, column, seed)
+        for record in parser:
+            sampler.add(record)
+        return sampler.get_sample()
+
+    @staticmethod
+    def sample_indexed(path, charset, format, k, index, seed=None):
+        """
+        Samples k records of a file by seeking to them with an offset index.
+
+        Only the records between each sampled record and the checkpoint
+        before it are parsed, so the cost depends on k and the index
+        interval instead of the size of the file.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the file.
+        :param format: The CSVFormat of the file.
+        :param k: The sample size.
+        :param index: The RecordOffsetIndex of the file.
+        :param seed: The seed of the random generator.
+        :return: The list of sampled CSVRecords, in file order, with their
+            record numbers and character positions.
+        :raises ValueError: If k is negative or the index is not valid for
+            the file.
+        :raises IOError: On parse error or input read-failure.
+        """
+        if k < 0:
+            raise ValueError("k must not be negative")
+        if not index.is_valid_for(path, charset, format):
+            raise ValueError("index is not valid for the file")
+        tail = CSVTail(path, charset, format)
+        numbers = range(tail.first_data_record, index.get_record_count() + 1)
+        wanted = sorted(random.Random(seed).sample(numbers, min(k, len(numbers))))
+
+        groups = {}
+        for number in wanted:
+            groups.setdefault(index.locate(number), []).append(number)
+        header_map = None
+        if any(byte_offset > 0 for _, byte_offset, _ in groups):
+            header_map = tail.get_header_map()
+
+        records = []
+        with open(path, "rb") as f:
+            for (record_number, byte_offset, char_offset), group in sorted(groups.items()):
+                if byte_offset == 0:
+                    parser = CSVPushParser(format, charset)
+                else:
+                    parser = CSVPushParser(format, charset, char_offset,
+                                           record_number, header_map)
+                f.seek(byte_offset)
+                pending = set(group)
+                while pending:
+                    data = f.read(CSVTail.BLOCK_SIZE)
+                    parsed = parser.feed(data) if data else parser.close()
+                    for record in parsed:
+                        if record.get_record_number() in pending:
+                            pending.discard(record.get_record_number())
+                            records.append(record)
+                    if not data:
+                        break
+        return records
+
+    def add(self, record):
+        self.record_count += 1
+        if self.reservoir is not None:
+            self.reservoir.add(record)
+            return
+        column = self.column
+        if isinstance(column, str):
+            if record.mapping is None or column not in record.mapping:
+                raise ValueError(f"Mapping for {column} not found")
+            column = record.mapping[column]
+        values = record._values
+        key = values[column] if column < len(values) else None
+        stratum = self.strata.get(key)
+        if stratum is None:
+            stratum = self.strata[key] = ReservoirSampler(self.k, self.rng)
+        stratum.add(record)
+
+    def get_sample(self):
+        """
+        :return: The sampled CSVRecords of all strata, in file order.
+        """
+        if self.reservoir is not None:
+            return self.reservoir.get_sample()
+        records = [record for stratum in self.strata.values()
+                   for _, record in stratum.reservoir]
+        records.sort(key=lambda record: record.get_record_number())
+        return records
+
+    def get_strata(self):
+        """
+        :return: A dict from column value to the sampled CSVRecords with that
+            value, in the order added. Records without the column are under
+            None. Empty when not stratifying.
+        """
+        return {key: stratum.get_sample() for key, stratum in self.strata.items()}
+
+    def get_record_count(self):
+        return self.record_count
@@ -0,0 +1,201 @@
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from main.python.csv_parser import CSVParser
+from main.python.packed_records import PackedRecordLayout, PackedRecordReader, PackedRecordWriter
+
+
+class CSVSidecar:
+    SUFFIX = ".csvcache"
+    MAGIC = b"CSVS"
+    VERSION = 1
+    PREAMBLE = struct.Struct("<4sHHQQ32s")
+
+    def __init__(self, path, charset, format, sidecar_path=None):
+        """
+        Binary sidecar file caching the parsed records of a CSV file.
+
+        The first open() parses the CSV file and writes its records next to
+        it in the PackedRecordLayout. Later calls memory-map the sidecar and
+        serve records without parsing. The sidecar stores the size and
+        modification time of the CSV file and a fingerprint of the format
+        and charset, and is rebuilt when any of them changes or it was
+        written on a host of the other byte order.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the CSV file.
+        :param format: The CSVFormat used for CSV parsing.
+        :param sidecar_path: Where to store the sidecar, defaults to the CSV
+            file's path with SUFFIX appended.
+        """
+        self.path = Path(path)
+        self.charset = charset
+        self.format = format
+        self.sidecar_path = Path(sidecar_path) if sidecar_path is not None \
+            else self.path.with_name(self.path.name + CSVSidecar.SUFFIX)
+
+    @staticmethod
+    def fingerprint(format, charset):
+        """
+        Returns a digest of every setting that changes the parsed records.
+
+        Unlike hash(format), the digest is stable across processes.
+
+        :param format: The CSVFormat.
+        :param charset: The charset.
+        :return: 32 bytes.
+        """
+        settings = (
+            charset,
+            format.get_delimiter(),
+            format.get_quote_character(),
+            str(format.get_quote_mode()),
+            format.get_comment_marker(),
+            format.get_escape_character(),
+            format.get_ignore_surrounding_spaces(),
+            format.get_ignore_empty_lines(),
+            format.get_null_string(),
+            format.get_header(),
+            format.get_skip_header_record(),
+            format.get_allow_missing_column_names(),
+            format.get_ignore_header_case(),
+            format.get_trim(),
+            format.get_trailing_delimiter(),
+        )
+        return hashlib.sha256(repr(settings).encode("utf-8")).digest()
+
+    def _expected_preamble(self):
+        stat = self.path.stat()
+        return (CSVSidecar.MAGIC, CSVSidecar.VERSION, 0, stat.st_size,
+                stat.st_mtime_ns, CSVSidecar.fingerprint(self.format, self.charset))
+
+    def is_valid(self):
+        """
+        Returns whether the sidecar exists and matches the CSV file and format.
+
+        :return: True if load() would succeed.
+        """
+        start = PackedRecordLayout.align(CSVSidecar.PREAMBLE.size)
+        try:
+            with open(self.sidecar_path, "rb") as f:
+                data = f.read(start + PackedRecordLayout.PREAMBLE.size)
+        except FileNotFoundError:
+            return False
+        if len(data) < CSVSidecar.PREAMBLE.size:
+            return False
+        return CSVSidecar.PREAMBLE.unpack_from(data) == self._expected_preamble() and \
+            PackedRecordLayout.is_readable(data[start:])
+
+    def build(self):
+        """
+        Parses the CSV file and writes the sidecar.
+
+        The sidecar is written to a temporary file first and then moved into
+        place, so readers never see a partial sidecar.
+
+        :return: The SidecarTable of the new sidecar.
+        :raises IOError: On parse error or input read-failure.
+        """
+        preamble = self._expected_preamble()
+        temp_path = self.sidecar_path.with_name(
+            f"{self.sidecar_path.name}.{os.getpid()}.tmp"
+        )
+        try:
+            with open(temp_path, "wb") as out, \
+                    CSVParser.parse(self.path, self.charset, self.format) as parser:
+                out.write(CSVSidecar.PREAMBLE.pack(*preamble))
+                out.write(b"\0" * (PackedRecordLayout.align(out.tell()) - out.tell()))
+                writer = PackedRecordWriter(out, parser.header_map)
+                for record in parser:
+                    writer.write(record)
+                writer.close()
+            os.replace(temp_path, self.sidecar_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return self.load()
+
+    def load(self):
+        """
+        Memory-maps the sidecar.
+
+        :return: The SidecarTable, or None if the sidecar is missing or stale.
+        """
+        if not self.is_valid():
+            return None
+        return SidecarTable(self.sidecar_path)
+
+    def open(self):
+        """
+        Loads the sidecar, building it first if it is missing or stale.
+
+        :return: The SidecarTable.
+        :raises IOError: On parse error or input read-failure.
+        """
+        table = self.load()
+        return table if table is not None else self.build()
+
+
+class SidecarTable:
+    def __init__(self, sidecar_path):
+        """
+        Records of a memory-mapped sidecar file.
+
+        Rows are PackedRecord views with CSVRecord-compatible accessors.
+        Values are decoded from the mapping when they are accessed.
+
+        :param sidecar_path: The path of the sidecar file.
+        """
+        self.file = open(sidecar_path, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        start = PackedRecordLayout.align(CSVSidecar.PREAMBLE.size)
+        self.view = memoryview(self.mmap)[start:]
+        self.reader = PackedRecordReader(self.view)
+
+    def __len__(self):
+        return len(self.reader)
+
+    def __getitem__(self, index):
+        return self.reader[index]
+
+    def __iter__(self):
+        return iter(self.reader)
+
+    def get_header_map(self):
+        return self.reader.get_header_map()
+
+    def column(self, column):
+        """
+        Returns all values of one column.
+
+        :param column: The column name, or its 0-based index.
+        :return: The list of values, None for records too short to have one.
+        :raises ValueError: If the column name is not mapped.
+        """
+        reader = self.reader
+        if isinstance(column, str):
+            if reader.header_map is None or column not in reader.header_map:
+                raise ValueError(f"Mapping for {column} not found")
+            column = reader.header_map[column]
+        starts = reader.record_starts
+        values = []
+        for i in range(len(reader)):
+            value_index = starts[i] + column
+            values.append(reader.value(value_index) if value_index < starts[i + 1] else None)
+        return values
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.release()
+            self.view.release()
+            self.reader = None
+            self.mmap.close()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,243 @@
+import codecs
+import os
+import re
+from collections import Counter
+from main.python.constants import Constants
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+
+
+class CSVSniffer:
+    SAMPLE_SIZE = 64 * 1024
+    MAX_LINES = 200
+    HEADER_ROWS = 20
+    DELIMITERS = (Constants.COMMA, Constants.TAB, ";", Constants.PIPE, ":")
+    QUOTES = (Constants.DOUBLE_QUOTE_CHAR, "'")
+    NUMBER_PATTERN = re.compile(r"[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?")
+
+    def __init__(self, sample_size=SAMPLE_SIZE, charset="utf-8"):
+        """
+        Infers the CSVFormat of an input from a bounded sample.
+
+        Only the first sample_size bytes or characters are looked at, the
+        rest of the input is never read.
+
+        :param sample_size: The maximum size of the sample.
+        :param charset: The charset used to decode files and bytes.
+        :raises ValueError: If sample_size is not positive.
+        """
+        if sample_size < 1:
+            raise ValueError("sample_size must be positive")
+        self.sample_size = sample_size
+        self.charset = charset
+
+    def read_sample(self, source):
+        """
+        Reads the sample of a source.
+
+        :param source: A path (str paths must be given as os.PathLike), a
+            binary or text file-like object, bytes, or the sample text itself.
+        :return: The sample text, cut after its last complete line if the
+            source is larger than the sample.
+        """
+        if isinstance(source, os.PathLike):
+            with open(source, "rb") as f:
+                data = f.read(self.sample_size + 1)
+        elif hasattr(source, "read"):
+            data = source.read(self.sample_size + 1)
+        else:
+            data = source[:self.sample_size + 1]
+        truncated = len(data) > self.sample_size
+        data = data[:self.sample_size]
+        if not isinstance(data, str):
+            # A multibyte sequence may be cut at the end of the sample
+            data = codecs.getincrementaldecoder(self.charset)().decode(data, not truncated)
+        if truncated:
+            end = max(data.rfind(Constants.LF), data.rfind(Constants.CR))
+            if end >= 0:
+                data = data[:end + 1]
+        return data
+
+    @staticmethod
+    def _record_separator(sample):
+        crlf = sample.count(Constants.CRLF)
+        lf = sample.count(Constants.LF) - crlf
+        cr = sample.count(Constants.CR) - crlf
+        if lf > crlf and lf >= cr:
+            return Constants.LF
+        if cr > crlf and cr > lf:
+            return Constants.CR
+        return Constants.CRLF
+
+    @staticmethod
+    def _comment_marker(lines):
+        comments = [line for line in lines if line.startswith(Constants.COMMENT)]
+        if comments and len(comments) < len(lines):
+            return Constants.COMMENT
+        return None
+
+    @staticmethod
+    def _quote_character(sample):
+        best = None
+        best_score = 0
+        for quote in CSVSniffer.QUOTES:
+            q = re.escape(quote)
+            # Quotes at the start and at the end of a field
+            opening = len(re.findall(rf"(?:^|[,\t;|:]) *{q}", sample, re.MULTILINE))
+            closing = len(re.findall(rf"{q} *(?:[,\t;|:]|$)", sample, re.MULTILINE))
+            score = min(opening, closing)
+            if score > best_score:
+                best, best_score = quote, score
+        return best
+
+    @staticmethod
+    def _delimiter(lines):
+        best = None
+        best_consistency = 0
+        for delimiter in CSVSniffer.DELIMITERS:
+            counts = Counter(line.count(delimiter) for line in lines)
+            count, frequency = counts.most_common(1)[0]
+            consistency = frequency / len(lines)
+            # Ties go to the delimiter listed first
+            if count > 0 and consistency > best_consistency:
+                best, best_consistency = delimiter, consistency
+        return best
+
+    @staticmethod
+    def _is_number(value):
+        return CSVSniffer.NUMBER_PATTERN.fullmatch(value) is not None
+
+    @staticmethod
+    def _has_header(rows, allow_missing_names=False):
+        if len(rows) < 2:
+            return False
+        header = rows[0]
+        names = [name for name in header if name]
+        if len(set(names)) != len(names) or not names or \
+                (len(names) != len(header) and not allow_missing_names):
+            return False
+        votes = 0
+        for column, name in enumerate(header):
+            values = [row[column] for row in rows[1:]
+                      if column < len(row) and row[column] is not None]
+            if not name or not values:
+                continue
+            if all(CSVSniffer._is_number(value) for value in values):
+                votes += -1 if CSVSniffer._is_number(name) else 1
+            elif len({len(value) for value in values}) == 1:
+                votes += -1 if len(name) == len(values[0]) else 1
+        return votes > 0
+
+    @staticmethod
+    def _match_predefined(format, match_quote, missing_names=False, empty_lines=False):
+        predefined = (
+            CSVFormat.DEFAULT, CSVFormat.EXCEL, CSVFormat.RFC4180, CSVFormat.TDF,
+            CSVFormat.MYSQL, CSVFormat.POSTGRESQL_CSV, CSVFormat.POSTGRESQL_TEXT,
+            CSVFormat.INFORMIX_UNLOAD, CSVFormat.ORACLE,
+            CSVFormat.INFORMIX_UNLOAD_CSV,
+        )
+
+        def key(f):
+            quote = f.get_quote_character()
+            escape = f.get_escape_character()
+            return (f.get_delimiter(), quote if match_quote else None,
+                    # Escaping the quote with itself is the doubled quote of
+                    # the formats without an escape
+                    None if escape == quote else escape,
+                    f.get_null_string(), f.get_record_separator())
+
+        def preference(f):
+            # DEFAULT, EXCEL and RFC4180 share the key, EXCEL accepts missing
+            # column names and both keep empty lines
+            if f is CSVFormat.EXCEL:
+                return 0 if missing_names else 2
+            if f is CSVFormat.RFC4180:
+                return 0 if empty_lines else 2
+            return 1
+
+        matches = [candidate for candidate in predefined if key(candidate) == key(format)]
+        if not matches:
+            return None
+        # min() keeps the first of equally preferred candidates
+        return min(matches, key=preference)
+
+    def sniff(self, source):
+        """
+        Infers delimiter, quote character, escape character, null string,
+        record separator, comment marker and header presence.
+
+        :param source: See read_sample().
+        :return: A predefined CSVFormat if one matches the sample, otherwise
+            a CSVFormat derived from CSVFormat.DEFAULT. Of the formats that
+            only differ in how they read a header and empty lines, EXCEL is
+            chosen if the first record has empty fields, RFC4180 if the
+            sample has empty lines, and DEFAULT otherwise. The comment
+            marker and header record are applied on top of the matched
+            format.
+        """
+        sample = self.read_sample(source)
+        record_separator = CSVSniffer._record_separator(sample)
+        detected_quote = CSVSniffer._quote_character(sample)
+        quote = detected_quote or Constants.DOUBLE_QUOTE_CHAR
+
+        # Blank out quoted sections, so delimiters and line breaks inside
+        # them are not counted
+        q = re.escape(quote)
+        unquoted = re.sub(rf"{q}(?:[^{q}]|{q}{q})*{q}", quote + quote, sample)
+        lines = [line for line in unquoted.splitlines() if line.strip()]
+        lines = lines[:CSVSniffer.MAX_LINES]
+        comment_marker = CSVSniffer._comment_marker(lines)
+        if comment_marker is not None:
+            lines = [line for line in lines if not line.startswith(comment_marker)]
+        delimiter = (CSVSniffer._delimiter(lines) if lines else None) or Constants.COMMA
+
+        d = re.escape(delimiter)
+        # Tried in order, the last pair is used if no predefined format fits
+        escapes = [None]
+        null_strings = [None]
+        if re.search(rf"\\[{d}{q}\\]", unquoted):
+            escapes = [Constants.BACKSLASH]
+        if re.search(rf"(?:^|{d})\\N(?:{d}|$)", unquoted, re.MULTILINE):
+            null_strings = [Constants.SQL_NULL_STRING]
+            escapes = [None, Constants.BACKSLASH] if escapes == [None] else escapes
+        elif detected_quote is not None and all(
+                not field.strip() or field.strip().startswith(quote)
+                for line in lines for field in line.split(delimiter)):
+            # All values quoted, the empty fields may be nulls
+            null_strings = [Constants.EMPTY, None]
+        missing_names = bool(lines) and any(
+            not field.strip() for field in lines[0].split(delimiter))
+        empty_lines = any(not line for line in unquoted.splitlines())
+
+        for null_string in null_strings:
+            for escape in escapes:
+                format = (
+                    CSVFormat.DEFAULT.with_delimiter(delimiter)
+                    .with_quote(quote)
+                    .with_escape(escape)
+                    .with_null_string(null_string)
+                    .with_record_separator(record_separator)
+                )
+                # Without quotes in the sample any quote character fits
+                match = CSVSniffer._match_predefined(
+                    format, detected_quote is not None, missing_names, empty_lines)
+                if match is not None:
+                    break
+            if match is not None:
+                format = match
+                break
+        if comment_marker is not None:
+            format = format.with_comment_marker(comment_marker)
+
+        rows = []
+        try:
+            for record in CSVParser.parse(sample, format):
+                rows.append(record.to_list())
+                if len(rows) == CSVSniffer.HEADER_ROWS:
+                    break
+        except IOError:
+            # The sample may end inside a quoted field
+            pass
+        if CSVSniffer._has_header(rows, format.get_allow_missing_column_names()):
+            format = format.with_first_record_as_header()
+        return format
@@ -0,0 +1,307 @@
+import heapq
+import math
+import os
+import pickle
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from main.python.column_type import ColumnType
+from main.python.csv_parser import CSVParser
+from main.python.csv_printer import CSVPrinter
+
+_NULL = (0,)
+_ROWS_PER_PICKLE = 1000
+
+
+class _Descending:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def _convert(value, type):
+    if value is None:
+        return _NULL
+    try:
+        if type is ColumnType.STRING:
+            return 2, value
+        if type is ColumnType.INT:
+            return 2, int(value)
+        if type is ColumnType.FLOAT:
+            number = float(value)
+            if not math.isnan(number):
+                return 2, number
+        elif type is ColumnType.DATE:
+            date = datetime.fromisoformat(value)
+            if date.tzinfo is not None:
+                date = date.astimezone(timezone.utc).replace(tzinfo=None)
+            return 2, date
+        elif type is ColumnType.BOOL:
+            lower = value.lower()
+            if lower in ("true", "false"):
+                return 2, lower == "true"
+    except ValueError:
+        pass
+    # Values that do not parse as the type sort between nulls and the rest
+    return 1, value
+
+
+def _row_key(keys):
+    def key(row):
+        result = []
+        for index, type, reverse in keys:
+            value = _convert(row[index] if index < len(row) else None, type)
+            result.append(_Descending(value) if reverse else value)
+        return tuple(result)
+    return key
+
+
+def _write_rows(rows, path):
+    with open(path, "wb") as out:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == _ROWS_PER_PICKLE:
+                pickle.dump(batch, out, pickle.HIGHEST_PROTOCOL)
+                batch = []
+        if batch:
+            pickle.dump(batch, out, pickle.HIGHEST_PROTOCOL)
+
+
+def _read_rows(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                rows = pickle.load(f)
+            except EOFError:
+                return
+            yield from rows
+
+
+def _sort_run(rows, keys, path):
+    rows.sort(key=_row_key(keys))
+    _write_rows(rows, path)
+    return path
+
+
+class SortKey:
+    def __init__(self, column, type=ColumnType.STRING, reverse=False):
+        """
+        A column to sort by.
+
+        Values are compared as the given type. Nulls sort first, followed by
+        values that cannot be converted to the type, compared as strings.
+
+        :param column: The name or 0-based index of the column.
+        :param type: The ColumnType to compare values as.
+        :param reverse: Whether to sort this column in descending order.
+        :raises ValueError: If column or type is None.
+        """
+        if column is None or type is None:
+            raise ValueError("column and type must not be None")
+        self.column = column
+        self.type = type
+        self.reverse = reverse
+
+    def __repr__(self):
+        return f"SortKey [column={self.column}, type={self.type}, reverse={self.reverse}]"
+
+
+class CSVSorter:
+    def __init__(self, keys, max_bytes=64 * 1024 * 1024, use_processes=False,
+                 max_workers=None, executor=None, temp_dir=None, merge_fan_in=64):
+        """
+        Sorts records that do not fit in memory with an external merge sort.
+
+        Records are collected into runs of at most max_bytes, each run is
+        sorted on a pool and written to a temporary file, and the runs are
+        merged. Up to max_workers runs are sorted at the same time, so the
+        memory used is about max_bytes per worker plus the run being filled.
+        Input that fits into a single run is sorted in memory.
+
+        The sort is stable: records with equal keys keep their input order.
+
+        :param keys: The SortKeys, or column names or indexes sorted as
+            strings.
+        :param max_bytes: The memory budget of a run.
+        :param use_processes: Whether to sort runs in a process pool instead
+            of a thread pool. Ignored if executor is given.
+        :param max_workers: Number of workers of the pool created.
+        :param executor: An existing concurrent.futures.Executor to use. It is
+            not shut down by the sorter.
+        :param temp_dir: The directory of the run files, the system default
+            if None.
+        :param merge_fan_in: The maximum number of runs merged at once, more
+            runs are merged in several passes.
+        :raises ValueError: If no keys are given, max_bytes is negative or
+            merge_fan_in is less than 2.
+        """
+        if not keys:
+            raise ValueError("keys must not be empty")
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        if merge_fan_in < 2:
+            raise ValueError("merge_fan_in must be at least 2")
+        self.keys = [key if isinstance(key, SortKey) else SortKey(key) for key in keys]
+        self.max_bytes = max_bytes
+        self.use_processes = use_processes
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = executor
+        self.temp_dir = temp_dir
+        self.merge_fan_in = merge_fan_in
+        self.run_count = 0
+
+    @staticmethod
+    def sort_file(path, out_path, charset, format, keys, output_format=None, **options):
+        """
+        Sorts a CSV file into another file.
+
+        If the output format takes its header from the input, the header of
+        the input file is written.
+
+        :param path: The path of the CSV file to sort.
+        :param out_path: The path of the sorted file.
+        :param charset: The charset of both files.
+        :param format: The CSVFormat of the input file.
+        :param keys: The SortKeys, see CSVSorter.
+        :param output_format: The CSVFormat of the output, format if None.
+        :param options: Further CSVSorter arguments.
+        :return: The number of records written.
+        :raises IOError: On parse error or input read-failure.
+        """
+        output_format = output_format or format
+        with open(path, encoding=charset, newline="") as f:
+            parser = CSVParser(f, format)
+            names = parser.get_header_names()
+            if output_format.get_header() == [] and names:
+                output_format = output_format.with_header(*names) \
+                    .with_skip_header_record(False)
+            with open(out_path, "w", encoding=charset, newline="") as out:
+                return CSVSorter(keys, **options).sort_to(parser, CSVPrinter(out, output_format))
+
+    def _resolve_keys(self, header_map):
+        resolved = []
+        for key in self.keys:
+            index = key.column
+            if isinstance(index, str):
+                if not header_map or index not in header_map:
+                    raise ValueError(f"Mapping for {index} not found")
+                index = header_map[index]
+            resolved.append((index, key.type, key.reverse))
+        return resolved
+
+    def _create_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(self.max_workers)
+        return ThreadPoolExecutor(self.max_workers)
+
+    def _new_run_path(self):
+        fd, path = tempfile.mkstemp(suffix=".run", dir=self.temp_dir)
+        os.close(fd)
+        return path
+
+    def sort(self, parser):
+        """
+        Sorts the remaining records of a parser.
+
+        :param parser: The CSVParser.
+        :return: A generator over the values of the records, as lists, in
+            sorted order. Run files are deleted once it is exhausted or
+            closed.
+        :raises ValueError: If a key column is not in the header map.
+        :raises IOError: On parse error or input read-failure.
+        """
+        keys = self._resolve_keys(parser.get_header_map())
+        key = _row_key(keys)
+        self.run_count = 0
+        paths = []
+        executor = None
+        try:
+            rows = []
+            size = 0
+            in_flight = deque()
+            for record in parser:
+                values = record._values
+                rows.append(values)
+                size += sys.getsizeof(values)
+                for value in values:
+                    if value is not None:
+                        size += sys.getsizeof(value)
+                if size <= self.max_bytes:
+                    continue
+                if executor is None:
+                    executor = self.executor or self._create_executor()
+                path = self._new_run_path()
+                paths.append(path)
+                in_flight.append(executor.submit(_sort_run, rows, keys, path))
+                self.run_count += 1
+                rows = []
+                size = 0
+                while len(in_flight) >= self.max_workers:
+                    in_flight.popleft().result()
+
+            if not paths:
+                self.run_count = 1 if rows else 0
+                rows.sort(key=key)
+                yield from rows
+                return
+            if rows:
+                path = self._new_run_path()
+                paths.append(path)
+                in_flight.append(executor.submit(_sort_run, rows, keys, path))
+                self.run_count += 1
+            while in_flight:
+                in_flight.popleft().result()
+
+            runs = list(paths)
+            while len(runs) > self.merge_fan_in:
+                # Merge neighbouring runs so that equal keys keep their order
+                merged_runs = []
+                for start in range(0, len(runs), self.merge_fan_in):
+                    group = runs[start:start + self.merge_fan_in]
+                    path = self._new_run_path()
+                    paths.append(path)
+                    _write_rows(heapq.merge(*(_read_rows(run) for run in group), key=key), path)
+                    for run in group:
+                        os.remove(run)
+                        paths.remove(run)
+                    merged_runs.append(path)
+                runs = merged_runs
+            yield from heapq.merge(*(_read_rows(run) for run in runs), key=key)
+        finally:
+            if executor is not None and self.executor is None:
+                executor.shutdown()
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def sort_to(self, parser, printer):
+        """
+        Sorts the remaining records of a parser and prints them.
+
+        :param parser: The CSVParser.
+        :param printer: The CSVPrinter the sorted records are printed to.
+        :return: The number of records printed.
+        :raises IOError: On parse error or input read-failure.
+        """
+        count = 0
+        for values in self.sort(parser):
+            printer.print_record(values)
+            count += 1
+        return count
+
+    def get_run_count(self):
+        """
+        :return: The number of runs of the last sort, 1 if it was done in
+            memory.
+        """
+        return self.run_count
@@ -0,0 +1,323 @@
+import codecs
+import re
+import struct
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from main.python.constants import Constants
+from main.python.csv_push_parser import CSVPushParser
+from main.python.csv_sidecar import CSVSidecar
+from main.python.record_boundary_scanner import RecordBoundaryScanner
+
+
+class RecordOffsetIndex:
+    MAGIC = b"CSVI"
+    VERSION = 1
+    PREAMBLE = struct.Struct("<4sHHQQQQ32sQ")
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, interval, record_numbers, byte_offsets, char_offsets,
+                 record_count, source_size, source_mtime_ns, fingerprint):
+        """
+        Byte and character offsets of every interval-th record of a file.
+
+        Use build() to create an index and save()/load() to keep it.
+
+        :param interval: The number of records between two checkpoints.
+        :param record_numbers: The record number of each checkpoint.
+        :param byte_offsets: The byte offset at which each checkpoint starts.
+        :param char_offsets: The character offset of each checkpoint.
+        :param record_count: The number of records in the file.
+        :param source_size: The size of the indexed file.
+        :param source_mtime_ns: The modification time of the indexed file.
+        :param fingerprint: CSVSidecar.fingerprint() of the format and charset.
+        """
+        self.interval = interval
+        self.record_numbers = record_numbers
+        self.byte_offsets = byte_offsets
+        self.char_offsets = char_offsets
+        self.record_count = record_count
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def build(path, charset, format, interval=1000):
+        """
+        Indexes a file by scanning its record boundaries once.
+
+        Records are not tokenized, only their boundaries are located. The
+        charset must encode decoded text back to the same bytes.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the file.
+        :param format: The CSVFormat of the file.
+        :param interval: The number of records between two checkpoints.
+        :return: The RecordOffsetIndex.
+        :raises ValueError: If interval is not positive.
+        """
+        if interval < 1:
+            raise ValueError("interval must be positive")
+        path = Path(path)
+        stat = path.stat()
+        scanner = RecordBoundaryScanner(format)
+        decoder = codecs.getincrementaldecoder(charset)()
+        encoder = codecs.getincrementalencoder(charset)()
+        record_numbers = array("q", [1])
+        byte_offsets = array("q", [0])
+        char_offsets = array("q", [0])
+        record_count = 0
+        char_start = 0
+        byte_position = 0
+
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(RecordOffsetIndex.CHUNK_SIZE)
+                final = not data
+                text = decoder.decode(data, final)
+                encoded = 0
+                for boundary in scanner.scan(text, final):
+                    record_count += 1
+                    if record_count % interval == 0:
+                        local = boundary - char_start
+                        byte_position += len(encoder.encode(text[encoded:local]))
+                        encoded = local
+                        record_numbers.append(record_count + 1)
+                        byte_offsets.append(byte_position)
+                        char_offsets.append(boundary)
+                byte_position += len(encoder.encode(text[encoded:]))
+                char_start += len(text)
+                if final:
+                    break
+        if scanner.is_inside_record():
+            # Last record without a line break
+            record_count += 1
+        if byte_offsets[-1] >= stat.st_size and len(byte_offsets) > 1:
+            # Checkpoint after the last record
+            record_numbers.pop()
+            byte_offsets.pop()
+            char_offsets.pop()
+        return RecordOffsetIndex(
+            interval, record_numbers, byte_offsets, char_offsets, record_count,
+            stat.st_size, stat.st_mtime_ns, CSVSidecar.fingerprint(format, charset)
+        )
+
+    def save(self, index_path):
+        with open(index_path, "wb") as out:
+            out.write(RecordOffsetIndex.PREAMBLE.pack(
+                RecordOffsetIndex.MAGIC, RecordOffsetIndex.VERSION, 0,
+                self.interval, self.record_count, self.source_size,
+                self.source_mtime_ns, self.fingerprint, len(self.record_numbers),
+            ))
+            for offsets in (self.record_numbers, self.byte_offsets, self.char_offsets):
+                out.write(offsets.tobytes())
+
+    @staticmethod
+    def load(index_path):
+        """
+        :param index_path: The path the index was saved to.
+        :return: The RecordOffsetIndex.
+        :raises ValueError: If the file does not hold an index.
+        """
+        with open(index_path, "rb") as f:
+            data = f.read()
+        (magic, version, _, interval, record_count, source_size, source_mtime_ns,
+         fingerprint, count) = RecordOffsetIndex.PREAMBLE.unpack_from(data)
+        if magic != RecordOffsetIndex.MAGIC or version != RecordOffsetIndex.VERSION:
+            raise ValueError("file does not contain a record offset index")
+        arrays = []
+        offset = RecordOffsetIndex.PREAMBLE.size
+        for _ in range(3):
+            values = array("q")
+            values.frombytes(data[offset:offset + 8 * count])
+            arrays.append(values)
+            offset += 8 * count
+        return RecordOffsetIndex(interval, *arrays, record_count, source_size,
+                                 source_mtime_ns, fingerprint)
+
+    def is_valid_for(self, path, charset, format):
+        """
+        :return: Whether the index was built from the file as it is now, with
+            the same format and charset.
+        """
+        stat = Path(path).stat()
+        return (stat.st_size == self.source_size
+                and stat.st_mtime_ns == self.source_mtime_ns
+                and CSVSidecar.fingerprint(format, charset) == self.fingerprint)
+
+    def get_record_count(self):
+        return self.record_count
+
+    def locate(self, record_number):
+        """
+        Finds the last checkpoint at or before a record.
+
+        :param record_number: The record number.
+        :return: (record number, byte offset, character offset) of the
+            checkpoint.
+        """
+        i = max(0, bisect_right(self.record_numbers, record_number) - 1)
+        return self.record_numbers[i], self.byte_offsets[i], self.char_offsets[i]
+
+
+class CSVTail:
+    BLOCK_SIZE = 64 * 1024
+    LINE_BREAK = re.compile(b"[\r\n]")
+
+    def __init__(self, path, charset, format, index=None, block_size=BLOCK_SIZE):
+        """
+        Reads the last records of a file without parsing it from the start.
+
+        Without an index, blocks from the end of the file are read, doubling
+        in size until they hold enough records. A block starts after its
+        first line break, CR, LF or CRLF, which may lie inside a quoted
+        field, so it is scanned once for every state the record could be in
+        at that point. States that run into input the Lexer rejects, or end
+        inside an open quoted field, are impossible. Only record boundaries
+        all remaining states agree on are used.
+
+        Without an index the record numbers and character positions of the
+        records are unknown and set to None, unless the block reached the
+        start of the file. With a valid RecordOffsetIndex, parsing starts at
+        the nearest checkpoint and records carry their numbers and positions.
+
+        The charset must encode line feeds and carriage returns as the single
+        bytes 0x0A and 0x0D, as UTF-8 and the single-byte charsets do.
+
+        :param path: The path of the CSV file.
+        :param charset: The charset of the file.
+        :param format: The CSVFormat of the file.
+        :param index: An optional RecordOffsetIndex of the file.
+        :param block_size: The size of the first block read from the end.
+        :raises ValueError: If the charset does not encode line breaks as
+            single bytes or block_size is not positive.
+        """
+        encoder = codecs.getincrementalencoder(charset)()
+        # Past a byte order mark
+        encoder.encode("a")
+        if encoder.encode(Constants.LF + Constants.CR) != b"\n\r":
+            raise ValueError(f"charset {charset} is not supported")
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.path = Path(path)
+        self.charset = charset
+        self.format = format
+        self.index = index
+        self.block_size = block_size
+        header = format.get_header()
+        self.first_data_record = 2 if header is not None and (
+            len(header) == 0 or format.get_skip_header_record()
+        ) else 1
+
+    def get_header_map(self):
+        """
+        Reads the header map from the start of the file if the format takes
+        it from there, so that parsing can start in the middle of the file.
+
+        :return: The header map, None if the format defines no header.
+        :raises IOError: On parse error or input read-failure.
+        """
+        parser = CSVPushParser(self.format, self.charset)
+        if not parser.header_pending:
+            return parser.header_map
+        with open(self.path, "rb") as f:
+            while parser.header_pending:
+                data = f.read(self.block_size)
+                if not data:
+                    parser.close()
+                    break
+                parser.feed(data)
+        return parser.header_map
+
+    def _parse(self, text, header_map, record_number, character_offset):
+        parser = CSVPushParser(self.format, self.charset, character_offset,
+                               record_number, header_map)
+        return parser.feed(text) + parser.close()
+
+    def _record_starts(self, text):
+        hypotheses = [RecordBoundaryScanner.LINE_START]
+        if self.format.get_quote_character() is not None:
+            hypotheses.append(RecordBoundaryScanner.QUOTED)
+        if self.format.get_escape_character() is not None:
+            # After an escaped line break
+            hypotheses.append(RecordBoundaryScanner.SIMPLE)
+
+        results = []
+        for state in hypotheses:
+            scanner = RecordBoundaryScanner(self.format)
+            scanner.state = state
+            boundaries = scanner.scan(text, True)
+            if scanner.is_invalid() or scanner.escape_pending or \
+                    scanner.state == RecordBoundaryScanner.QUOTED:
+                continue
+            results.append((boundaries, scanner.is_inside_record()))
+        if not results:
+            return None
+
+        # Boundaries shared by all remaining states, the scans agree on
+        # everything after the first of them
+        trusted = []
+        lists = [boundaries for boundaries, _ in results]
+        while all(lists) and all(b[-1] == lists[0][-1] for b in lists):
+            trusted.append(lists[0][-1])
+            lists = [b[:-1] for b in lists]
+        if not trusted:
+            return None
+        trusted.reverse()
+        starts = trusted[:-1]
+        if results[0][1]:
+            starts.append(trusted[-1])
+        return starts
+
+    def read(self, n):
+        """
+        Returns the last n records.
+
+        :param n: The number of records.
+        :return: The list of up to n CSVRecords, in file order.
+        :raises IOError: On parse error or input read-failure.
+        """
+        if n < 1:
+            return []
+        if self.index is not None and \
+                self.index.is_valid_for(self.path, self.charset, self.format):
+            return self._read_indexed(n)
+
+        size = self.path.stat().st_size
+        header_map = None
+        block = self.block_size
+        with open(self.path, "rb") as f:
+            while True:
+                start = max(0, size - block)
+                f.seek(start)
+                data = f.read(size - start)
+                if start == 0:
+                    return self._parse(data, None, 1, 0)[-n:]
+                match = CSVTail.LINE_BREAK.search(data)
+                if match is not None:
+                    line_end = match.start()
+                    if data[line_end:line_end + 2] == b"\r\n":
+                        line_end += 1
+                    text = data[line_end + 1:].decode(self.charset)
+                    starts = self._record_starts(text)
+                    if starts is not None and len(starts) >= n:
+                        if header_map is None:
+                            header_map = self.get_header_map()
+                        records = self._parse(text[starts[-n]:], header_map, 1, 0)[-n:]
+                        for record in records:
+                            record.record_number = None
+                            record.character_position = None
+                        return records
+                block *= 2
+
+    def _read_indexed(self, n):
+        index = self.index
+        first = max(index.get_record_count() - n + 1, self.first_data_record)
+        record_number, byte_offset, char_offset = index.locate(first)
+        with open(self.path, "rb") as f:
+            f.seek(byte_offset)
+            data = f.read()
+        if byte_offset == 0:
+            return self._parse(data, None, 1, 0)[-n:]
+        text = data.decode(self.charset)
+        return self._parse(text, self.get_header_map(), record_number, char_offset)[-n:]
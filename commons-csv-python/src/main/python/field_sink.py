@@ -0,0 +1,171 @@
+import tempfile
+from main.python.token import Token
+
+
+class FieldHandle:
+    def __init__(self, sink, length, record_number, column):
+        """
+        Stands in for a field value that was written to a sink.
+
+        :param sink: The text stream holding the value.
+        :param length: The length of the value in characters.
+        :param record_number: The number of the record holding the value.
+        :param column: The 0-based column of the value.
+        """
+        self.sink = sink
+        self.length = length
+        self.record_number = record_number
+        self.column = column
+
+    @staticmethod
+    def temporary_file(record_number, column):
+        """
+        The default sink factory, an anonymous temporary file per value.
+        """
+        return tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+
+    def get_sink(self):
+        return self.sink
+
+    def get_length(self):
+        return self.length
+
+    def get_record_number(self):
+        return self.record_number
+
+    def get_column(self):
+        return self.column
+
+    def open(self):
+        """
+        Rewinds the sink for reading.
+
+        :return: The sink, positioned at the start of the value.
+        :raises IOError: If the sink is not seekable.
+        """
+        self.sink.seek(0)
+        return self.sink
+
+    def read(self):
+        """
+        Reads the whole value back into memory.
+
+        :return: The value.
+        :raises IOError: If the sink is not readable or seekable.
+        """
+        return self.open().read()
+
+    def close(self):
+        self.sink.close()
+
+    def __str__(self):
+        return (f"FieldHandle [record_number={self.record_number}, "
+                f"column={self.column}, length={self.length}]")
+
+    __repr__ = __str__
+
+
+class FieldSinkToken(Token):
+    CHUNK_SIZE = 64 * 1024
+    # Characters str.strip() removes, as CSVFormat.trim does
+    TRIM_SPACES = ("\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002"
+                   "\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029"
+                   "\u202f\u205f\u3000")
+    # Characters Lexer.trim_trailing_spaces removes
+    SURROUNDING_SPACES = "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \u200b\u200c\u200d\u3000"
+
+    def __init__(self, threshold, sink_factory, trim=False,
+                 ignore_surrounding_spaces=False, null_string=None):
+        """
+        Token that moves its content to a sink once it grows over threshold.
+
+        The content is written in chunks of CHUNK_SIZE characters, so at most
+        one chunk of a large field is held in memory. Values are trimmed and
+        compared to the null string like those kept in memory: leading
+        spaces are dropped before the sink is opened, and trailing spaces
+        are held back until the value is complete.
+
+        :param threshold: The content length above which the sink is opened.
+        :param sink_factory: Called with the record number and column of the
+            field, returns the writable text stream to use as sink.
+        :param trim: Whether values are trimmed, see CSVFormat.get_trim().
+        :param ignore_surrounding_spaces: Whether the Lexer drops trailing
+            spaces of simple tokens.
+        :param null_string: The value read as null, never sent to a sink.
+        """
+        super().__init__()
+        self.threshold = threshold
+        self.sink_factory = sink_factory
+        self.trim = trim
+        self.spaces = (FieldSinkToken.TRIM_SPACES if trim else "") + \
+            (FieldSinkToken.SURROUNDING_SPACES if ignore_surrounding_spaces else "")
+        self.null_string = null_string
+        # Content a value may still be trimmed or compared down to
+        self.limit = max(threshold, len(null_string) if null_string else 0)
+        self.next_spill = self.limit
+        self.sink = None
+        self.length = 0
+        self.force = False
+        self.record_number = 1
+        self.column = 0
+
+    def reset(self, type=Token.Type.INVALID):
+        super().reset(type)
+        self.sink = None
+        self.length = 0
+        self.next_spill = self.limit
+
+    def get_length(self):
+        return self.length + len(self.content)
+
+    def append(self, c):
+        self.content += c
+        # Comments are never sent to a sink
+        if len(self.content) > self.next_spill and self.type is not Token.Type.COMMENT:
+            self._spill()
+
+    def _spill(self):
+        content = self.content
+        if self.sink is None and self.trim:
+            content = content.lstrip()
+        value = content.rstrip(self.spaces) if self.spaces else content
+        if self.sink is None and len(value) <= self.limit:
+            # The value may still end up short enough to stay in memory
+            self.content = content
+            step = self.limit - len(value)
+        else:
+            if self.sink is None:
+                self.sink = self.sink_factory(self.record_number, self.column)
+            self.sink.write(value)
+            self.length += len(value)
+            self.content = content = content[len(value):]
+            step = FieldSinkToken.CHUNK_SIZE
+        # Held back spaces are not scanned again for every character
+        self.next_spill = len(content) + max(step, len(content), 1)
+
+    def finish(self, keep_empty=True):
+        """
+        Completes the field.
+
+        :param keep_empty: Whether an empty value is a value, False for the
+            empty last value of a record with a trailing delimiter.
+        :return: The FieldHandle if the field went to a sink, None if its
+            value is in the content.
+        """
+        if self.sink is None:
+            value = self.content.strip() if self.trim else self.content
+            if value == self.null_string or (value == "" and not keep_empty) or \
+                    (not self.force and len(value) <= self.threshold):
+                return None
+            self.content = value
+            self.sink = self.sink_factory(self.record_number, self.column)
+        elif self.trim:
+            self.content = self.content.rstrip()
+        self.sink.write(self.content)
+        self.length += len(self.content)
+        self.content = ""
+        self.sink.flush()
+        handle = FieldHandle(self.sink, self.length, self.record_number, self.column)
+        self.sink = None
+        self.length = 0
+        return handle
@@ -0,0 +1,130 @@
+import os
+import pickle
+import tempfile
+from main.python.closeable import Closeable
+
+
+def read_partition(path):
+    """
+    Reads back the entries of a partition file.
+
+    :param path: The path of the partition file.
+    :return: A generator over the entries, in the order added.
+    """
+    with open(path, "rb") as f:
+        while True:
+            try:
+                entries = pickle.load(f)
+            except EOFError:
+                return
+            yield from entries
+
+
+class HashPartitions(Closeable):
+    MASK = (1 << 64) - 1
+
+    def __init__(self, count, temp_dir=None, batch_size=1000, salt=0):
+        """
+        Temporary files that entries are distributed to by the hash of a key,
+        so that entries with equal keys end up in the same file.
+
+        Entries are pickled in batches of batch_size. The files are named, so
+        that they can be read by other processes after finish(), and are
+        deleted by close().
+
+        hash() of strings differs between processes, so entries must be
+        added by a single process. A different salt distributes the keys
+        independently, to split a partition that is still too large.
+
+        :param count: The number of partitions.
+        :param temp_dir: The directory of the files, the system default if
+            None.
+        :param batch_size: The number of entries pickled at once.
+        :param salt: Mixed into the hash of the keys if not 0.
+        :raises ValueError: If count or batch_size is not positive.
+        """
+        if count < 1 or batch_size < 1:
+            raise ValueError("count and batch_size must be positive")
+        self.count = count
+        self.batch_size = batch_size
+        self.salt = salt
+        self.paths = []
+        self.files = []
+        try:
+            for _ in range(count):
+                fd, path = tempfile.mkstemp(suffix=".part", dir=temp_dir)
+                self.paths.append(path)
+                self.files.append(os.fdopen(fd, "wb"))
+        except OSError:
+            self.close()
+            raise
+        self.buffers = [[] for _ in range(count)]
+        self.sizes = [0] * count
+
+    def add(self, key, entry):
+        """
+        Adds an entry to the partition of its key.
+
+        :param key: The hashable key.
+        :param entry: The picklable entry.
+        :return: The index of the partition.
+        """
+        index = self._hash(key) % self.count
+        buffer = self.buffers[index]
+        buffer.append(entry)
+        if len(buffer) >= self.batch_size:
+            self._flush(index)
+        return index
+
+    def _hash(self, key):
+        h = hash(key)
+        if not self.salt:
+            return h
+        # A salt hashed in a tuple with the key keeps keys that share their
+        # low bits together, splitmix64 mixes it into all bits
+        h = (h + self.salt * 0x9E3779B97F4A7C15) & HashPartitions.MASK
+        h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & HashPartitions.MASK
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & HashPartitions.MASK
+        return h ^ (h >> 31)
+
+    def _flush(self, index):
+        buffer = self.buffers[index]
+        if buffer:
+            pickle.dump(buffer, self.files[index], pickle.HIGHEST_PROTOCOL)
+            self.sizes[index] += len(buffer)
+            self.buffers[index] = []
+
+    def finish(self):
+        """
+        Writes the buffered entries and closes the files for writing.
+        """
+        for index in range(self.count):
+            if self.files[index] is not None:
+                self._flush(index)
+                self.files[index].close()
+                self.files[index] = None
+
+    def get_path(self, index):
+        return self.paths[index]
+
+    def get_size(self, index):
+        """
+        :return: The number of entries written to a partition.
+        """
+        return self.sizes[index]
+
+    def read(self, index):
+        """
+        :return: A generator over the entries of a partition, after finish().
+        """
+        return read_partition(self.paths[index])
+
+    def close(self):
+        for file in self.files:
+            if file is not None:
+                file.close()
+        self.files = [None] * len(self.files)
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self.paths = []
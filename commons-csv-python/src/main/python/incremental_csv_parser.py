@@ -0,0 +1,253 @@
+import difflib
+import hashlib
+import zlib
+from pathlib import Path
+from main.python.csv_push_parser import CSVPushParser
+from main.python.csv_record import CSVRecord
+from main.python.record_boundary_scanner import RecordBoundaryScanner
+
+
+class RecordRangeChange:
+    ADDED = "added"
+    REMOVED = "removed"
+    CHANGED = "changed"
+
+    def __init__(self, kind, old_start, old_end, new_start, new_end):
+        """
+        A range of records that differs between two versions of the input.
+
+        Ranges are 0-based record indexes, end exclusive. Added ranges are
+        empty in the old version, removed ranges are empty in the new one.
+
+        :param kind: ADDED, REMOVED or CHANGED.
+        :param old_start: First index of the range in the old records.
+        :param old_end: End of the range in the old records.
+        :param new_start: First index of the range in the new records.
+        :param new_end: End of the range in the new records.
+        """
+        self.kind = kind
+        self.old_start = old_start
+        self.old_end = old_end
+        self.new_start = new_start
+        self.new_end = new_end
+
+    def __eq__(self, other):
+        return isinstance(other, RecordRangeChange) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _key(self):
+        return (self.kind, self.old_start, self.old_end, self.new_start, self.new_end)
+
+    def __repr__(self):
+        return (f"RecordRangeChange({self.kind}, old=[{self.old_start}, {self.old_end}), "
+                f"new=[{self.new_start}, {self.new_end}))")
+
+
+class _Chunk:
+    def __init__(self, key, offset, first_number, next_number, records):
+        self.key = key
+        self.offset = offset
+        self.first_number = first_number
+        self.next_number = next_number
+        self.records = records
+
+
+class IncrementalCSVParser:
+    WINDOW = 64
+
+    def __init__(self, format, charset="utf-8", records_per_chunk=256):
+        """
+        Parser that re-tokenizes only the parts of an input that changed.
+
+        The input is cut into chunks of whole records. Cut points are chosen
+        from the content at record boundaries, so an edit only moves the
+        chunks around it. Each chunk is identified by a hash of its text, and
+        on the next parse the records of chunks with an unchanged hash are
+        reused, only renumbered and moved to their new character positions.
+
+        :param format: The CSVFormat used for CSV parsing. Must not be None.
+        :param charset: The charset of parsed files.
+        :param records_per_chunk: The average number of records per chunk.
+        :raises ValueError: If format is None or records_per_chunk is not
+            positive.
+        """
+        if format is None:
+            raise ValueError("format must not be None")
+        if records_per_chunk < 1:
+            raise ValueError("records_per_chunk must be positive")
+        self.format = format
+        self.charset = charset
+        self.records_per_chunk = records_per_chunk
+        header = format.get_header()
+        self.reads_header = header is not None and (
+            len(header) == 0 or format.get_skip_header_record()
+        )
+        self.chunks = []
+        self.header_map = None if self.reads_header else CSVPushParser(format).header_map
+        self.reparsed_chunks = 0
+
+    def _cut(self, text):
+        boundaries = RecordBoundaryScanner(self.format).scan(text, True)
+        ends = []
+        count = 0
+        previous = 0
+        for boundary in boundaries:
+            count += 1
+            window = text[max(previous, boundary - IncrementalCSVParser.WINDOW):boundary]
+            previous = boundary
+            if (self.reads_header and not ends) \
+                    or count >= 4 * self.records_per_chunk \
+                    or zlib.crc32(window.encode("utf-8", "surrogatepass")) \
+                    % self.records_per_chunk == 0:
+                ends.append(boundary)
+                count = 0
+        if len(text) > (ends[-1] if ends else 0):
+            ends.append(len(text))
+        return ends
+
+    def _parse_chunk(self, text, offset, first, record_number):
+        reads_header = first and self.reads_header
+        parser = CSVPushParser(
+            self.format, self.charset, offset, record_number,
+            None if reads_header else self.header_map,
+        )
+        records = parser.feed(text) + parser.close()
+        if reads_header:
+            self.header_map = parser.header_map
+        return records, parser.get_record_number() + 1
+
+    def _rebase(self, chunk, offset, first_number):
+        number_delta = first_number - chunk.first_number
+        position_delta = offset - chunk.offset
+        records = chunk.records
+        if number_delta or position_delta or \
+                any(r.mapping is not self.header_map for r in records[:1]):
+            records = [
+                CSVRecord(r._values, self.header_map, r.comment,
+                          r.record_number + number_delta,
+                          r.character_position + position_delta)
+                for r in records
+            ]
+        return records, chunk.next_number + number_delta
+
+    def parse(self, path):
+        """
+        Parses the current content of a file.
+
+        :param path: The path of the CSV file.
+        :return: The list of RecordRangeChanges since the previous parse.
+        :raises IOError: On parse error or input read-failure.
+        """
+        return self.parse_text(Path(path).read_text(encoding=self.charset))
+
+    def parse_text(self, text):
+        """
+        Parses the current version of the input.
+
+        :param text: The complete input.
+        :return: The list of RecordRangeChanges since the previous parse.
+        :raises IOError: On parse error.
+        """
+        ends = self._cut(text)
+        keys = []
+        start = 0
+        for index, end in enumerate(ends):
+            digest = hashlib.blake2b(
+                text[start:end].encode("utf-8", "surrogatepass"), digest_size=16
+            ).digest()
+            # A reused header chunk has to stay the first one, and vice versa
+            keys.append((self.reads_header and index == 0, digest))
+            start = end
+
+        old_chunks = self.chunks
+        matcher = difflib.SequenceMatcher(
+            None, [c.key for c in old_chunks], keys, autojunk=False
+        )
+        opcodes = matcher.get_opcodes()
+        reused = {}
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                for k in range(j2 - j1):
+                    reused[j1 + k] = old_chunks[i1 + k]
+
+        if not ends and self.reads_header:
+            self.header_map = None
+        chunks = []
+        record_number = 1
+        start = 0
+        self.reparsed_chunks = 0
+        for index, end in enumerate(ends):
+            old = reused.get(index)
+            if old is not None:
+                records, next_number = self._rebase(old, start, record_number)
+            else:
+                records, next_number = self._parse_chunk(
+                    text[start:end], start, index == 0, record_number
+                )
+                self.reparsed_chunks += 1
+            chunks.append(_Chunk(keys[index], start, record_number, next_number, records))
+            record_number = next_number
+            start = end
+
+        self.chunks = chunks
+        return IncrementalCSVParser._changes(opcodes, old_chunks, chunks)
+
+    @staticmethod
+    def _changes(opcodes, old_chunks, new_chunks):
+        old_starts = [0]
+        for chunk in old_chunks:
+            old_starts.append(old_starts[-1] + len(chunk.records))
+        new_starts = [0]
+        for chunk in new_chunks:
+            new_starts.append(new_starts[-1] + len(chunk.records))
+
+        changes = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                continue
+            # Narrow the differing chunks down to the differing records
+            old_records = [r for c in old_chunks[i1:i2] for r in c.records]
+            new_records = [r for c in new_chunks[j1:j2] for r in c.records]
+            matcher = difflib.SequenceMatcher(
+                None,
+                [(tuple(r._values), r.comment) for r in old_records],
+                [(tuple(r._values), r.comment) for r in new_records],
+                autojunk=False,
+            )
+            for sub_tag, a1, a2, b1, b2 in matcher.get_opcodes():
+                if sub_tag == "equal":
+                    continue
+                kind = {
+                    "insert": RecordRangeChange.ADDED,
+                    "delete": RecordRangeChange.REMOVED,
+                    "replace": RecordRangeChange.CHANGED,
+                }[sub_tag]
+                changes.append(RecordRangeChange(
+                    kind, old_starts[i1] + a1, old_starts[i1] + a2,
+                    new_starts[j1] + b1, new_starts[j1] + b2,
+                ))
+        return changes
+
+    def get_records(self):
+        """
+        Returns the records of the last parse.
+
+        :return: The list of CSVRecords.
+        """
+        return [record for chunk in self.chunks for record in chunk.records]
+
+    def get_header_map(self):
+        return self.header_map.copy() if self.header_map is not None else None
+
+    def get_chunk_digests(self):
+        return [chunk.key[1] for chunk in self.chunks]
+
+    def get_reparsed_chunk_count(self):
+        """
+        Returns how many chunks the last parse had to tokenize.
+
+        :return: The number of chunks whose hash was not known.
+        """
+        return self.reparsed_chunks
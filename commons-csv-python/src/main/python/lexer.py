@@ -19,6 +19,10 @@ class Lexer(Closeable):
         self.quote_char = self.map_null_to_disabled(
             formatter.get_quote_character()
         )
+        if self.escape == self.quote_char:
+            # Quotes escaped with themselves are doubled quotes, as the
+            # printer writes them
+            self.escape = Lexer.DISABLED
         self.comment_start = self.map_null_to_disabled(
             formatter.get_comment_marker()
         )
@@ -26,6 +30,14 @@ class Lexer(Closeable):
             formatter.get_ignore_surrounding_spaces()
         self.ignore_empty_lines = formatter.get_ignore_empty_lines()
         self.first_eol = None
+        # A value can be no longer than the record holding it
+        self.token_limit = None
+        self.token_limit_name = None
+        for limit, name in ((formatter.get_max_field_size(), "field"),
+                            (formatter.get_max_record_size(), "record")):
+            if limit is not None and (self.token_limit is None or limit < self.token_limit):
+                self.token_limit = limit
+                self.token_limit_name = name
 
     def get_first_eol(self):
         return self.first_eol
@@ -59,8 +71,8 @@ class Lexer(Closeable):
                 token.set_type(Token.Type.EOF)
                 return token
             comment = line.strip()
-            token.append(comment)
             token.set_type(Token.Type.COMMENT)
+            token.append(comment)
             return token
 
         while token.get_type() == Token.Type.INVALID:
@@ -83,8 +95,18 @@ class Lexer(Closeable):
 
         return token
 
+    def check_token_limit(self, token: Token):
+        if token.get_length() > self.token_limit:
+            raise IOError(
+                f"(line {self.get_current_line_number()}) {self.token_limit_name} "
+                f"exceeds the maximum size of {self.token_limit} characters"
+            )
+
     def parse_simple_token(self, token: Token, ch: int):
+        limited = self.token_limit is not None
         while True:
+            if limited:
+                self.check_token_limit(token)
             if self.read_end_of_line(ch):
                 token.set_type(Token.Type.EORECORD)
                 break
@@ -114,8 +136,11 @@ class Lexer(Closeable):
 
     def parse_encapsulated_token(self, token: Token):
         start_line_number = self.get_current_line_number()
+        limited = self.token_limit is not None
         c = self.reader.read()
         while True:
+            if limited:
+                self.check_token_limit(token)
             if self.is_escape(c):
                 unescaped = self.read_escape()
                 if unescaped == Constants.END_OF_STREAM:
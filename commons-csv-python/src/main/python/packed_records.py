@@ -0,0 +1,307 @@
+import json
+import struct
+import sys
+from array import array
+from main.python.case_sensitive_dict import CaseInsensitiveDict
+from main.python.csv_record import CSVRecord
+from main.python.pretty_list import PrettyList
+
+
+class PackedRecordLayout:
+    """
+    Binary layout of records stored as offsets plus a UTF-8 string heap.
+
+    A fixed-size little-endian preamble holds the byte order of the sections,
+    the counts and the offset of each section. The sections are in the
+    native byte order of the writing host, so that readers can use them
+    without copying, and readers on a host of the other byte order reject
+    them. Every section starts 8-byte aligned:
+
+    - heap: the UTF-8 bytes of all non-null values, back to back
+    - value ends: value_count + 1 u64 heap offsets, value i spans
+      ends[i]..ends[i + 1]
+    - nulls: value_count bytes, 1 where the value is None
+    - record starts: record_count + 1 u64 indexes into the values
+    - record numbers: record_count u64, UNKNOWN_NUMBER where unknown
+    - character positions: record_count i64, UNKNOWN_POSITION where unknown
+    - meta: JSON with the header map and the record comments
+    """
+
+    MAGIC = b"CSVP"
+    VERSION = 1
+    # Stored for the None record numbers and positions of records read from
+    # the end of a file
+    UNKNOWN_NUMBER = 2 ** 64 - 1
+    UNKNOWN_POSITION = -2 ** 63
+    LITTLE_ENDIAN = 1
+    BIG_ENDIAN = 2
+    BYTE_ORDER = LITTLE_ENDIAN if sys.byteorder == "little" else BIG_ENDIAN
+    PREAMBLE = struct.Struct("<4sHH" + "Q" * 11)
+
+    @staticmethod
+    def align(offset):
+        return (offset + 7) & ~7
+
+    @staticmethod
+    def is_readable(buffer):
+        """
+        Returns whether a buffer starts with a layout this host can read.
+
+        :param buffer: Any object supporting the buffer protocol.
+        :return: False if the buffer holds no packed layout, another version
+            or sections in the other byte order.
+        """
+        if len(buffer) < PackedRecordLayout.PREAMBLE.size:
+            return False
+        magic, version, byte_order = struct.unpack_from("<4sHH", buffer)
+        return magic == PackedRecordLayout.MAGIC and \
+            version == PackedRecordLayout.VERSION and \
+            byte_order == PackedRecordLayout.BYTE_ORDER
+
+
+class PackedRecordWriter:
+    def __init__(self, out, header_map=None):
+        """
+        Writes records in the PackedRecordLayout.
+
+        The heap is streamed to out as records are written, the offset arrays
+        are kept in memory until close().
+
+        :param out: A seekable binary file-like object, positioned where the
+            layout starts.
+        :param header_map: The header map of the records, taken from the first
+            record written if None.
+        """
+        self.out = out
+        self.start = out.tell()
+        self.header_map = header_map
+        self.value_ends = array("Q", [0])
+        self.nulls = bytearray()
+        self.record_starts = array("Q", [0])
+        self.record_numbers = array("Q")
+        self.positions = array("q")
+        self.comments = {}
+        self.heap_size = 0
+        self.size = None
+        out.write(b"\0" * PackedRecordLayout.PREAMBLE.size)
+
+    def write(self, record):
+        if self.header_map is None:
+            self.header_map = record.mapping
+        if record.comment is not None:
+            self.comments[len(self.record_numbers)] = record.comment
+        for value in record._values:
+            if value is None:
+                self.nulls.append(1)
+            else:
+                data = value.encode("utf-8")
+                self.out.write(data)
+                self.heap_size += len(data)
+                self.nulls.append(0)
+            self.value_ends.append(self.heap_size)
+        self.record_starts.append(len(self.nulls))
+        number = record.record_number
+        position = record.character_position
+        self.record_numbers.append(
+            PackedRecordLayout.UNKNOWN_NUMBER if number is None else number)
+        self.positions.append(
+            PackedRecordLayout.UNKNOWN_POSITION if position is None else position)
+
+    def _write_section(self, data):
+        position = self.out.tell() - self.start
+        padding = PackedRecordLayout.align(position) - position
+        self.out.write(b"\0" * padding)
+        self.out.write(data)
+        return position + padding
+
+    def close(self):
+        """
+        Writes the offset arrays and the preamble.
+
+        :return: The total size of the layout in bytes.
+        """
+        if self.size is not None:
+            return self.size
+        header = None
+        ignore_case = isinstance(self.header_map, CaseInsensitiveDict)
+        if self.header_map is not None:
+            header = [[name, index] for name, index in self.header_map.items()]
+        meta = json.dumps({
+            "header": header,
+            "ignore_case": ignore_case,
+            "comments": self.comments,
+        }).encode("utf-8")
+
+        value_ends = self._write_section(self.value_ends.tobytes())
+        nulls = self._write_section(bytes(self.nulls))
+        record_starts = self._write_section(self.record_starts.tobytes())
+        record_numbers = self._write_section(self.record_numbers.tobytes())
+        positions = self._write_section(self.positions.tobytes())
+        meta_offset = self._write_section(meta)
+        end = self.out.tell()
+        self.size = end - self.start
+
+        self.out.seek(self.start)
+        self.out.write(PackedRecordLayout.PREAMBLE.pack(
+            PackedRecordLayout.MAGIC, PackedRecordLayout.VERSION,
+            PackedRecordLayout.BYTE_ORDER, len(self.record_numbers), len(self.nulls),
+            PackedRecordLayout.PREAMBLE.size, self.heap_size,
+            value_ends, nulls, record_starts, record_numbers, positions,
+            meta_offset, len(meta),
+        ))
+        self.out.seek(end)
+        return self.size
+
+
+class PackedRecordReader:
+    def __init__(self, buffer):
+        """
+        Reads records from a buffer in the PackedRecordLayout.
+
+        Fields are decoded straight from the buffer when they are accessed,
+        nothing is unpickled and no record is built up front. The buffer can
+        be a memory-mapped file or a shared memory block.
+
+        :param buffer: Any object supporting the buffer protocol.
+        :raises ValueError: If the buffer does not hold a packed layout, or
+            one written on a host of the other byte order.
+        """
+        view = memoryview(buffer)
+        if not PackedRecordLayout.is_readable(view):
+            view.release()
+            raise ValueError("buffer does not contain packed records in native byte order")
+        (_, _, _, record_count, value_count, heap, heap_size,
+         value_ends, nulls, record_starts, record_numbers, positions,
+         meta, meta_size) = PackedRecordLayout.PREAMBLE.unpack_from(view)
+
+        self.view = view
+        self.record_count = record_count
+        self.heap = view[heap:heap + heap_size]
+        self.value_ends = view[value_ends:value_ends + 8 * (value_count + 1)].cast("Q")
+        self.nulls = view[nulls:nulls + value_count]
+        self.record_starts = view[record_starts:record_starts + 8 * (record_count + 1)].cast("Q")
+        self.record_numbers = view[record_numbers:record_numbers + 8 * record_count].cast("Q")
+        self.positions = view[positions:positions + 8 * record_count].cast("q")
+
+        meta = json.loads(str(view[meta:meta + meta_size], "utf-8"))
+        self.comments = {int(i): c for i, c in meta["comments"].items()}
+        self.header_map = None
+        if meta["header"] is not None:
+            self.header_map = CaseInsensitiveDict() if meta["ignore_case"] else {}
+            for name, index in meta["header"]:
+                self.header_map[name] = index
+
+    def __len__(self):
+        return self.record_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError("record index out of range")
+        return PackedRecord(self, index)
+
+    def __iter__(self):
+        for index in range(self.record_count):
+            yield PackedRecord(self, index)
+
+    def get_header_map(self):
+        return self.header_map.copy() if self.header_map is not None else None
+
+    def value(self, value_index):
+        if self.nulls[value_index]:
+            return None
+        return str(
+            self.heap[self.value_ends[value_index]:self.value_ends[value_index + 1]],
+            "utf-8",
+        )
+
+    def release(self):
+        """
+        Releases all views on the buffer, so that it can be closed.
+        """
+        for view in (self.value_ends, self.nulls, self.record_starts,
+                     self.record_numbers, self.positions, self.heap, self.view):
+            view.release()
+
+
+class PackedRecord:
+    """
+    A CSVRecord-compatible view of one record in a PackedRecordReader.
+    """
+
+    def __init__(self, reader, index):
+        self.reader = reader
+        self.index = index
+        self.start = reader.record_starts[index]
+        self.end = reader.record_starts[index + 1]
+        self.mapping = reader.header_map
+
+    def get(self, e):
+        if isinstance(e, str):
+            return self.get_by_name(e)
+        if e < 0:
+            e += self.size()
+        if not 0 <= e < self.size():
+            raise IndexError("list index out of range")
+        return self.reader.value(self.start + e)
+
+    def get_by_name(self, name):
+        if self.mapping is None:
+            raise ValueError(
+                "No header mapping was specified, the record values can't "
+                "be accessed by name"
+            )
+        index = self.mapping.get(name)
+        if index is None:
+            raise ValueError(
+                f"Mapping for {name} not found, expected one of "
+                f"{list(self.mapping.keys())}"
+            )
+        if index >= self.size():
+            raise ValueError(
+                f"Index for header '{name}' is {index}, but CSVRecord only has "
+                f"{self.size()} values!"
+            )
+        return self.reader.value(self.start + index)
+
+    def get_character_position(self):
+        position = self.reader.positions[self.index]
+        return None if position == PackedRecordLayout.UNKNOWN_POSITION else position
+
+    def get_comment(self):
+        return self.reader.comments.get(self.index)
+
+    def get_record_number(self):
+        number = self.reader.record_numbers[self.index]
+        return None if number == PackedRecordLayout.UNKNOWN_NUMBER else number
+
+    def has_comment(self):
+        return self.get_comment() is not None
+
+    def is_mapped(self, name):
+        return self.mapping is not None and name in self.mapping
+
+    def size(self):
+        return self.end - self.start
+
+    def to_list(self):
+        return [self.reader.value(i) for i in range(self.start, self.end)]
+
+    def values(self):
+        return PrettyList(self.to_list())
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def to_map(self):
+        return self.to_csv_record().to_map()
+
+    def to_csv_record(self):
+        """
+        Copies the record out of the buffer.
+
+        :return: A CSVRecord holding the same values.
+        """
+        return CSVRecord(self.to_list(), self.mapping, self.get_comment(),
+                         self.get_record_number(), self.get_character_position())
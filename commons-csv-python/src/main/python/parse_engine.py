@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ParseEngine(Enum):
+    LEXER = 'LEXER'
+    NUMPY = 'NUMPY'
@@ -0,0 +1,202 @@
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import quote
+from main.python.closeable import Closeable
+from main.python.csv_printer import CSVPrinter
+from main.python.csv_record import CSVRecord
+
+
+class _CountingWriter:
+    def __init__(self, out):
+        self.out = out
+        self.count = 0
+
+    def write(self, string):
+        self.count += len(string)
+        return self.out.write(string)
+
+    def flush(self):
+        self.out.flush()
+
+    def close(self):
+        self.out.close()
+
+
+class PartitionedCSVPrinter(Closeable):
+    NULL_NAME = "__null__"
+
+    def __init__(self, directory, format, column=None, partitions=None,
+                 max_records=None, max_size=None, max_open_files=64,
+                 charset="utf-8", name_pattern="part-{}.csv"):
+        """
+        Prints records to many files, choosing the file of each record by a
+        key column or by size.
+
+        Records are routed
+            - by the hash of the column value if column and partitions are
+              given, into files numbered 0 to partitions - 1;
+            - by the column value if only column is given, into one file per
+              value, named by the percent-encoded value or NULL_NAME;
+            - in order otherwise, starting a new numbered file once the
+              current one holds max_records records or max_size characters.
+
+        At most max_open_files files are open at once; the least recently
+        used one is closed when another is needed, and reopened for
+        appending later. Every file starts with the header comments and
+        header the format prints, which are not repeated on reopening.
+
+        :param directory: The directory of the files.
+        :param format: The CSVFormat of the files.
+        :param column: The name or 0-based index of the key column. Names
+            are resolved through the record's header map, or the format's
+            header for lists of values.
+        :param partitions: The number of hash partitions.
+        :param max_records: The number of records per file when rolling.
+        :param max_size: The size of a file in characters when rolling.
+        :param max_open_files: The number of files kept open.
+        :param charset: The charset of the files.
+        :param name_pattern: The file name, formatted with the partition
+            name.
+        :raises ValueError: If neither a column nor a threshold is given, or
+            a number is not positive.
+        """
+        if column is None and max_records is None and max_size is None:
+            raise ValueError("column, max_records or max_size must be given")
+        for name, value in (("partitions", partitions), ("max_records", max_records),
+                            ("max_size", max_size), ("max_open_files", max_open_files)):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be positive")
+        self.directory = Path(directory)
+        self.format = format
+        self.reopen_format = format.with_header_comments().with_skip_header_record(True)
+        self.column = column
+        self.column_index = None
+        self.partitions = partitions
+        self.max_records = max_records
+        self.max_size = max_size
+        self.max_open_files = max_open_files
+        self.charset = charset
+        self.name_pattern = name_pattern
+        # Partition name -> (file, printer), least recently used first
+        self.open_files = OrderedDict()
+        # Partition name -> number of records
+        self.record_counts = {}
+        self.paths = {}
+        self.current = 0
+        self.current_size = 0
+        self.open_count = 0
+
+    def _column_value(self, values):
+        if self.column_index is None:
+            column = self.column
+            if isinstance(column, str):
+                if isinstance(values, CSVRecord):
+                    mapping = values.mapping
+                else:
+                    header = self.format.get_header()
+                    mapping = {name: i for i, name in enumerate(header)} if header else None
+                if not mapping or column not in mapping:
+                    raise ValueError(f"Mapping for {column} not found")
+                column = mapping[column]
+            self.column_index = column
+        if isinstance(values, CSVRecord):
+            values = values._values
+        return values[self.column_index] if self.column_index < len(values) else None
+
+    def _partition(self, values):
+        if self.column is None:
+            if (self.max_records is not None
+                    and self.record_counts.get(self._rolling_name(), 0) >= self.max_records) or \
+                    (self.max_size is not None and self.current_size >= self.max_size):
+                self.current += 1
+                self.current_size = 0
+            return self._rolling_name()
+        value = self._column_value(values)
+        if self.partitions is not None:
+            digest = zlib.crc32(value.encode("utf-8")) if value is not None else 0
+            return f"{digest % self.partitions:05d}"
+        return quote(value, safe="") if value is not None else PartitionedCSVPrinter.NULL_NAME
+
+    def _rolling_name(self):
+        return f"{self.current:05d}"
+
+    def _printer(self, partition):
+        entry = self.open_files.get(partition)
+        if entry is not None:
+            self.open_files.move_to_end(partition)
+            return entry
+        while len(self.open_files) >= self.max_open_files:
+            _, (out, printer) = self.open_files.popitem(last=False)
+            printer.close(flush=True)
+        path = self.paths.get(partition)
+        if path is None:
+            path = self.paths[partition] = self.directory / self.name_pattern.format(partition)
+            out = _CountingWriter(open(path, "w", encoding=self.charset, newline=""))
+            printer = CSVPrinter(out, self.format)
+            self.record_counts[partition] = 0
+        else:
+            out = _CountingWriter(open(path, "a", encoding=self.charset, newline=""))
+            printer = CSVPrinter(out, self.reopen_format)
+        self.open_count += 1
+        entry = self.open_files[partition] = (out, printer)
+        return entry
+
+    def print_record(self, values):
+        """
+        Prints a record to its file.
+
+        :param values: A CSVRecord or a list of values.
+        :return: The name of the partition the record went to.
+        :raises ValueError: If the key column is not mapped.
+        """
+        partition = self._partition(values)
+        out, printer = self._printer(partition)
+        if isinstance(values, CSVRecord):
+            values = values._values
+        start = out.count
+        printer.print_record(values)
+        if self.column is None:
+            self.current_size += out.count - start
+        self.record_counts[partition] += 1
+        return partition
+
+    def print_records(self, records):
+        """
+        :param records: An iterable of CSVRecords or lists of values, e.g. a
+            CSVParser.
+        :return: The number of records printed.
+        """
+        count = 0
+        for record in records:
+            self.print_record(record)
+            count += 1
+        return count
+
+    def get_paths(self):
+        """
+        :return: A dict from partition name to file path, in the order the
+            files were created.
+        """
+        return dict(self.paths)
+
+    def get_record_counts(self):
+        """
+        :return: A dict from partition name to the number of records printed.
+        """
+        return dict(self.record_counts)
+
+    def get_open_count(self):
+        """
+        :return: How often a file was opened, including reopenings.
+        """
+        return self.open_count
+
+    def flush(self):
+        for _, printer in self.open_files.values():
+            printer.flush()
+
+    def close(self):
+        while self.open_files:
+            _, (_, printer) = self.open_files.popitem(last=False)
+            printer.close(flush=True)
@@ -0,0 +1,220 @@
+import re
+from main.python.constants import Constants
+
+
+class RecordBoundaryScanner:
+    """
+    Finds the offsets at which CSV records end without tokenizing the input.
+
+    The scanner follows the Lexer's rules for encapsulated tokens, escapes
+    and comment lines, so input can be cut into slices that only hold whole
+    records. Its state is kept between calls to scan(), which means the
+    input may be passed in arbitrarily small pieces.
+    """
+
+    LINE_START = 0
+    FIELD_START = 1
+    SIMPLE = 2
+    QUOTED = 3
+    QUOTE_SEEN = 4
+    AFTER_QUOTE = 5
+    COMMENT = 6
+
+    WHITESPACE = {'\u0020', '\u200B', '\u200C', '\u200D', '\u3000', '\t',
+                  '\u000B', '\f', '\u001C', '\u001D', '\u001E', '\u001F'}
+
+    def __init__(self, format):
+        self.delimiter = format.get_delimiter()
+        self.quote_char = format.get_quote_character()
+        self.escape = format.get_escape_character()
+        if self.escape == self.quote_char:
+            # Read as doubled quotes, like the Lexer does
+            self.escape = None
+        self.comment_start = format.get_comment_marker()
+        self.ignore_surrounding_spaces = format.get_ignore_surrounding_spaces()
+        self.ignore_empty_lines = format.get_ignore_empty_lines()
+        specials = [Constants.CR, Constants.LF, self.delimiter]
+        if self.escape is not None:
+            specials.append(self.escape)
+        quoted_specials = [
+            c for c in (self.quote_char, self.escape) if c is not None
+        ]
+        self._simple_pattern = re.compile(
+            "[" + "".join(re.escape(c) for c in specials) + "]"
+        )
+        self._quoted_pattern = re.compile(
+            "[" + "".join(re.escape(c) for c in quoted_specials) + "]"
+        ) if quoted_specials else None
+        self._line_pattern = re.compile("[\r\n]")
+        self.reset()
+
+    def reset(self, position=0):
+        """
+        Forgets all scanning state, as if a new record started at position.
+
+        :param position: The absolute offset of the next character passed in.
+        """
+        self.state = RecordBoundaryScanner.LINE_START
+        self.escape_pending = False
+        self.cr_pending = False
+        self.invalid = False
+        self.position = position
+
+    def is_invalid(self):
+        """
+        Returns whether the text scanned so far had a character between the
+        closing quote of a field and the next delimiter, which the Lexer
+        rejects.
+
+        :return: True if invalid input was seen since the last reset().
+        """
+        return self.invalid
+
+    def is_inside_record(self):
+        """
+        Returns whether the text scanned so far ends in the middle of a record.
+
+        :return: True if a record has started but its end was not seen yet.
+        """
+        return self.escape_pending or self.state not in (
+            RecordBoundaryScanner.LINE_START, RecordBoundaryScanner.COMMENT
+        )
+
+    def _end_of_line(self, boundaries, end):
+        if self.state == RecordBoundaryScanner.COMMENT:
+            self.state = RecordBoundaryScanner.LINE_START
+            return
+        if self.state != RecordBoundaryScanner.LINE_START or \
+                not self.ignore_empty_lines:
+            boundaries.append(end)
+        self.state = RecordBoundaryScanner.LINE_START
+
+    def scan(self, text, final=False):
+        """
+        Scans the next piece of input.
+
+        A line that ends in CR cannot be resolved until the next character is
+        known, so the matching boundary is reported by the following call, or
+        by this one if final is set.
+
+        :param text: The next piece of input.
+        :param final: Whether text is the last piece of input.
+        :return: The absolute offsets directly after each record that ended
+            in this piece, in ascending order.
+        """
+        boundaries = []
+        base = self.position
+        length = len(text)
+        i = 0
+        delimiter = self.delimiter
+        quote_char = self.quote_char
+        escape = self.escape
+
+        while i < length:
+            c = text[i]
+
+            if self.cr_pending:
+                self.cr_pending = False
+                if c == Constants.LF:
+                    self._end_of_line(boundaries, base + i + 1)
+                    i += 1
+                    continue
+                self._end_of_line(boundaries, base + i)
+
+            if self.escape_pending:
+                self.escape_pending = False
+                i += 1
+                continue
+
+            state = self.state
+
+            if state == RecordBoundaryScanner.QUOTED:
+                match = self._quoted_pattern.search(text, i)
+                if match is None:
+                    i = length
+                    continue
+                i = match.start()
+                c = text[i]
+                if c == escape:
+                    self.escape_pending = True
+                else:
+                    self.state = RecordBoundaryScanner.QUOTE_SEEN
+                i += 1
+                continue
+
+            if state == RecordBoundaryScanner.QUOTE_SEEN:
+                if c == quote_char:
+                    self.state = RecordBoundaryScanner.QUOTED
+                    i += 1
+                    continue
+                state = self.state = RecordBoundaryScanner.AFTER_QUOTE
+
+            if state == RecordBoundaryScanner.COMMENT:
+                match = self._line_pattern.search(text, i)
+                if match is None:
+                    i = length
+                    continue
+                i = match.start()
+                c = text[i]
+
+            if c == Constants.CR:
+                self.cr_pending = True
+                i += 1
+                continue
+            if c == Constants.LF:
+                self._end_of_line(boundaries, base + i + 1)
+                i += 1
+                continue
+
+            if state == RecordBoundaryScanner.LINE_START:
+                if c == self.comment_start:
+                    self.state = RecordBoundaryScanner.COMMENT
+                    i += 1
+                    continue
+                state = self.state = RecordBoundaryScanner.FIELD_START
+
+            if state == RecordBoundaryScanner.FIELD_START:
+                if c == delimiter:
+                    i += 1
+                elif self.ignore_surrounding_spaces and c in self.WHITESPACE:
+                    i += 1
+                elif c == quote_char:
+                    self.state = RecordBoundaryScanner.QUOTED
+                    i += 1
+                else:
+                    self.state = RecordBoundaryScanner.SIMPLE
+                continue
+
+            if state == RecordBoundaryScanner.AFTER_QUOTE:
+                if c == delimiter:
+                    self.state = RecordBoundaryScanner.FIELD_START
+                elif c not in self.WHITESPACE:
+                    # The Lexer rejects this input, parsing the slice will
+                    # report it.
+                    self.invalid = True
+                    self.state = RecordBoundaryScanner.SIMPLE
+                    continue
+                i += 1
+                continue
+
+            # SIMPLE
+            if c == delimiter:
+                self.state = RecordBoundaryScanner.FIELD_START
+                i += 1
+            elif c == escape:
+                self.escape_pending = True
+                i += 1
+            else:
+                # Quotes inside simple tokens are plain content
+                match = self._simple_pattern.search(text, i + 1)
+                i = length if match is None else match.start()
+
+        self.position = base + length
+        if final:
+            if self.state == RecordBoundaryScanner.QUOTE_SEEN:
+                # A closing quote at the end of the input
+                self.state = RecordBoundaryScanner.AFTER_QUOTE
+            if self.cr_pending:
+                self.cr_pending = False
+                self._end_of_line(boundaries, self.position)
+        return boundaries
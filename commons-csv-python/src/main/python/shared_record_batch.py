@@ -0,0 +1,104 @@
+import io
+from multiprocessing import shared_memory
+from main.python.packed_records import PackedRecordReader, PackedRecordWriter
+
+
+class SharedRecordBatch:
+    def __init__(self, memory):
+        """
+        A batch of records held in a multiprocessing.shared_memory block.
+
+        The block holds the records in the PackedRecordLayout, so processes
+        attaching to it read fields straight from the shared buffer without
+        unpickling. Use create() to write a batch and attach() to open it in
+        another process by name.
+
+        :param memory: The SharedMemory block holding the batch.
+        """
+        self.memory = memory
+        self.reader = PackedRecordReader(memory.buf)
+
+    @staticmethod
+    def create(records, header_map=None):
+        """
+        Writes records into a new shared memory block.
+
+        :param records: The CSVRecords to write.
+        :param header_map: The header map of the records, taken from the
+            first record if None.
+        :return: The SharedRecordBatch, its creator is responsible for
+            calling unlink().
+        """
+        out = io.BytesIO()
+        writer = PackedRecordWriter(out, header_map)
+        for record in records:
+            writer.write(record)
+        size = writer.close()
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        memory.buf[:size] = out.getbuffer()
+        return SharedRecordBatch(memory)
+
+    @staticmethod
+    def attach(name):
+        """
+        Opens a batch created by another process.
+
+        :param name: The name of the batch's shared memory block.
+        :return: The SharedRecordBatch.
+        """
+        return SharedRecordBatch(shared_memory.SharedMemory(name=name))
+
+    @staticmethod
+    def from_parser(parser, batch_size=10000):
+        """
+        Parses records into consecutive shared memory batches.
+
+        :param parser: The CSVParser to read records from.
+        :param batch_size: The maximum number of records per batch.
+        :return: A generator of SharedRecordBatch objects.
+        """
+        batch = []
+        for record in parser:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield SharedRecordBatch.create(batch, parser.header_map)
+                batch = []
+        if batch:
+            yield SharedRecordBatch.create(batch, parser.header_map)
+
+    def get_name(self):
+        return self.memory.name
+
+    def get_header_map(self):
+        return self.reader.get_header_map()
+
+    def __len__(self):
+        return len(self.reader)
+
+    def __getitem__(self, index):
+        return self.reader[index]
+
+    def __iter__(self):
+        return iter(self.reader)
+
+    def close(self):
+        """
+        Detaches from the shared memory block.
+        """
+        if self.reader is not None:
+            self.reader.release()
+            self.reader = None
+            self.memory.close()
+
+    def unlink(self):
+        """
+        Closes and destroys the shared memory block.
+        """
+        self.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,152 @@
+import pickle
+import sys
+import tempfile
+from collections import OrderedDict
+from collections.abc import Sequence
+from main.python.closeable import Closeable
+from main.python.csv_record_batch import CSVRecordBatch
+
+
+class SpillingRecordList(Sequence, Closeable):
+    def __init__(self, max_bytes=64 * 1024 * 1024, batch_size=1000):
+        """
+        A list of CSVRecords that keeps at most max_bytes of them in memory.
+
+        Records are grouped into batches of batch_size. When the estimated
+        size of the batches in memory exceeds max_bytes, the least recently
+        used batch is written to a temporary file as a pickled CSVRecordBatch
+        and dropped. Accessing a spilled record loads its batch back.
+
+        The batch being appended to is never spilled, and a batch is written
+        again if records were appended to it since it was last written.
+        Records must not be modified, changes to a spilled batch are lost.
+        The temporary file is deleted by close().
+
+        :param max_bytes: The memory budget for records.
+        :param batch_size: The number of records per batch.
+        :raises ValueError: If max_bytes is negative or batch_size is not
+            positive.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.length = 0
+        # Batch index -> (records, estimated size), least recently used first
+        self.loaded = OrderedDict()
+        self.size = 0
+        # Batch index -> (offset, length) in the spill file
+        self.spilled = {}
+        # Batch indexes changed since they were last written
+        self.dirty = set()
+        self.file = None
+        self.mapping = None
+        self.closed = False
+
+    @staticmethod
+    def _estimate_size(record):
+        size = sys.getsizeof(record) + sys.getsizeof(record._values)
+        for value in record._values:
+            if value is not None:
+                size += sys.getsizeof(value)
+        return size
+
+    def append(self, record):
+        if self.closed:
+            raise ValueError("SpillingRecordList has been closed")
+        if self.mapping is None:
+            self.mapping = record.mapping
+        index = self.length // self.batch_size
+        if index in self.loaded or index in self.spilled:
+            self._batch(index)
+        else:
+            self.loaded[index] = ([], 0)
+        records, size = self.loaded[index]
+        records.append(record)
+        record_size = SpillingRecordList._estimate_size(record)
+        self.loaded[index] = (records, size + record_size)
+        self.loaded.move_to_end(index)
+        self.size += record_size
+        self.length += 1
+        self.dirty.add(index)
+        self._evict(index)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def _evict(self, keep):
+        # The partially filled last batch is still appended to
+        tail = self.length // self.batch_size if self.length % self.batch_size else None
+        for index in list(self.loaded):
+            if self.size <= self.max_bytes:
+                break
+            if index == keep or index == tail:
+                continue
+            records, size = self.loaded.pop(index)
+            self.size -= size
+            if index not in self.spilled or index in self.dirty:
+                if self.file is None:
+                    self.file = tempfile.TemporaryFile()
+                self.file.seek(0, 2)
+                offset = self.file.tell()
+                data = pickle.dumps(CSVRecordBatch(records), pickle.HIGHEST_PROTOCOL)
+                self.file.write(data)
+                self.spilled[index] = (offset, len(data))
+                self.dirty.discard(index)
+
+    def _batch(self, index):
+        entry = self.loaded.get(index)
+        if entry is not None:
+            self.loaded.move_to_end(index)
+            return entry[0]
+        if self.closed:
+            raise ValueError("SpillingRecordList has been closed")
+        offset, length = self.spilled[index]
+        self.file.seek(offset)
+        records = pickle.loads(self.file.read(length)).records
+        size = 0
+        for record in records:
+            # Share the header map again instead of one copy per batch
+            if record.mapping == self.mapping:
+                record.mapping = self.mapping
+            size += SpillingRecordList._estimate_size(record)
+        self.loaded[index] = (records, size)
+        self.size += size
+        self._evict(index)
+        return records
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("record index out of range")
+        return self._batch(index // self.batch_size)[index % self.batch_size]
+
+    def __iter__(self):
+        for index in range(0, self.length, self.batch_size):
+            yield from self._batch(index // self.batch_size)
+
+    def get_spilled_batch_count(self):
+        return len(self.spilled)
+
+    def get_size(self):
+        """
+        :return: The estimated size of the records held in memory.
+        """
+        return self.size
+
+    def close(self):
+        self.closed = True
+        self.loaded.clear()
+        self.size = 0
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -57,6 +57,12 @@ class Token:
     
     def set_content(self, content):
         self.content = content
+
+    def get_length(self):
+        """
+        Returns the length of the value read so far.
+        """
+        return len(self.content)
     
     def append(self, c):
         """
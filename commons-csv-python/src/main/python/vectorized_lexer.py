@@ -0,0 +1,198 @@
+from main.python.closeable import Closeable
+from main.python.constants import Constants
+from main.python.token import Token
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class VectorizedLexer(Closeable):
+    """
+    Lexer replacement that locates all fields up front with NumPy.
+
+    The input is viewed as an array of code points. Delimiter, line break
+    and quote masks are computed with vectorized comparisons, and the quote
+    parity from a cumulative XOR tells which separators are inside quoted
+    fields. Tokens are then served from the resulting field offsets, so
+    CSVParser builds records exactly as it does with the Lexer.
+    """
+
+    def __init__(self, text, quote_char, ignore_empty_lines, starts, ends,
+                 separators, line_breaks):
+        self.text = text
+        self.quote_char = quote_char
+        self.ignore_empty_lines = ignore_empty_lines
+        self.starts = starts
+        self.ends = ends
+        self.separators = separators
+        self.line_breaks = line_breaks
+        self.index = 0
+        self.position = 0
+        self.at_line_start = True
+        self.first_eol = None
+        self.closed = False
+        self.counted_position = 0
+        self.line_count = 0
+
+    @staticmethod
+    def is_supported(format):
+        """
+        Returns whether the format can be tokenized by this lexer.
+
+        :param format: The CSVFormat.
+        :return: True if NumPy is available and the format has no escape
+            character, no comment marker and keeps surrounding spaces.
+        """
+        return (
+            np is not None
+            and format.get_escape_character() is None
+            and format.get_comment_marker() is None
+            and not format.get_ignore_surrounding_spaces()
+            and len(format.get_delimiter()) == 1
+        )
+
+    @staticmethod
+    def create(format, text):
+        """
+        Locates the fields of text.
+
+        :param format: The CSVFormat, see is_supported().
+        :param text: The complete input.
+        :return: The VectorizedLexer, or None if the input needs the Lexer,
+            e.g. because a quote is not where an encapsulated token allows it
+            or a field exceeds the format's max_field_size.
+        """
+        if not VectorizedLexer.is_supported(format):
+            return None
+
+        chars = np.frombuffer(
+            text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+        )
+        length = len(chars)
+        is_lf = chars == ord(Constants.LF)
+        is_cr = chars == ord(Constants.CR)
+        cr_before = np.zeros(length, dtype=bool)
+        cr_before[1:] = is_cr[:-1]
+        # A line break starts at a CR or at a LF not preceded by CR
+        is_break = is_cr | (is_lf & ~cr_before)
+
+        quote_char = format.get_quote_character()
+        if quote_char is not None:
+            is_quote = chars == ord(quote_char)
+            inside = np.bitwise_xor.accumulate(is_quote.view(np.uint8)) == 1
+            if length and inside[-1]:
+                return None
+        else:
+            is_quote = None
+            inside = np.zeros(length, dtype=bool)
+
+        is_delimiter = (chars == ord(format.get_delimiter())) & ~inside
+        is_break &= ~inside
+        separators = np.flatnonzero(is_delimiter | is_break)
+
+        break_length = np.ones(len(separators), dtype=np.int64)
+        lf_after = np.zeros(length, dtype=bool)
+        lf_after[:-1] = is_lf[1:]
+        break_length[(is_cr & lf_after)[separators]] = 2
+        line_breaks = is_break[separators]
+        ends = np.append(separators, length)
+        starts = np.empty(len(ends), dtype=np.int64)
+        starts[0] = 0
+        starts[1:] = separators + np.where(line_breaks, break_length, 1)
+
+        if is_quote is not None and is_quote.any():
+            # Every opening quote has to start a field, every closing quote
+            # has to be escaped by a second quote or end the field.
+            field_start = np.zeros(length + 1, dtype=bool)
+            field_start[starts] = True
+            field_end = np.zeros(length + 1, dtype=bool)
+            field_end[ends] = True
+            quote_before = np.zeros(length, dtype=bool)
+            quote_before[1:] = is_quote[:-1] & ~inside[:-1]
+            quote_after = np.zeros(length, dtype=bool)
+            quote_after[:-1] = is_quote[1:]
+            opening = is_quote & inside
+            closing = is_quote & ~inside
+            if (opening & ~field_start[:-1] & ~quote_before).any():
+                return None
+            if (closing & ~field_end[1:] & ~quote_after).any():
+                return None
+
+        max_field_size = format.get_max_field_size()
+        if max_field_size is not None and len(ends) and \
+                (ends - starts).max() > max_field_size:
+            # Leave reporting the oversized field to the Lexer
+            return None
+
+        return VectorizedLexer(
+            text, quote_char, format.get_ignore_empty_lines(),
+            starts.tolist(), ends.tolist(), separators.tolist(),
+            line_breaks.tolist()
+        )
+
+    def get_first_eol(self):
+        return self.first_eol
+
+    def get_character_position(self):
+        return self.position
+
+    def get_current_line_number(self):
+        if self.counted_position < self.position:
+            consumed = self.text[self.counted_position:self.position]
+            self.line_count += consumed.count(Constants.CR) \
+                + consumed.count(Constants.LF) - consumed.count(Constants.CRLF)
+            self.counted_position = self.position
+        if self.at_line_start or self.index >= len(self.starts):
+            return self.line_count
+        return self.line_count + 1
+
+    def _content(self, start, end):
+        if start < end and self.text[start] == self.quote_char:
+            quote = self.quote_char
+            return self.text[start + 1:end - 1].replace(quote + quote, quote)
+        return self.text[start:end]
+
+    def next_token(self, token: Token):
+        while self.index < len(self.starts):
+            index = self.index
+            start = self.starts[index]
+            end = self.ends[index]
+            self.index += 1
+
+            if index == len(self.separators):
+                # Input after the last separator
+                self.position = end
+                if start == end and (index == 0 or self.line_breaks[index - 1]):
+                    break
+                token.set_content(self._content(start, end))
+                token.set_type(Token.Type.EOF)
+                token.set_ready(True)
+                return token
+
+            self.position = self.starts[index + 1]
+            if self.line_breaks[index]:
+                if self.first_eol is None:
+                    self.first_eol = self.text[end:self.position]
+                if self.ignore_empty_lines and self.at_line_start and start == end:
+                    continue
+                token.set_content(self._content(start, end))
+                token.set_type(Token.Type.EORECORD)
+                self.at_line_start = True
+                return token
+
+            token.set_content(self._content(start, end))
+            token.set_type(Token.Type.TOKEN)
+            self.at_line_start = False
+            return token
+
+        token.set_type(Token.Type.EOF)
+        return token
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+        self.index = len(self.starts)
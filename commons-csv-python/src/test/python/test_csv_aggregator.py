@@ -0,0 +1,103 @@
+import io
+import random
+import pytest
+from main.python.aggregate_function import AggregateFunction
+from main.python.column_type import ColumnType
+from main.python.csv_aggregator import Aggregate, CSVAggregator
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_printer import CSVPrinter
+
+FORMAT = CSVFormat.DEFAULT.with_first_record_as_header().with_null_string("")
+
+
+def sales(count, seed=0):
+    rng = random.Random(seed)
+    rows = [(f"c{rng.randrange(50)}", rng.choice(["eu", "us"]), rng.randrange(1000))
+            for _ in range(count)]
+    text = "customer,region,amount\r\n" + "".join(f"{c},{r},{a}\r\n" for c, r, a in rows)
+    return rows, text
+
+
+AGGREGATES = [
+    Aggregate(AggregateFunction.COUNT),
+    Aggregate(AggregateFunction.SUM, "amount"),
+    Aggregate(AggregateFunction.MIN, "amount", ColumnType.INT),
+    Aggregate(AggregateFunction.MAX, "amount", ColumnType.INT),
+    Aggregate(AggregateFunction.MEAN, "amount"),
+    Aggregate(AggregateFunction.DISTINCT, "region"),
+]
+
+
+def expected(rows):
+    groups = {}
+    for customer, region, amount in rows:
+        groups.setdefault(customer, []).append((region, amount))
+    return {
+        customer: [customer, str(len(values)), str(sum(a for _, a in values)),
+                   str(min(a for _, a in values)), str(max(a for _, a in values)),
+                   str(sum(a for _, a in values) / len(values)),
+                   str(len({r for r, _ in values}))]
+        for customer, values in groups.items()
+    }
+
+
+class TestCSVAggregator:
+
+    @pytest.mark.parametrize("max_groups", [100000, 7, 1])
+    def test_aggregate(self, max_groups):
+        rows, text = sales(2000)
+        aggregator = CSVAggregator(["customer"], AGGREGATES, max_groups=max_groups,
+                                   partitions=4)
+        for record in CSVParser.parse(text, FORMAT):
+            aggregator.add(record)
+        records = list(aggregator.records())
+        assert {r.get("customer"): r.values() for r in records} == expected(rows)
+        assert records[0].get("sum_amount") is not None
+        assert (aggregator.get_spill_count() > 0) == (max_groups < 50)
+        if max_groups > 50:
+            assert [r.get("customer") for r in records] == list(expected(rows))
+
+    def test_split_large_partitions(self, tmp_path):
+        rows, text = sales(2000)
+        # One partition holds all groups, so it has to be split again
+        aggregator = CSVAggregator(["customer"], AGGREGATES, max_groups=3,
+                                   partitions=1, temp_dir=tmp_path)
+        for record in CSVParser.parse(text, FORMAT):
+            aggregator.add(record)
+        records = list(aggregator.records())
+        assert {r.get("customer"): r.values() for r in records} == expected(rows)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_nulls_and_missing(self):
+        text = "k,v\r\na,1\r\na,\r\nb\r\nb,2.5\r\n"
+        records = CSVAggregator.aggregate(CSVParser.parse(text, FORMAT), ["k"], [
+            Aggregate(AggregateFunction.COUNT),
+            Aggregate(AggregateFunction.COUNT, "v"),
+            Aggregate(AggregateFunction.SUM, "v"),
+            Aggregate(AggregateFunction.MIN, "v", ColumnType.FLOAT, name="low"),
+        ])
+        assert [r.values() for r in records] == [["a", "2", "1", "1", "1.0"],
+                                                 ["b", "2", "1", "2.5", "2.5"]]
+
+    def test_invalid_value(self):
+        text = "k,v\r\na,x\r\n"
+        with pytest.raises(ValueError):
+            list(CSVAggregator.aggregate(CSVParser.parse(text, FORMAT), ["k"],
+                                         [Aggregate(AggregateFunction.SUM, "v")]))
+        with pytest.raises(ValueError):
+            Aggregate(AggregateFunction.SUM)
+
+    def test_print_to(self):
+        rows, text = sales(100, seed=2)
+        aggregator = CSVAggregator(["region"], [Aggregate(AggregateFunction.COUNT)])
+        for record in CSVParser.parse(text, FORMAT):
+            aggregator.add(record)
+        out = io.StringIO()
+        printer = CSVPrinter(out, CSVFormat.DEFAULT.with_header(*aggregator.get_header()))
+        assert aggregator.print_to(printer) == 2
+        lines = out.getvalue().splitlines()
+        assert lines[0] == "region,count"
+        counts = dict(line.split(",") for line in lines[1:])
+        assert counts == {region: str(sum(1 for _, r, _ in rows if r == region))
+                          for region in ("eu", "us")}
@@ -0,0 +1,72 @@
+import io
+import random
+import pytest
+from main.python.csv_deduplicator import BloomFilter, CSVDeduplicator
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_printer import CSVPrinter
+
+FORMAT = CSVFormat.DEFAULT.with_first_record_as_header()
+
+
+def events(count=3000, seed=0):
+    rng = random.Random(seed)
+    rows = [(f"u{rng.randrange(500)}", rng.choice(["a", "b"])) for _ in range(count)]
+    text = "user,kind\r\n" + "".join(f"{u},{k}\r\n" for u, k in rows)
+    return rows, text
+
+
+def first_occurrences(rows, key):
+    seen = set()
+    kept = []
+    for number, row in enumerate(rows, 2):
+        if key(row) not in seen:
+            seen.add(key(row))
+            kept.append((number, list(row)))
+    return kept
+
+
+class TestCSVDeduplicator:
+
+    @pytest.mark.parametrize("max_keys", [1000000, 100, 1])
+    @pytest.mark.parametrize("keys", [["user"], None])
+    def test_exact(self, max_keys, keys):
+        rows, text = events()
+        deduplicator = CSVDeduplicator(keys, max_keys=max_keys, partitions=4)
+        kept = [(r.get_record_number(), r.values())
+                for r in deduplicator.dedup(CSVParser.parse(text, FORMAT))]
+        key = (lambda row: row[0]) if keys else tuple
+        assert kept == first_occurrences(rows, key)
+        assert deduplicator.is_spilled() == (max_keys < 500)
+        assert deduplicator.get_record_count() == len(rows)
+        assert deduplicator.get_duplicate_count() == len(rows) - len(kept)
+
+    def test_approximate(self):
+        rows, text = events()
+        deduplicator = CSVDeduplicator(["user", 1], approximate=True, capacity=2000,
+                                       error_rate=0.01)
+        kept = [(r.get_record_number(), r.values())
+                for r in deduplicator.dedup(CSVParser.parse(text, FORMAT))]
+        expected = first_occurrences(rows, tuple)
+        # False positives only drop records, duplicates are never kept
+        assert all(entry in expected for entry in kept)
+        assert len(kept) >= len(expected) * 0.97
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        # Fresh keys are only reported as present by false positives
+        assert sum(bloom.add(str(i).encode()) for i in range(1000)) < 30
+        assert all(str(i).encode() in bloom for i in range(1000))
+        false_positives = sum(str(i).encode() in bloom for i in range(1000, 11000))
+        assert false_positives < 300
+        with pytest.raises(ValueError):
+            BloomFilter(10, 1.5)
+
+    def test_print_to(self):
+        text = "id,v\r\n1,a\r\n2,b\r\n1,c\r\n3,d\r\n"
+        out = io.StringIO()
+        count = CSVDeduplicator(["id"]).print_to(CSVParser.parse(text, FORMAT),
+                                                 CSVPrinter(out, CSVFormat.DEFAULT),
+                                                 number_column=True)
+        assert count == 3
+        assert out.getvalue().splitlines() == ["2,1,a", "3,2,b", "5,3,d"]
@@ -0,0 +1,85 @@
+import io
+import random
+import pytest
+from main.python.csv_differ import CSVDiffer, RecordDiff
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_printer import CSVPrinter
+
+FORMAT = CSVFormat.DEFAULT.with_first_record_as_header()
+
+
+def snapshots(count=1000, seed=0):
+    rng = random.Random(seed)
+    old = {f"k{i}": [f"k{i}", f"name {i}", str(rng.randrange(100))] for i in range(count)}
+    new = {key: list(values) for key, values in old.items()}
+    removed = set(rng.sample(sorted(old), 50))
+    for key in removed:
+        del new[key]
+    changed = set(rng.sample(sorted(new), 80))
+    for key in changed:
+        new[key][2] = str(int(new[key][2]) + 1)
+    added = {f"n{i}" for i in range(30)}
+    for key in added:
+        new[key] = [key, "added", "0"]
+    return old, new, removed, changed, added
+
+
+def parser(rows):
+    text = "id,name,score\r\n" + "".join(",".join(row) + "\r\n" for row in rows.values())
+    return CSVParser.parse(text, FORMAT)
+
+
+class TestCSVDiffer:
+
+    @pytest.mark.parametrize("partitions, use_processes", [(1, False), (8, False), (4, True)])
+    def test_diff(self, partitions, use_processes):
+        old, new, removed, changed, added = snapshots()
+        differ = CSVDiffer(["id"], partitions=partitions, use_processes=use_processes,
+                           max_workers=2)
+        diffs = list(differ.diff(parser(old), parser(new)))
+        by_kind = {}
+        for diff in diffs:
+            by_kind.setdefault(diff.kind, set()).add(diff.key[0])
+        assert by_kind == {RecordDiff.REMOVED: removed, RecordDiff.CHANGED: changed,
+                           RecordDiff.ADDED: added}
+        diff = next(d for d in diffs if d.kind == RecordDiff.CHANGED)
+        key = diff.key[0]
+        assert diff.get_changes() == [(2, old[key][2], new[key][2])]
+        assert diff.old_record_number == list(old).index(key) + 2
+        assert diff.new_record_number == list(new).index(key) + 2
+
+    def test_duplicate_keys_and_columns(self):
+        old = "id,a,b\r\nx,1,1\r\nx,2,2\r\ny,1,1\r\n"
+        new = "id,a,b\r\nx,1,9\r\ny,1,1\r\n"
+        diffs = list(CSVDiffer(["id"], columns=["a"], partitions=1).diff(
+            CSVParser.parse(old, FORMAT), CSVParser.parse(new, FORMAT)))
+        assert diffs == [RecordDiff(RecordDiff.REMOVED, ("x",), 3, None, ["x", "2", "2"], None, None)]
+
+    def test_print_to(self):
+        old = "id,a,b\r\n1,p,x\r\n2,q,y\r\n"
+        new = "id,a,b\r\n2,r,y\r\n3,s,z\r\n"
+        differ = CSVDiffer(["id"], partitions=1)
+        out = io.StringIO()
+        count = differ.print_to(CSVParser.parse(old, FORMAT), CSVParser.parse(new, FORMAT),
+                                CSVPrinter(out, CSVFormat.DEFAULT))
+        assert count == 3
+        assert differ.get_header() == ["change", "id", "column", "old_value", "new_value"]
+        assert out.getvalue().splitlines() == [
+            "changed,2,a,q,r", "added,3,a,,s", "added,3,b,,z",
+            "removed,1,a,p,", "removed,1,b,x,",
+        ]
+
+    def test_print_to_key_only(self):
+        differ = CSVDiffer(["id"], partitions=1)
+        out = io.StringIO()
+        differ.print_to(CSVParser.parse("id\r\n1\r\n", FORMAT),
+                        CSVParser.parse("id\r\n2\r\n", FORMAT), CSVPrinter(out, CSVFormat.DEFAULT))
+        assert out.getvalue().splitlines() == ["added,2,,,", "removed,1,,,"]
+
+    def test_header_mismatch(self):
+        with pytest.raises(ValueError):
+            list(CSVDiffer(["id"]).diff(CSVParser.parse("id,a\r\n", FORMAT),
+                                        CSVParser.parse("id,b\r\n", FORMAT)))
+        with pytest.raises(ValueError):
+            CSVDiffer([])
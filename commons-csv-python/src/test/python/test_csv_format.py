@@ -5,6 +5,7 @@ import os
 from enum import Enum
 from main.python.csv_format import CSVFormat
 from main.python.quote_mode import QuoteMode
+from main.python.parse_engine import ParseEngine
 from main.python.constants import Constants
 
 
@@ -624,6 +625,23 @@ class TestCSVFormat:
         format_with_header = CSVFormat.DEFAULT.with_header(Enum('EmptyEnum', []))
         assert len(format_with_header.get_header()) == 0
 
+    def test_with_engine(self):
+        format_with_engine = CSVFormat.DEFAULT.with_engine(ParseEngine.NUMPY)
+        assert format_with_engine.get_engine() == ParseEngine.NUMPY
+        assert format_with_engine.with_delimiter(";").get_engine() == ParseEngine.NUMPY
+        assert CSVFormat.DEFAULT.get_engine() is None
+
+    def test_with_limits(self):
+        format = (CSVFormat.DEFAULT.with_max_field_size(10)
+                  .with_max_record_size(100).with_max_columns(5))
+        assert format.get_max_field_size() == 10
+        assert format.get_max_record_size() == 100
+        assert format.get_max_columns() == 5
+        assert format.with_delimiter(";").get_max_columns() == 5
+        assert CSVFormat.DEFAULT.get_max_field_size() is None
+        with pytest.raises(ValueError):
+            CSVFormat.DEFAULT.with_max_columns(0)
+
     def test_with_escape(self):
         format_with_escape = CSVFormat.DEFAULT.with_escape("&")
         assert format_with_escape.get_escape_character() == "&"
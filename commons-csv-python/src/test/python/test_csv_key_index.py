@@ -0,0 +1,63 @@
+import os
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_key_index import CSVKeyIndex, CSVTable
+from main.python.csv_parser import CSVParser
+
+FORMAT = CSVFormat.DEFAULT.with_first_record_as_header()
+
+
+@pytest.fixture
+def customers(tmp_path):
+    path = tmp_path / "customers.csv"
+    rows = ["﻿id,name,note\r\n"]
+    for i in range(300):
+        note = f'"line\r\nbreak ""{i}"""' if i % 7 == 0 else f"née {i}"
+        rows.append(f"c{i % 40},name {i},{note}\r\n")
+    path.write_bytes("".join(rows).encode("utf-8"))
+    return path
+
+
+def full_parse(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return CSVParser.parse(f.read(), FORMAT).get_records()
+
+
+class TestCSVKeyIndex:
+
+    def test_find(self, customers):
+        expected = full_parse(customers)
+        with CSVTable(customers, "utf-8-sig", FORMAT) as table:
+            for key in ("c0", "c7", "c39"):
+                records = table.find("id", key)
+                matches = [r for r in expected if r.get("id") == key]
+                assert [(r.values(), r.get_record_number(), r.get_character_position())
+                        for r in records] == \
+                    [(r.values(), r.get_record_number(), r.get_character_position())
+                     for r in matches]
+                assert records[0].get("id") == key
+            assert table.find("id", "missing") == []
+            assert table.find(1, "name 299")[0].get("note") == "née 299"
+        assert (customers.parent / "customers.csv.id.csvkey").exists()
+
+    def test_reuse_and_rebuild(self, customers, tmp_path):
+        index = CSVKeyIndex(customers, "utf-8-sig", FORMAT, "id", tmp_path / "id.idx")
+        assert not index.is_valid()
+        assert index.load() is None
+        index.open()
+        assert index.get_record_count() == 300
+        index.close()
+        assert CSVKeyIndex(customers, "utf-8-sig", FORMAT, "id", tmp_path / "id.idx").is_valid()
+        assert not CSVKeyIndex(customers, "utf-8-sig", CSVFormat.EXCEL, "id",
+                               tmp_path / "id.idx").is_valid()
+
+        with open(customers, "ab") as f:
+            f.write("c99,appended,x\r\n".encode("utf-8"))
+        stat = os.stat(customers)
+        os.utime(customers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        with CSVTable(customers, "utf-8-sig", FORMAT, index_dir=tmp_path) as table:
+            assert [r.get("name") for r in table.find("id", "c99")] == ["appended"]
+
+    def test_unknown_column(self, customers):
+        with pytest.raises(ValueError):
+            CSVKeyIndex(customers, "utf-8-sig", FORMAT, "missing").build()
@@ -0,0 +1,65 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from main.python.csv_format import CSVFormat
+from main.python.csv_multi_file_parser import CSVMultiFileParser
+from main.python.csv_parser import CSVParser
+
+FORMAT = CSVFormat.DEFAULT.with_first_record_as_header()
+
+
+@pytest.fixture
+def hourly(tmp_path):
+    directory = tmp_path / "hourly"
+    directory.mkdir()
+    for hour in range(12):
+        rows = "".join(f"{hour},{i}\r\n" for i in range(hour * 10 + 1))
+        (directory / f"{hour:02d}.csv").write_text("hour,value\r\n" + rows, newline="")
+    return directory
+
+
+class TestCSVMultiFileParser:
+
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_ordered(self, hourly, use_processes):
+        parser = CSVParser.parse_many(hourly, "utf-8", FORMAT, use_processes=use_processes,
+                                      max_workers=3)
+        pairs = list(parser)
+        assert len(pairs) == sum(hour * 10 + 1 for hour in range(12))
+        assert [path.name for path, _ in pairs] == \
+            [f"{hour:02d}.csv" for hour in range(12) for _ in range(hour * 10 + 1)]
+        for path, record in pairs:
+            assert record.get("hour") == str(int(path.stem))
+            assert record.get_record_number() == int(record.get("value")) + 2
+        assert parser.get_header_map() == {"hour": 0, "value": 1}
+
+    def test_completion_order_and_glob(self, hourly):
+        parser = CSVParser.parse_many(str(hourly / "0*.csv"), "utf-8", FORMAT, ordered=False)
+        assert len(parser.get_paths()) == 10
+        pairs = list(parser)
+        assert len(pairs) == sum(hour * 10 + 1 for hour in range(10))
+        # Records of a file stay together and in order
+        by_file = {}
+        for path, record in pairs:
+            by_file.setdefault(path, []).append(record.get_record_number())
+        assert all(numbers == list(range(2, len(numbers) + 2)) for numbers in by_file.values())
+
+    def test_given_executor(self, hourly):
+        with ThreadPoolExecutor(2) as executor:
+            parser = CSVParser.parse_many(hourly, "utf-8", FORMAT, max_in_flight=1,
+                                          executor=executor)
+            assert parser.max_in_flight == 1
+            assert len(list(parser)) == sum(hour * 10 + 1 for hour in range(12))
+            # The executor is left running
+            assert executor.submit(int, "1").result() == 1
+        with pytest.raises(ValueError):
+            CSVParser.parse_many(hourly, "utf-8", FORMAT, max_in_flight=0)
+
+    def test_header_mismatch(self, hourly):
+        (hourly / "99.csv").write_text("hour,amount\r\n1,2\r\n")
+        with pytest.raises(ValueError, match="99.csv"):
+            list(CSVParser.parse_many(hourly, "utf-8", FORMAT, max_workers=2))
+
+    def test_parse_error_names_file(self, tmp_path):
+        (tmp_path / "bad.csv").write_text('hour,value\r\n"1,2\r\n')
+        with pytest.raises(IOError, match="bad.csv"):
+            list(CSVMultiFileParser([tmp_path / "bad.csv"], "utf-8", FORMAT))
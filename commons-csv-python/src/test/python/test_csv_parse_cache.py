@@ -0,0 +1,71 @@
+import os
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parse_cache import CSVParseCache
+
+
+class TestCSVParseCache:
+
+    @pytest.fixture(autouse=True)
+    def set_up(self, tmp_path):
+        self.path = tmp_path / "lookup.csv"
+        self.path.write_text("code,name\nDE,Germany\nFR,France\n", encoding="utf-8")
+        self.format = CSVFormat.DEFAULT.with_first_record_as_header()
+
+    def test_hit_and_miss(self):
+        cache = CSVParseCache()
+        first = cache.parse(self.path, "utf-8", self.format)
+        second = cache.parse(str(self.path), "utf-8", self.format)
+        assert first is second
+        assert [r.get("name") for r in first] == ["Germany", "France"]
+        assert cache.get_hits() == 1
+        assert cache.get_misses() == 1
+        assert len(cache) == 1
+        assert cache.get_size() > 0
+
+    def test_modified_file_is_parsed_again(self):
+        cache = CSVParseCache()
+        cache.parse(self.path, "utf-8", self.format)
+        self.path.write_text("code,name\nIT,Italy\n", encoding="utf-8")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        records = cache.parse(self.path, "utf-8", self.format)
+        assert [r.get("code") for r in records] == ["IT"]
+        assert cache.get_misses() == 2
+
+    def test_format_is_part_of_the_key(self):
+        cache = CSVParseCache()
+        cache.parse(self.path, "utf-8", self.format)
+        cache.parse(self.path, "utf-8", CSVFormat.DEFAULT)
+        cache.parse(self.path, "utf-8", self.format.with_trim())
+        assert cache.get_misses() == 3
+        assert cache.get_hits() == 0
+
+    def test_columns(self):
+        cache = CSVParseCache()
+        columns = cache.parse_columns(self.path, "utf-8", self.format)
+        assert columns == {"code": ["DE", "FR"], "name": ["Germany", "France"]}
+        assert cache.parse_columns(self.path, "utf-8", self.format) is columns
+        self.path.write_text("a,b\nc\n", encoding="utf-8")
+        cache.invalidate(self.path)
+        assert cache.parse_columns(self.path, "utf-8", CSVFormat.DEFAULT) == \
+            {0: ["a", "c"], 1: ["b", None]}
+
+    def test_lru_eviction(self, tmp_path):
+        other = tmp_path / "other.csv"
+        other.write_text("code,name\nES,Spain\n", encoding="utf-8")
+        cache = CSVParseCache()
+        cache.parse(self.path, "utf-8", self.format)
+        one_entry = cache.get_size()
+        cache.max_bytes = one_entry + one_entry // 2
+        cache.parse(other, "utf-8", self.format)
+        assert len(cache) == 1
+        cache.parse(other, "utf-8", self.format)
+        assert cache.get_hits() == 1
+        assert cache.get_size() <= cache.max_bytes
+
+    def test_entry_larger_than_budget_is_not_cached(self):
+        cache = CSVParseCache(max_bytes=10)
+        assert len(cache.parse(self.path, "utf-8", self.format)) == 2
+        assert len(cache) == 0
+        assert cache.get_size() == 0
@@ -711,6 +711,108 @@ class TestCSVParser:
             assert record.get("c") == record.get(2)
         assert not records.has_next()
 
+    def test_read_ahead(self):
+        inp = "".join(f"{i},{i * 2}\n" for i in range(1000))
+        with CSVParser.parse(inp, CSVFormat.DEFAULT.with_header("A", "B")) as parser:
+            parser.enable_read_ahead(queue_size=2, batch_size=7)
+            records = list(parser)
+        assert len(records) == 1000
+        assert [r.get_record_number() for r in records] == list(range(1, 1001))
+        assert records[999].get("B") == "1998"
+
+    def test_read_ahead_propagates_errors(self):
+        parser = CSVParser.parse("a,b\n\"c\"d,e\n", CSVFormat.DEFAULT)
+        iterator = parser.enable_read_ahead().iterator()
+        assert next(iterator).values() == ["a", "b"]
+        with pytest.raises(IOError):
+            next(iterator)
+
+    def test_read_ahead_close(self):
+        inp = "x\n" * 10000
+        parser = CSVParser.parse(inp, CSVFormat.DEFAULT).enable_read_ahead(1, 1)
+        iterator = parser.iterator()
+        assert next(iterator).values() == ["x"]
+        parser.close()
+        assert not iterator.thread.is_alive()
+        with pytest.raises(StopIteration):
+            next(iterator)
+
+    def test_enable_interning(self):
+        inp = "country,city,id\n" + "".join(f"de,city{i},{i}\n" for i in range(100))
+        parser = CSVParser.parse(inp, CSVFormat.DEFAULT.with_first_record_as_header())
+        records = parser.enable_interning(["country", 2], max_cardinality=10).get_records()
+        assert records[0].get("country") is records[99].get("country")
+        assert records[0].get("city") is not records[99].get("city")
+        assert [r.get("id") for r in records] == [str(i) for i in range(100)]
+        assert parser.intern_tables[2] is None
+
+        parser = CSVParser.parse("a,x\nb,x\na,x\n", CSVFormat.DEFAULT).enable_interning()
+        first, second, third = parser.get_records()
+        assert first.get(0) is third.get(0)
+        assert first.get(1) is second.get(1) is third.get(1)
+        with pytest.raises(ValueError):
+            CSVParser.parse("a\n", CSVFormat.DEFAULT).enable_interning(["a"])
+
+    @pytest.mark.parametrize("format", [
+        CSVFormat.DEFAULT.with_first_record_as_header(),
+        CSVFormat.DEFAULT.with_comment_marker("#").with_null_string("N"),
+        CSVFormat.DEFAULT.with_trailing_delimiter().with_trim(),
+    ])
+    def test_enable_wide_rows(self, format):
+        inp = "a,b,c\n# note\n1,N, 2 ,\n\n3\n4,5,6,7,8\n,,\n"
+        expected = CSVParser.parse(inp, format).get_records()
+        parser = CSVParser.parse(inp, format).enable_wide_rows()
+        actual = parser.get_records()
+        assert [r.to_list() for r in actual] == [r.to_list() for r in expected]
+        assert [r.get_comment() for r in actual] == [r.get_comment() for r in expected]
+        assert [r.get_record_number() for r in actual] == \
+            [r.get_record_number() for r in expected]
+        assert [r.get_character_position() for r in actual] == \
+            [r.get_character_position() for r in expected]
+        assert [r.is_consistent() for r in actual] == [r.is_consistent() for r in expected]
+
+    def test_get_header_names(self):
+        parser = CSVParser.parse("x,y,z\n1,2,3\n", CSVFormat.DEFAULT.with_first_record_as_header())
+        assert parser.get_header_names() == ["x", "y", "z"]
+        assert parser.get_header_names() is parser.get_header_names()
+        assert CSVParser.parse("1\n", CSVFormat.DEFAULT).get_header_names() is None
+
+    @pytest.mark.parametrize("wide", [False, True])
+    def test_limits(self, wide):
+        def records(inp, format):
+            parser = CSVParser.parse(inp, format)
+            if wide:
+                parser.enable_wide_rows()
+            return parser.get_records()
+
+        inp = "a,bb,ccc\n1,22,333\n"
+        assert len(records(inp, CSVFormat.DEFAULT.with_max_field_size(3)
+                           .with_max_record_size(9).with_max_columns(3))) == 2
+        with pytest.raises(IOError, match=r"line 1\).*field exceeds the maximum size of 2"):
+            records(inp, CSVFormat.DEFAULT.with_max_field_size(2))
+        with pytest.raises(IOError, match=r"line 1\).*maximum of 2 columns"):
+            records(inp, CSVFormat.DEFAULT.with_max_columns(2))
+        with pytest.raises(IOError, match=r"line 1\).*record exceeds the maximum size of 8"):
+            records(inp, CSVFormat.DEFAULT.with_max_record_size(8))
+
+    def test_limits_stop_unterminated_quote(self):
+        inp = 'a,"b\n' + "x,y\n" * 100000
+        parser = CSVParser.parse(inp, CSVFormat.DEFAULT.with_max_field_size(1000))
+        with pytest.raises(IOError, match=r"line 2\d\d\)"):
+            parser.get_records()
+        with pytest.raises(IOError, match="record exceeds"):
+            CSVParser.parse(inp, CSVFormat.DEFAULT.with_max_record_size(50)).get_records()
+
+    def test_get_records_spilling(self):
+        inp = "A,B\n" + "".join(f"{i},{2 * i}\n" for i in range(1000))
+        parser = CSVParser.parse(inp, CSVFormat.DEFAULT.with_first_record_as_header())
+        with parser.get_records_spilling(max_bytes=4096, batch_size=50) as records:
+            assert len(records) == 1000
+            assert records.get_spilled_batch_count() > 0
+            assert records[999].get("B") == "1998"
+            assert records[-1000].get_record_number() == 2
+            assert [r.get("A") for r in records] == [str(i) for i in range(1000)]
+
     def test_roundtrip(self):
         out = io.StringIO()
         with CSVPrinter(out, CSVFormat.DEFAULT) as printer:
@@ -0,0 +1,76 @@
+import io
+import time
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_printer import CSVPrinter
+from main.python.csv_pipeline import CSVPipeline
+
+
+def square_odd(record):
+    value = int(record.get("n"))
+    if value % 2 == 0:
+        return None
+    return [record.get_record_number(), value * value]
+
+
+def slow_reverse(record):
+    # Later records finish first, results must still come back in order
+    time.sleep(0.001 * (record.get_record_number() % 3))
+    return list(reversed(record.values()))
+
+
+class TestCSVPipeline:
+
+    INPUT = "n\n" + "".join(f"{i}\n" for i in range(100))
+
+    def parse(self):
+        return CSVParser.parse(self.INPUT, CSVFormat.DEFAULT.with_first_record_as_header())
+
+    def test_thread_pool_preserves_order(self):
+        pipeline = CSVPipeline(self.parse(), slow_reverse, max_workers=4, batch_size=3)
+        results = list(pipeline.results())
+        assert results == [[str(i)] for i in range(100)]
+
+    def test_process_pool(self):
+        out = io.StringIO()
+        with CSVPrinter(out, CSVFormat.DEFAULT.with_record_separator("\n")) as printer:
+            pipeline = CSVPipeline(self.parse(), square_odd, printer,
+                                   use_processes=True, max_workers=2, batch_size=8)
+            assert pipeline.run() == 50
+            expected = "".join(f"{i + 2},{i * i}\n" for i in range(1, 100, 2))
+            assert out.getvalue() == expected
+
+    def test_bounded_in_flight(self):
+        submitted = []
+
+        class RecordingExecutor:
+            def __init__(self):
+                from concurrent.futures import ThreadPoolExecutor
+                self.pool = ThreadPoolExecutor(2)
+
+            def submit(self, fn, *args):
+                submitted.append(len(args[1]))
+                return self.pool.submit(fn, *args)
+
+        executor = RecordingExecutor()
+        pipeline = CSVPipeline(self.parse(), slow_reverse, batch_size=10,
+                               max_in_flight=2, executor=executor)
+        results = pipeline.results()
+        next(results)
+        assert len(submitted) == 2
+        results.close()
+        executor.pool.shutdown()
+
+    def test_transform_error(self):
+        def fail(record):
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            CSVPipeline(self.parse(), fail, batch_size=10).run()
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            CSVPipeline(None, square_odd)
+        with pytest.raises(ValueError):
+            CSVPipeline(self.parse(), square_odd, batch_size=0)
@@ -0,0 +1,80 @@
+import pytest
+from main.python.column_type import ColumnType
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_profiler import CSVProfiler, FrequentValues, HyperLogLog
+
+
+class TestCSVProfiler:
+
+    def test_profile(self):
+        data = (
+            "id,price,active,day,name,note\n"
+            "1,9.5,true,2024-01-31,apple,\\N\n"
+            "2,10,False,2024-02-01,pear,x\n"
+            "3,-1e2,true,2024-02-29T10:00,apple\n"
+        )
+        format = CSVFormat.DEFAULT.with_first_record_as_header().with_null_string("\\N")
+        columns = CSVProfiler.profile(CSVParser.parse(data, format))
+        by_name = {c.get_name(): c for c in columns}
+        assert [c.get_name() for c in columns] == \
+            ["id", "price", "active", "day", "name", "note"]
+
+        assert by_name["id"].get_type() == ColumnType.INT
+        assert by_name["id"].get_min() == 1
+        assert by_name["id"].get_max() == 3
+        assert by_name["id"].get_mean() == 2
+        assert by_name["price"].get_type() == ColumnType.FLOAT
+        assert by_name["price"].get_min() == -100.0
+        assert by_name["active"].get_type() == ColumnType.BOOL
+        assert by_name["active"].get_min() is None
+        assert by_name["day"].get_type() == ColumnType.DATE
+
+        name = by_name["name"]
+        assert name.get_type() == ColumnType.STRING
+        assert name.get_count() == 3
+        assert name.get_min_length() == 4
+        assert name.get_max_length() == 5
+        assert name.get_distinct_count() == 2
+        assert name.get_top_values() == [("apple", 2), ("pear", 1)]
+
+        note = by_name["note"]
+        assert note.get_null_count() == 2
+        assert note.get_type() == ColumnType.STRING
+        assert note.to_map()["type"] == "STRING"
+
+    def test_without_header(self):
+        profiler = CSVProfiler(top_k=1)
+        for record in CSVParser.parse("a,1\nb\n", CSVFormat.DEFAULT):
+            profiler.add(record)
+        first, second = profiler.get_columns()
+        assert first.get_name() is None
+        assert first.get_top_values() == [("a", 1)]
+        assert second.get_null_count() == 1
+        assert second.get_type() == ColumnType.INT
+        assert profiler.get_record_count() == 2
+
+    def test_empty_column(self):
+        format = CSVFormat.DEFAULT.with_header("a", "b")
+        columns = CSVProfiler.profile(CSVParser.parse("1\n", format))
+        assert columns[1].get_type() is None
+        assert columns[1].get_null_count() == 1
+        assert columns[1].get_distinct_count() == 0
+
+    def test_hyper_log_log(self):
+        counter = HyperLogLog(12)
+        for i in range(100000):
+            counter.add(f"value-{i}")
+        assert abs(counter.count() - 100000) < 5000
+        with pytest.raises(ValueError):
+            HyperLogLog(3)
+
+    def test_frequent_values(self):
+        frequent = FrequentValues(8)
+        for i in range(10000):
+            frequent.add("hot" if i % 3 == 0 else str(i))
+        value, count = frequent.top(1)[0]
+        assert value == "hot"
+        assert count <= 3334
+        assert len(frequent.counts) <= 16
+        assert not frequent.exact
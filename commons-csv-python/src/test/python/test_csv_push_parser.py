@@ -0,0 +1,100 @@
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_push_parser import CSVPushParser
+from main.python.record_boundary_scanner import RecordBoundaryScanner
+
+
+class TestCSVPushParser:
+
+    CSV_INPUT = ("a,b,c,d\n"
+                 " a , b , 1 2 \n"
+                 "\"foo baar\", b,\n"
+                 "\"foo\n,,\n\"\",,\n\"\"\",d,e\r\n"
+                 "\r\n"
+                 "x,\"y\"\"\",z")
+
+    def push_all(self, parser, data, chunk_size):
+        records = []
+        for i in range(0, len(data), chunk_size):
+            records.extend(parser.feed(data[i:i + chunk_size]))
+        records.extend(parser.close())
+        return records
+
+    def describe(self, records):
+        return [
+            (r.values(), r.get_record_number(), r.get_character_position())
+            for r in records
+        ]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 1000])
+    def test_matches_parser(self, chunk_size):
+        for format in (CSVFormat.DEFAULT, CSVFormat.EXCEL,
+                       CSVFormat.DEFAULT.with_ignore_surrounding_spaces()):
+            with CSVParser.parse(self.CSV_INPUT, format) as parser:
+                expected = self.describe(parser.get_records())
+            actual = self.describe(
+                self.push_all(CSVPushParser(format), self.CSV_INPUT, chunk_size)
+            )
+            assert expected == actual
+
+    def test_feed_returns_completed_records(self):
+        parser = CSVPushParser(CSVFormat.DEFAULT)
+        assert parser.feed("a,\"b") == []
+        assert parser.feed("\nc\",d\r") == []
+        records = parser.feed("\ne,f\ng")
+        assert [r.values() for r in records] == [["a", "b\nc", "d"], ["e", "f"]]
+        assert [r.values() for r in parser.close()] == [["g"]]
+        assert parser.get_first_end_of_line() == "\r\n"
+
+    def test_bytes_split_inside_character(self):
+        data = "k,v\nété,€\n".encode("utf-8")
+        parser = CSVPushParser(CSVFormat.DEFAULT)
+        records = self.push_all(parser, data, 1)
+        assert [r.values() for r in records] == [["k", "v"], ["été", "€"]]
+
+    def test_header_from_first_record(self):
+        format = CSVFormat.DEFAULT.with_comment_marker("#").with_first_record_as_header()
+        parser = CSVPushParser(format)
+        assert parser.feed("# leading comment\n\n") == []
+        assert parser.get_header_map() is None
+        assert parser.feed("A,B\n1,") == []
+        assert parser.get_header_map() == {"A": 0, "B": 1}
+        records = parser.feed("2\n")
+        assert records[0].get("B") == "2"
+        assert records[0].get_record_number() == 2
+
+    def test_preset_header_map(self):
+        parser = CSVPushParser(
+            CSVFormat.DEFAULT.with_first_record_as_header(),
+            character_offset=100, record_number=7, header_map={"A": 0, "B": 1}
+        )
+        records = parser.feed("1,2\n")
+        assert records[0].get("A") == "1"
+        assert records[0].get_record_number() == 7
+        assert records[0].get_character_position() == 100
+
+    def test_comment_attached_across_chunks(self):
+        parser = CSVPushParser(CSVFormat.DEFAULT.with_comment_marker("#"))
+        assert parser.feed("# note\n") == []
+        records = parser.feed("a,b\n")
+        assert records[0].get_comment() == "note"
+
+    def test_unterminated_quote_on_close(self):
+        parser = CSVPushParser(CSVFormat.DEFAULT)
+        assert parser.feed("a,\"open\n") == []
+        with pytest.raises(IOError):
+            parser.close()
+        assert parser.is_closed()
+
+    def test_feed_after_close(self):
+        parser = CSVPushParser(CSVFormat.DEFAULT)
+        parser.close()
+        with pytest.raises(IOError):
+            parser.feed("a")
+
+    def test_scanner_boundaries(self):
+        scanner = RecordBoundaryScanner(CSVFormat.DEFAULT.with_comment_marker("#"))
+        assert scanner.scan("a,\"b\n\"\n#c\nd\r") == [7]
+        assert scanner.scan("\nx") == [13]
+        assert scanner.is_inside_record()
@@ -1,4 +1,5 @@
 from enum import Enum
+import pickle
 import sys
 import pytest
 from io import StringIO
@@ -89,6 +90,13 @@ class TestCSVRecord:
             assert value == self.values[i]
             i += 1
 
+    def test_pickle(self):
+        record = pickle.loads(pickle.dumps(self.record_with_header))
+        assert record.values() == self.values
+        assert record.to_map() == self.record_with_header.to_map()
+        assert record.get_record_number() == 0
+        assert record.get_character_position() == -1
+
     def test_put_in_map(self):
         map = {}
         self.record_with_header.put_in(map)
@@ -111,6 +119,12 @@ class TestCSVRecord:
         map = self.record_with_header.to_map()
         self.validate_map(map, True)
 
+    def test_to_map_with_columns(self):
+        assert self.record_with_header.to_map(["third", "first", "missing"]) == \
+            {"third": "C", "first": "A"}
+        assert self.record_with_header.put_in({"x": 1}, ["second"]) == {"x": 1, "second": "B"}
+        assert self.record.to_map(["first"]) == {}
+
     def test_to_map_with_short_record(self):
         with CSVParser.parse("a,b", CSVFormat.DEFAULT.with_header("A", "B", "C")) as parser:
             short_rec = next(parser.iterator())
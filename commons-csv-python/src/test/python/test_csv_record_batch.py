@@ -0,0 +1,62 @@
+import io
+import pickle
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_record_batch import CSVRecordBatch
+from main.python.csv_tail import CSVTail
+from main.python.field_sink import FieldHandle
+
+
+class TestCSVRecordBatch:
+
+    def parse(self):
+        inp = "a,b,c\n# note\n1,,3\né,\\N,\n"
+        format = CSVFormat.DEFAULT.with_first_record_as_header() \
+            .with_comment_marker("#").with_null_string("\\N")
+        with CSVParser.parse(inp, format) as parser:
+            return parser.get_records()
+
+    def test_round_trip(self):
+        records = self.parse()
+        batch = pickle.loads(pickle.dumps(CSVRecordBatch(records)))
+        assert len(batch) == len(records)
+        for expected, actual in zip(records, batch):
+            assert actual.values() == expected.values()
+            assert actual.get_comment() == expected.get_comment()
+            assert actual.get_record_number() == expected.get_record_number()
+            assert actual.get_character_position() == expected.get_character_position()
+            assert actual.to_map() == expected.to_map()
+        assert batch[1].get("b") is None
+
+    def test_shared_mapping(self):
+        batch = pickle.loads(pickle.dumps(CSVRecordBatch(self.parse())))
+        assert batch[0].mapping is batch[1].mapping
+
+    def test_smaller_than_record_list(self):
+        inp = "".join(f"{i},value{i},{i * 3}\n" for i in range(500))
+        with CSVParser.parse(inp, CSVFormat.DEFAULT.with_header("x", "y", "z")) as parser:
+            records = parser.get_records()
+        assert len(pickle.dumps(CSVRecordBatch(records))) < len(pickle.dumps(records)) / 2
+
+    def test_empty_batch(self):
+        assert len(pickle.loads(pickle.dumps(CSVRecordBatch([])))) == 0
+
+    def test_unknown_numbers_and_positions(self, tmp_path):
+        path = tmp_path / "tail.csv"
+        path.write_text("".join(f"{i},v{i}\n" for i in range(100)))
+        records = CSVTail(path, "utf-8", CSVFormat.DEFAULT, block_size=16).read(3)
+        assert records[0].get_record_number() is None
+        batch = pickle.loads(pickle.dumps(CSVRecordBatch(records)))
+        assert [r.values() for r in batch] == [["97", "v97"], ["98", "v98"], ["99", "v99"]]
+        assert all(r.get_record_number() is None and r.get_character_position() is None
+                   for r in batch)
+
+    def test_field_handles(self):
+        parser = CSVParser.parse("a,b\n1,2\n", CSVFormat.DEFAULT.with_first_record_as_header())
+        records = parser.enable_field_sink(columns=["b"], sink_factory=lambda n, c: io.StringIO()) \
+            .get_records()
+        batch = pickle.loads(pickle.dumps(CSVRecordBatch(records)))
+        handle = batch[0].get("b")
+        assert isinstance(handle, FieldHandle)
+        assert handle.read() == "2"
+        assert batch[0].get("a") == "1"
@@ -0,0 +1,84 @@
+import random
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_sampler import CSVSampler, ReservoirSampler
+from main.python.csv_tail import RecordOffsetIndex
+
+
+def csv_text(rows):
+    return "id,region\r\n" + "".join(f"{i},{'north' if i % 10 else 'south'}\r\n"
+                                     for i in range(rows))
+
+
+class TestCSVSampler:
+
+    def test_reservoir_is_uniform(self):
+        counts = [0] * 20
+        for seed in range(2000):
+            sampler = ReservoirSampler(5, random.Random(seed))
+            for i in range(20):
+                sampler.add(i)
+            sample = sampler.get_sample()
+            assert sample == sorted(set(sample)) and len(sample) == 5
+            for i in sample:
+                counts[i] += 1
+        # Each item is expected 500 times
+        assert min(counts) > 400 and max(counts) < 600
+
+    def test_reservoir_smaller_stream(self):
+        sampler = ReservoirSampler(10)
+        for i in range(3):
+            sampler.add(i)
+        assert sampler.get_sample() == [0, 1, 2]
+        assert ReservoirSampler(0).get_sample() == []
+        with pytest.raises(ValueError):
+            ReservoirSampler(-1)
+
+    def test_parser_sample(self):
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        first = CSVParser.parse(csv_text(1000), format).sample(20, seed=7)
+        second = CSVParser.parse(csv_text(1000), format).sample(20, seed=7)
+        assert [r.values() for r in first] == [r.values() for r in second]
+        assert len(first) == 20
+        numbers = [r.get_record_number() for r in first]
+        assert numbers == sorted(numbers)
+        assert all(r.get("id") == str(r.get_record_number() - 2) for r in first)
+
+    def test_stratified(self):
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        sampler = CSVSampler(3, column="region", seed=1)
+        for record in CSVParser.parse(csv_text(100), format):
+            sampler.add(record)
+        strata = sampler.get_strata()
+        assert sorted(strata) == ["north", "south"]
+        assert all(len(records) == 3 for records in strata.values())
+        assert all(r.get("region") == "south" for r in strata["south"])
+        assert len(sampler.get_sample()) == 6
+        assert sampler.get_record_count() == 100
+
+    def test_stratified_unknown_column(self):
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        with pytest.raises(ValueError):
+            CSVParser.parse(csv_text(3), format).sample(1, column="missing")
+
+    def test_sample_indexed(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text('id,text\n' + "".join(f'{i},"a\nb {i}"\n' for i in range(1000)))
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        index = RecordOffsetIndex.build(path, "utf-8", format, interval=64)
+        with open(path, newline="") as f:
+            expected = {r.get_record_number(): r for r in CSVParser.parse(f.read(), format)}
+
+        records = CSVSampler.sample_indexed(path, "utf-8", format, 50, index, seed=3)
+        assert len(records) == 50
+        for record in records:
+            full = expected[record.get_record_number()]
+            assert record.values() == full.values()
+            assert record.get_character_position() == full.get_character_position()
+            assert record.get("id") == full.get("id")
+        assert len(CSVSampler.sample_indexed(path, "utf-8", format, 5000, index)) == 1000
+
+        path.write_text("id,text\n")
+        with pytest.raises(ValueError):
+            CSVSampler.sample_indexed(path, "utf-8", format, 1, index)
@@ -0,0 +1,82 @@
+import os
+import pytest
+import struct
+from main.python.csv_format import CSVFormat
+from main.python.csv_sidecar import CSVSidecar
+from main.python.packed_records import PackedRecordLayout
+
+
+class TestCSVSidecar:
+
+    @pytest.fixture(autouse=True)
+    def set_up(self, tmp_path):
+        self.path = tmp_path / "cities.csv"
+        self.path.write_text(
+            "city,country\nBerlin,DE\n\"Paris, Ville\",FR\nRome\n", encoding="utf-8"
+        )
+        self.format = CSVFormat.DEFAULT.with_first_record_as_header()
+
+    def _touch(self):
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_build_and_load(self):
+        sidecar = CSVSidecar(self.path, "utf-8", self.format)
+        assert sidecar.load() is None
+        with sidecar.open() as table:
+            assert sidecar.sidecar_path.exists()
+            assert len(table) == 3
+            assert table[1].get("city") == "Paris, Ville"
+            assert table[2].size() == 1
+            assert table[0].get_record_number() == 2
+        with sidecar.load() as table:
+            assert table.get_header_map() == {"city": 0, "country": 1}
+            assert [r.to_list() for r in table] == [
+                ["Berlin", "DE"], ["Paris, Ville", "FR"], ["Rome"]
+            ]
+            assert table.column("country") == ["DE", "FR", None]
+            assert table.column(0) == ["Berlin", "Paris, Ville", "Rome"]
+            with pytest.raises(ValueError):
+                table.column("population")
+
+    def test_invalidated_by_source_change(self):
+        sidecar = CSVSidecar(self.path, "utf-8", self.format)
+        sidecar.open().close()
+        self.path.write_text("city,country\nOslo,NO\n", encoding="utf-8")
+        self._touch()
+        assert not sidecar.is_valid()
+        with sidecar.open() as table:
+            assert [r.get("city") for r in table] == ["Oslo"]
+        assert sidecar.is_valid()
+
+    def test_invalidated_by_format_change(self):
+        CSVSidecar(self.path, "utf-8", self.format).open().close()
+        other = CSVSidecar(self.path, "utf-8", CSVFormat.DEFAULT)
+        assert not other.is_valid()
+        with other.open() as table:
+            assert table.get_header_map() is None
+            assert table[0].to_list() == ["city", "country"]
+        assert CSVSidecar.fingerprint(self.format, "utf-8") \
+            == CSVSidecar.fingerprint(CSVFormat.DEFAULT.with_first_record_as_header(), "utf-8")
+        assert CSVSidecar.fingerprint(self.format, "utf-8") \
+            != CSVSidecar.fingerprint(self.format.with_trim(), "utf-8")
+
+    def test_invalidated_by_byte_order(self):
+        sidecar = CSVSidecar(self.path, "utf-8", self.format)
+        sidecar.open().close()
+        # Pretend the sidecar was written on a host of the other byte order
+        with open(sidecar.sidecar_path, "r+b") as f:
+            f.seek(PackedRecordLayout.align(CSVSidecar.PREAMBLE.size) + 6)
+            f.write(struct.pack("<H", 3 - PackedRecordLayout.BYTE_ORDER))
+        assert not sidecar.is_valid()
+        assert sidecar.load() is None
+        with sidecar.open() as table:
+            assert [r.get("city") for r in table] == ["Berlin", "Paris, Ville", "Rome"]
+        assert sidecar.is_valid()
+
+    def test_parse_error_leaves_no_sidecar(self, tmp_path):
+        self.path.write_text("a,\"b\n", encoding="utf-8")
+        sidecar = CSVSidecar(self.path, "utf-8", CSVFormat.DEFAULT)
+        with pytest.raises(IOError):
+            sidecar.build()
+        assert os.listdir(tmp_path) == ["cities.csv"]
@@ -0,0 +1,97 @@
+import io
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_printer import CSVPrinter
+from main.python.csv_sniffer import CSVSniffer
+
+
+class TestCSVSniffer:
+
+    def test_default(self):
+        assert CSVFormat.sniff("a,b,c\r\nd,e,f\r\n") is CSVFormat.DEFAULT
+
+    def test_header(self):
+        format = CSVFormat.sniff('name,age\r\n"Doe, Jane",42\r\nBob,7\r\n')
+        assert format == CSVFormat.DEFAULT.with_first_record_as_header()
+
+    def test_tdf(self):
+        format = CSVFormat.sniff("x\ty\r\n1\t2\r\n3\t4\r\n")
+        assert format.get_delimiter() == "\t"
+        assert format.get_ignore_surrounding_spaces()
+        assert format.get_header() == []
+
+    def test_mysql(self):
+        assert CSVFormat.sniff("1\tfoo\\tbar\t\\N\n2\tbaz\\\\\tx\n") is CSVFormat.MYSQL
+
+    def test_informix_unload(self):
+        assert CSVFormat.sniff("1|a\\|b\n2|c\n") is CSVFormat.INFORMIX_UNLOAD
+
+    @pytest.mark.parametrize("name, sample", [
+        ("DEFAULT", "a,b,c\r\nd,e,f\r\n"),
+        ("RFC4180", "a,b\r\n\r\nc,d\r\n"),
+        ("TDF", "a\tb\r\nc\td\r\n"),
+        ("MYSQL", "1\ta\\\tb\t\\N\n2\tc\t\\N\n"),
+        ("POSTGRESQL_CSV", '"1","a""b",,""\n"x\ny","c,d",,"e"\n'),
+        ("POSTGRESQL_TEXT", '"1"\t"a""b"\t\\N\t""\n"x\ny"\t"c,d"\t\\N\t"e"\n'),
+        ("INFORMIX_UNLOAD", "1|a\\|b\n2|c\n"),
+        ("ORACLE", "1,a,\\N\n2,b\\,c,\\N\n"),
+        ("INFORMIX_UNLOAD_CSV", "a,b\nc,d\n"),
+    ])
+    def test_predefined_formats(self, name, sample):
+        format = getattr(CSVFormat, name)
+        assert CSVFormat.sniff(sample) is format
+        # The sniffed format reads the sample
+        assert CSVParser.parse(sample, format).get_records()
+
+    def test_excel_missing_column_names(self):
+        format = CSVFormat.sniff(",x,y\r\n1,2,3\r\n4,5,6\r\n")
+        assert format == CSVFormat.EXCEL.with_first_record_as_header()
+        assert format.get_allow_missing_column_names()
+        assert not format.get_ignore_empty_lines()
+
+    @pytest.mark.parametrize("name", ["POSTGRESQL_CSV", "POSTGRESQL_TEXT"])
+    def test_postgresql_round_trip(self, name):
+        rows = [["1", 'a"b', None, "f"], ["x\ny", "c,d", None, "e"]]
+        format = getattr(CSVFormat, name)
+        out = io.StringIO()
+        printer = CSVPrinter(out, format)
+        printer.print_records(rows)
+        sample = out.getvalue()
+        assert CSVFormat.sniff(sample) is format
+        assert [r.to_list() for r in CSVParser.parse(sample, format)] == rows
+
+    def test_semicolon_with_quotes_and_comments(self):
+        sample = "# exported\n'a';'b;c'\n'd';'e'\n'f';'g'\n"
+        format = CSVFormat.sniff(sample)
+        assert format.get_delimiter() == ";"
+        assert format.get_quote_character() == "'"
+        assert format.get_comment_marker() == "#"
+        assert format.get_record_separator() == "\n"
+        assert format.get_header() is None
+
+    def test_quoted_line_breaks(self):
+        format = CSVFormat.sniff('a;b\r\n"x\r\ny,z";1\r\n"p,q";2\r\n')
+        assert format.get_delimiter() == ";"
+
+    def test_path_reads_bounded_sample(self, tmp_path):
+        path = tmp_path / "large.csv"
+        path.write_text("id|value\n" + "".join(f"{i}|v{i}\n" for i in range(100000)))
+        sniffer = CSVSniffer(sample_size=1000)
+        sample = sniffer.read_sample(path)
+        assert len(sample) <= 1000
+        assert sample.endswith("\n")
+        format = CSVFormat.sniff(path, sample_size=1000)
+        assert format.get_delimiter() == "|"
+        assert format.get_header() == []
+
+    def test_bytes_and_streams(self):
+        data = "a;b\n1;é\n".encode("utf-8")
+        assert CSVFormat.sniff(data).get_delimiter() == ";"
+        assert CSVFormat.sniff(io.BytesIO(data)).get_delimiter() == ";"
+        # The sample ends inside the two-byte character
+        assert CSVSniffer(sample_size=len(data) - 2).read_sample(data) == "a;b\n"
+
+    def test_invalid_sample_size(self):
+        with pytest.raises(ValueError):
+            CSVSniffer(sample_size=0)
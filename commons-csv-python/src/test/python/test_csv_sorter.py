@@ -0,0 +1,73 @@
+import random
+import pytest
+from main.python.column_type import ColumnType
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_sorter import CSVSorter, SortKey
+
+
+def rows(count, seed=0):
+    rng = random.Random(seed)
+    return [[str(rng.randrange(100)), f"n{rng.randrange(1000)}", str(i)] for i in range(count)]
+
+
+def parser(data):
+    text = "score,name,id\r\n" + "".join(",".join(row) + "\r\n" for row in data)
+    return CSVParser.parse(text, CSVFormat.DEFAULT.with_first_record_as_header())
+
+
+class TestCSVSorter:
+
+    @pytest.mark.parametrize("max_bytes, use_processes, merge_fan_in", [
+        (64 * 1024 * 1024, False, 64),
+        (2000, False, 64),
+        (2000, False, 2),
+        (2000, True, 4),
+    ])
+    def test_sort(self, max_bytes, use_processes, merge_fan_in):
+        data = rows(2000)
+        sorter = CSVSorter([SortKey("score", ColumnType.INT, reverse=True), "name"],
+                           max_bytes=max_bytes, use_processes=use_processes,
+                           max_workers=2, merge_fan_in=merge_fan_in)
+        result = list(sorter.sort(parser(data)))
+        # Python's sort is stable, as is the external sort
+        expected = sorted(sorted(data, key=lambda row: row[1]),
+                          key=lambda row: int(row[0]), reverse=True)
+        assert result == expected
+        assert (sorter.get_run_count() > 1) == (max_bytes < 1024 * 1024)
+
+    def test_types(self):
+        data = [["10", "2024-01-02", "1.5"], ["9", "2023-12-31T23:00:00+00:00", "x"],
+                ["", "2024-01-01", "-2e3"], ["100", "bad", "nan"]]
+        text = "".join(",".join(row) + "\n" for row in data)
+        format = CSVFormat.DEFAULT.with_null_string("")
+
+        def sort(*keys):
+            return [row[0] for row in CSVSorter(keys).sort(CSVParser.parse(text, format))]
+
+        assert sort(0) == [None, "10", "100", "9"]
+        assert sort(SortKey(0, ColumnType.INT)) == [None, "9", "10", "100"]
+        # Values that do not parse as the type sort before the others
+        assert sort(SortKey(1, ColumnType.DATE)) == ["100", "9", None, "10"]
+        assert sort(SortKey(2, ColumnType.FLOAT)) == ["100", "9", None, "10"]
+
+    def test_unknown_column(self):
+        with pytest.raises(ValueError):
+            list(CSVSorter(["missing"]).sort(parser(rows(3))))
+        with pytest.raises(ValueError):
+            CSVSorter([])
+
+    def test_sort_file(self, tmp_path):
+        source = tmp_path / "in.csv"
+        target = tmp_path / "out.csv"
+        data = rows(500, seed=4)
+        source.write_text("score,name,id\n" + "".join(",".join(row) + "\n" for row in data))
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        count = CSVSorter.sort_file(source, target, "utf-8", format,
+                                    [SortKey("id", ColumnType.INT, reverse=True)],
+                                    output_format=format.with_delimiter(";"),
+                                    max_bytes=1000)
+        assert count == 500
+        lines = target.read_text().splitlines()
+        assert lines[0] == "score;name;id"
+        assert lines[1:] == [";".join(row) for row in reversed(data)]
@@ -0,0 +1,120 @@
+import os
+import random
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_tail import CSVTail, RecordOffsetIndex
+
+
+def full_parse(path, format):
+    with open(path, encoding="utf-8", newline="") as f:
+        return CSVParser.parse(f.read(), format).get_records()
+
+
+class TestCSVTail:
+
+    @pytest.fixture
+    def quoted(self, tmp_path):
+        path = tmp_path / "quoted.csv"
+        rows = ["id,text\r\n"]
+        for i in range(500):
+            if i % 3 == 0:
+                rows.append(f'{i},"multi\r\nline ""{i}"",\r\nend"\r\n')
+            else:
+                rows.append(f"{i},plain é {i}\r\n")
+        path.write_bytes("".join(rows).encode("utf-8"))
+        return path
+
+    @pytest.mark.parametrize("block_size", [7, 100, 4096, 1 << 20])
+    def test_quoted_fields_across_blocks(self, quoted, block_size):
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        expected = full_parse(quoted, format)
+        for n in (1, 5, 37):
+            records = CSVTail(quoted, "utf-8", format, block_size=block_size).read(n)
+            assert [r.values() for r in records] == [r.values() for r in expected[-n:]]
+            assert records[-1].get("text") == expected[-1].get("text")
+
+    def test_more_than_available(self, tmp_path):
+        path = tmp_path / "small.csv"
+        path.write_text("a,b\n1,2\n3,4")
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        records = CSVParser.tail(path, "utf-8", format, 10)
+        assert [r.values() for r in records] == [["1", "2"], ["3", "4"]]
+        assert records[0].get_record_number() == 2
+        assert CSVParser.tail(path, "utf-8", format, 0) == []
+
+    def test_escape_and_comments(self, tmp_path):
+        path = tmp_path / "escaped.csv"
+        format = CSVFormat.DEFAULT.with_escape("\\").with_comment_marker("#")
+        path.write_text("".join(f"{i},a\\\nb {i}\n# note {i}\n\n" for i in range(200)))
+        expected = full_parse(path, format)
+        records = CSVTail(path, "utf-8", format, block_size=16).read(4)
+        assert [r.values() for r in records] == [r.values() for r in expected[-4:]]
+        assert records[-1].get_comment() == expected[-1].get_comment()
+        assert records[-1].get_record_number() is None
+
+    def test_closing_quote_at_end(self, tmp_path):
+        path = tmp_path / "end.csv"
+        path.write_text('id,note\n1,"first\n\nsecond"', newline="")
+        records = CSVTail(path, "utf-8", CSVFormat.EXCEL, block_size=8).read(1)
+        assert [r.values() for r in records] == [["1", "first\n\nsecond"]]
+
+    def test_cr_line_breaks(self, tmp_path):
+        path = tmp_path / "cr.csv"
+        path.write_text("".join(f'{i},"a\r{i}"\r' for i in range(300)), newline="")
+        records = CSVTail(path, "utf-8", CSVFormat.DEFAULT, block_size=16).read(2)
+        assert [r.values() for r in records] == [["298", "a\r298"], ["299", "a\r299"]]
+
+    @pytest.mark.parametrize("format", [
+        CSVFormat.DEFAULT, CSVFormat.EXCEL, CSVFormat.RFC4180, CSVFormat.TDF,
+        CSVFormat.MYSQL, CSVFormat.DEFAULT.with_escape("\\"),
+        CSVFormat.EXCEL.with_comment_marker("#"),
+    ])
+    def test_random_input(self, format, tmp_path):
+        pieces = ["a", ",", "\t", " ", '"', "\\", "#", "\n", "\r", "\r\n"]
+        rng = random.Random(42)
+        path = tmp_path / "random.csv"
+        for _ in range(300):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+            try:
+                expected = CSVParser.parse(text, format).get_records()
+            except IOError:
+                continue
+            path.write_text(text, newline="")
+            for block_size in (1, 3, 8):
+                n = rng.randint(1, 4)
+                records = CSVTail(path, "utf-8", format, block_size=block_size).read(n)
+                assert [r.values() for r in records] == \
+                    [r.values() for r in expected[-n:]], (text, block_size, n)
+
+    def test_index(self, quoted, tmp_path):
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        index = RecordOffsetIndex.build(quoted, "utf-8", format, interval=50)
+        assert index.get_record_count() == 501
+        index_path = tmp_path / "quoted.csvidx"
+        index.save(index_path)
+        index = RecordOffsetIndex.load(index_path)
+        assert index.is_valid_for(quoted, "utf-8", format)
+
+        expected = full_parse(quoted, format)
+        for n in (1, 49, 120, 1000):
+            records = CSVParser.tail(quoted, "utf-8", format, n, index)
+            assert [(r.values(), r.get_record_number(), r.get_character_position())
+                    for r in records] == \
+                [(r.values(), r.get_record_number(), r.get_character_position())
+                 for r in expected[-n:]]
+
+    def test_stale_index(self, quoted):
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        index = RecordOffsetIndex.build(quoted, "utf-8", format, interval=50)
+        with open(quoted, "ab") as f:
+            f.write(b"500,appended\r\n")
+        os.utime(quoted, ns=(0, index.source_mtime_ns + 1))
+        assert not index.is_valid_for(quoted, "utf-8", format)
+        assert not index.is_valid_for(quoted, "utf-8", CSVFormat.EXCEL)
+        records = CSVParser.tail(quoted, "utf-8", format, 1, index)
+        assert records[0].values() == ["500", "appended"]
+
+    def test_unsupported_charset(self, tmp_path):
+        with pytest.raises(ValueError):
+            CSVTail(tmp_path / "x.csv", "utf-16", CSVFormat.DEFAULT)
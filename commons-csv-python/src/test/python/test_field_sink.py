@@ -0,0 +1,103 @@
+import io
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.field_sink import FieldHandle, FieldSinkToken
+
+
+class TestFieldSink:
+
+    def test_large_values_go_to_sink(self):
+        blob = "x" * 200000 + '""\r\n' + "y" * 100
+        inp = f'id,doc\n1,small\n2,"{blob}"\n3,ok\n'
+        parser = CSVParser.parse(inp, CSVFormat.DEFAULT.with_first_record_as_header())
+        records = parser.enable_field_sink(threshold=1000).get_records()
+        assert records[0].get("doc") == "small"
+        handle = records[1].get("doc")
+        assert isinstance(handle, FieldHandle)
+        assert handle.get_record_number() == records[1].get_record_number() == 3
+        assert handle.get_column() == 1
+        assert handle.get_length() == len(blob) - 1
+        assert handle.read() == blob.replace('""', '"')
+        handle.close()
+        assert records[2].to_list() == ["3", "ok"]
+
+    def test_columns_and_factory(self):
+        sinks = []
+
+        def factory(record_number, column):
+            sinks.append((record_number, column))
+            return io.StringIO()
+
+        parser = CSVParser.parse("a,b\n1,2\n3,4\n", CSVFormat.DEFAULT.with_first_record_as_header())
+        records = parser.enable_field_sink(columns=["b"], sink_factory=factory).get_records()
+        assert sinks == [(2, 1), (3, 1)]
+        assert [r.get("a") for r in records] == ["1", "3"]
+        assert [r.get("b").read() for r in records] == ["2", "4"]
+
+    def test_first_column_and_empty_value(self):
+        parser = CSVParser.parse(",x\ny,z\n", CSVFormat.DEFAULT).enable_field_sink(columns=[0])
+        first, second = parser.get_records()
+        assert first.get(0).read() == ""
+        assert first.get(1) == "x"
+        assert second.get(0).read() == "y"
+
+    @pytest.mark.parametrize("format", [
+        CSVFormat.DEFAULT.with_trim(),
+        CSVFormat.DEFAULT.with_ignore_surrounding_spaces(),
+        CSVFormat.DEFAULT.with_null_string("NULL").with_trailing_delimiter(),
+        CSVFormat.DEFAULT.with_trim().with_null_string("NULL"),
+    ])
+    @pytest.mark.parametrize("threshold", [0, 3, 8])
+    def test_values_match_unsunk_values(self, format, threshold):
+        inp = ('  a  ,"  quoted  " ,NULL,  NULL  ,\t, long value   ,\n'
+               'x,"NULL",   ,b  c,  longer value with spaces\u3000 \t,\n')
+        expected = [r.to_list() for r in CSVParser.parse(inp, format).get_records()]
+        records = CSVParser.parse(inp, format).enable_field_sink(threshold).get_records()
+        actual = [[v.read() if isinstance(v, FieldHandle) else v for v in r.to_list()]
+                  for r in records]
+        assert actual == expected
+        for record in records:
+            for value in record.to_list():
+                if isinstance(value, FieldHandle):
+                    assert len(value.read()) == value.get_length() > threshold
+
+    def test_null_values_of_columns(self):
+        format = CSVFormat.DEFAULT.with_null_string("").with_trailing_delimiter()
+        parser = CSVParser.parse("a,,\n,b,\n", format).enable_field_sink(columns=[0, 1])
+        first, second = parser.get_records()
+        assert first.get(0).read() == "a"
+        assert first.get(1) is None and first.size() == 2
+        assert second.get(0) is None
+        assert second.get(1).read() == "b"
+
+    def test_comments_stay_in_memory(self):
+        comment = "note " * 100
+        format = CSVFormat.DEFAULT.with_comment_marker("#")
+        parser = CSVParser.parse(f"# {comment}\na,b\n", format).enable_field_sink(threshold=10)
+        record = parser.next_record()
+        assert record.get_comment() == comment.strip()
+        assert record.get(0) == "a"
+
+    def test_max_field_size_counts_sunk_values(self):
+        format = CSVFormat.DEFAULT.with_max_field_size(100)
+        parser = CSVParser.parse("a," + "x" * 500 + "\n", format).enable_field_sink(threshold=10)
+        with pytest.raises(IOError):
+            parser.get_records()
+
+    def test_token_writes_chunks(self):
+        written = io.StringIO()
+        token = FieldSinkToken(10, lambda record_number, column: written)
+        for c in "a" * (FieldSinkToken.CHUNK_SIZE + 50):
+            token.append(c)
+        assert len(token.content) <= FieldSinkToken.CHUNK_SIZE
+        handle = token.finish()
+        assert handle.get_length() == FieldSinkToken.CHUNK_SIZE + 50
+        assert written.getvalue() == "a" * (FieldSinkToken.CHUNK_SIZE + 50)
+
+    def test_invalid_arguments(self):
+        parser = CSVParser.parse("a\n", CSVFormat.DEFAULT)
+        with pytest.raises(ValueError):
+            parser.enable_field_sink(threshold=-1)
+        with pytest.raises(ValueError):
+            parser.enable_field_sink(columns=["a"])
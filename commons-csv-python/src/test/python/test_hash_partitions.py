@@ -0,0 +1,41 @@
+import os
+import pytest
+from main.python.hash_partitions import HashPartitions
+
+
+class TestHashPartitions:
+
+    def test_partitions(self, tmp_path):
+        with HashPartitions(4, tmp_path, batch_size=3) as partitions:
+            for i in range(100):
+                partitions.add(f"k{i % 10}", (f"k{i % 10}", i))
+            partitions.finish()
+            seen = []
+            for index in range(4):
+                entries = list(partitions.read(index))
+                assert len(entries) == partitions.get_size(index)
+                keys = {key for key, _ in entries}
+                assert all(hash(key) % 4 == index for key in keys)
+                # Entries keep the order they were added in
+                assert [i for _, i in entries] == sorted(i for _, i in entries)
+                seen.extend(i for _, i in entries)
+            assert sorted(seen) == list(range(100))
+            paths = [partitions.get_path(index) for index in range(4)]
+        assert not any(os.path.exists(path) for path in paths)
+
+    def test_salt(self, tmp_path):
+        keys = [(f"k{i}",) for i in range(50)]
+        with HashPartitions(4, tmp_path) as partitions:
+            first = [partitions.add(key, key) for key in keys]
+        # Every two keys end up in different partitions for some salt
+        splits = []
+        for salt in range(1, 20):
+            with HashPartitions(4, tmp_path, salt=salt) as partitions:
+                splits.append([partitions.add(key, key) for key in keys])
+        assert all(any(split[a] != split[b] for split in splits)
+                   for a in range(50) for b in range(a + 1, 50))
+        assert splits[0] != first
+
+    def test_invalid_count(self):
+        with pytest.raises(ValueError):
+            HashPartitions(0)
@@ -0,0 +1,98 @@
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.incremental_csv_parser import IncrementalCSVParser, RecordRangeChange
+
+
+class TestIncrementalCSVParser:
+
+    @pytest.fixture(autouse=True)
+    def set_up(self):
+        self.format = CSVFormat.DEFAULT.with_first_record_as_header()
+        self.lines = ["id,name"] + [
+            f'{i},"name {i}\r\nline two"' if i % 7 == 0 else f"{i},name {i}"
+            for i in range(500)
+        ]
+
+    def _text(self, lines):
+        return "\r\n".join(lines) + "\r\n"
+
+    def _assert_parsed(self, parser, text):
+        expected = CSVParser.parse(text, self.format).get_records()
+        actual = parser.get_records()
+        assert [r.to_list() for r in actual] == [r.to_list() for r in expected]
+        assert [r.get_record_number() for r in actual] == \
+            [r.get_record_number() for r in expected]
+        assert [r.get_character_position() for r in actual] == \
+            [r.get_character_position() for r in expected]
+        assert all(r.mapping is parser.header_map for r in actual)
+
+    def test_first_parse_adds_all_records(self):
+        parser = IncrementalCSVParser(self.format, records_per_chunk=16)
+        text = self._text(self.lines)
+        changes = parser.parse_text(text)
+        assert changes == [RecordRangeChange(RecordRangeChange.ADDED, 0, 0, 0, 500)]
+        assert len(parser.get_chunk_digests()) > 1
+        assert parser.get_header_map() == {"id": 0, "name": 1}
+        self._assert_parsed(parser, text)
+
+    def test_change(self):
+        parser = IncrementalCSVParser(self.format, records_per_chunk=16)
+        parser.parse_text(self._text(self.lines))
+        chunk_count = len(parser.get_chunk_digests())
+        self.lines[250] = "249,renamed"
+        text = self._text(self.lines)
+        changes = parser.parse_text(text)
+        assert changes == [RecordRangeChange(RecordRangeChange.CHANGED, 249, 250, 249, 250)]
+        assert parser.get_reparsed_chunk_count() <= 3 < chunk_count
+        self._assert_parsed(parser, text)
+
+    def test_insert_and_remove(self):
+        parser = IncrementalCSVParser(self.format, records_per_chunk=16)
+        parser.parse_text(self._text(self.lines))
+        del self.lines[10:13]
+        self.lines[400:400] = ["new,one", "new,two"]
+        text = self._text(self.lines)
+        changes = parser.parse_text(text)
+        assert changes == [
+            RecordRangeChange(RecordRangeChange.REMOVED, 9, 12, 9, 9),
+            RecordRangeChange(RecordRangeChange.ADDED, 402, 402, 399, 401),
+        ]
+        assert parser.get_reparsed_chunk_count() <= 6
+        self._assert_parsed(parser, text)
+
+    def test_header_change(self):
+        parser = IncrementalCSVParser(self.format, records_per_chunk=16)
+        parser.parse_text(self._text(self.lines))
+        self.lines[0] = "key,label"
+        text = self._text(self.lines)
+        assert parser.parse_text(text) == []
+        assert parser.get_reparsed_chunk_count() == 1
+        assert parser.get_records()[3].get("label") == "name 3"
+        self._assert_parsed(parser, text)
+
+    def test_unchanged(self, tmp_path):
+        path = tmp_path / "feed.csv"
+        path.write_bytes(self._text(self.lines).encode("utf-8"))
+        parser = IncrementalCSVParser(self.format)
+        parser.parse(path)
+        assert parser.parse(path) == []
+        assert parser.get_reparsed_chunk_count() == 0
+
+    def test_without_header(self):
+        parser = IncrementalCSVParser(CSVFormat.DEFAULT, records_per_chunk=4)
+        parser.parse_text("a,b\nc,d\ne,f\n")
+        assert parser.parse_text("a,b\nc,x\ne,f\n") == [
+            RecordRangeChange(RecordRangeChange.CHANGED, 1, 2, 1, 2)
+        ]
+        assert [r.to_list() for r in parser.get_records()] == \
+            [["a", "b"], ["c", "x"], ["e", "f"]]
+        assert parser.parse_text("") == [
+            RecordRangeChange(RecordRangeChange.REMOVED, 0, 3, 0, 0)
+        ]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            IncrementalCSVParser(None)
+        with pytest.raises(ValueError):
+            IncrementalCSVParser(self.format, records_per_chunk=0)
@@ -0,0 +1,70 @@
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.partitioned_csv_printer import PartitionedCSVPrinter
+
+IN_FORMAT = CSVFormat.DEFAULT.with_first_record_as_header()
+OUT_FORMAT = CSVFormat.DEFAULT.with_header("country", "amount").with_header_comments("export")\
+    .with_comment_marker("#")
+
+
+def orders(count=200):
+    return "country,amount\r\n" + "".join(f"{['de', 'fr', 'us/ca', ''][i % 4]},{i}\r\n"
+                                          for i in range(count))
+
+
+def read(path):
+    with open(path, newline="") as f:
+        return CSVParser.parse(f.read(), OUT_FORMAT.with_skip_header_record()).get_records()
+
+
+class TestPartitionedCSVPrinter:
+
+    def test_by_value_with_evictions(self, tmp_path):
+        with PartitionedCSVPrinter(tmp_path, OUT_FORMAT, column="country",
+                                   max_open_files=2) as printer:
+            assert printer.print_records(CSVParser.parse(orders(), IN_FORMAT)) == 200
+            # Every record switches files, so files are reopened constantly
+            assert printer.get_open_count() > 4
+            paths = printer.get_paths()
+        assert sorted(paths) == ["", "de", "fr", "us%2Fca"]
+        for name, path in paths.items():
+            text = path.read_bytes().decode("utf-8")
+            assert text.startswith("# export\r\ncountry,amount\r\n")
+            assert text.count("country,amount") == 1
+            assert text.count("# export") == 1
+            records = read(path)
+            assert len(records) == 50
+            assert all(r.get("country") == name.replace("%2F", "/") for r in records)
+
+    def test_by_hash(self, tmp_path):
+        with PartitionedCSVPrinter(tmp_path, OUT_FORMAT, column=0, partitions=3) as printer:
+            for i in range(90):
+                printer.print_record([f"k{i % 9}", str(i)])
+            counts = printer.get_record_counts()
+        assert sum(counts.values()) == 90
+        assert all(len(name) == 5 and 0 <= int(name) < 3 for name in counts)
+        keys = {}
+        for name, path in printer.get_paths().items():
+            for record in read(path):
+                assert keys.setdefault(record.get("country"), name) == name
+
+    def test_rolling(self, tmp_path):
+        with PartitionedCSVPrinter(tmp_path, OUT_FORMAT, max_records=30) as printer:
+            printer.print_records(CSVParser.parse(orders(), IN_FORMAT))
+        assert list(printer.get_record_counts().values()) == [30] * 6 + [20]
+        (tmp_path / "size").mkdir()
+        with PartitionedCSVPrinter(tmp_path / "size", CSVFormat.DEFAULT, max_size=100,
+                                   name_pattern="size-{}.csv") as printer:
+            printer.print_records(CSVParser.parse(orders(), IN_FORMAT))
+        sizes = [len(path.read_text()) for path in printer.get_paths().values()]
+        assert all(size < 100 + 12 for size in sizes)
+        assert sum(printer.get_record_counts().values()) == 200
+
+    def test_invalid(self, tmp_path):
+        with pytest.raises(ValueError):
+            PartitionedCSVPrinter(tmp_path, OUT_FORMAT)
+        with pytest.raises(ValueError):
+            PartitionedCSVPrinter(tmp_path, OUT_FORMAT, column=0, partitions=0)
+        with pytest.raises(ValueError):
+            PartitionedCSVPrinter(tmp_path, CSVFormat.DEFAULT, column="x").print_record(["a"])
@@ -0,0 +1,104 @@
+import io
+import struct
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.csv_tail import CSVTail
+from main.python.packed_records import PackedRecordLayout, PackedRecordReader, PackedRecordWriter
+from main.python.shared_record_batch import SharedRecordBatch
+
+
+def read_in_child(name):
+    with SharedRecordBatch.attach(name) as batch:
+        return [(r.get("name"), r.get(1), r.size(), r.get_record_number()) for r in batch]
+
+
+class TestSharedRecordBatch:
+
+    INPUT = "name,value\n# first\nalpha,1\nbêta,\\N\n\"multi\nline\",3,extra\n"
+
+    def parse(self):
+        format = CSVFormat.DEFAULT.with_first_record_as_header() \
+            .with_comment_marker("#").with_null_string("\\N")
+        return CSVParser.parse(self.INPUT, format)
+
+    def test_round_trip(self):
+        with self.parse() as parser:
+            records = parser.get_records()
+        batch = SharedRecordBatch.create(records)
+        try:
+            assert len(batch) == 3
+            for expected, actual in zip(records, batch):
+                assert actual.values() == expected.values()
+                assert actual.size() == expected.size()
+                assert actual.get_comment() == expected.get_comment()
+                assert actual.get_record_number() == expected.get_record_number()
+                assert actual.get_character_position() == expected.get_character_position()
+                assert actual.to_map() == expected.to_map()
+            assert batch[1].get_by_name("value") is None
+            assert batch[-1].get(2) == "extra"
+            with pytest.raises(ValueError):
+                batch[0].get_by_name("missing")
+            with pytest.raises(IndexError):
+                batch[0].get(2)
+        finally:
+            batch.unlink()
+
+    def test_attach_from_other_process(self):
+        with self.parse() as parser:
+            batches = list(SharedRecordBatch.from_parser(parser, batch_size=2))
+        try:
+            assert [len(b) for b in batches] == [2, 1]
+            with ProcessPoolExecutor(1) as executor:
+                results = list(executor.map(read_in_child, [b.get_name() for b in batches]))
+            assert results == [
+                [("alpha", "1", 2, 2), ("bêta", None, 2, 3)],
+                [("multi\nline", "3", 3, 4)],
+            ]
+        finally:
+            for batch in batches:
+                batch.unlink()
+
+    def test_without_header(self):
+        with CSVParser.parse("a,b\n", CSVFormat.DEFAULT) as parser:
+            batch = SharedRecordBatch.create(parser.get_records())
+        try:
+            assert batch.get_header_map() is None
+            with pytest.raises(ValueError):
+                batch[0].get("a")
+        finally:
+            batch.unlink()
+
+    def test_unknown_numbers_and_positions(self, tmp_path):
+        path = tmp_path / "tail.csv"
+        path.write_text("".join(f"{i},v{i}\n" for i in range(100)))
+        records = CSVTail(path, "utf-8", CSVFormat.DEFAULT, block_size=16).read(2)
+        batch = SharedRecordBatch.create(records)
+        try:
+            assert [r.values() for r in batch] == [["98", "v98"], ["99", "v99"]]
+            assert batch[0].get_record_number() is None
+            assert batch[0].get_character_position() is None
+            assert batch[1].to_csv_record().get_record_number() is None
+        finally:
+            batch.unlink()
+
+    def test_other_byte_order_rejected(self):
+        with self.parse() as parser:
+            records = parser.get_records()
+        out = io.BytesIO()
+        writer = PackedRecordWriter(out)
+        for record in records:
+            writer.write(record)
+        writer.close()
+        data = bytearray(out.getvalue())
+        reader = PackedRecordReader(data)
+        assert [r.to_list() for r in reader] == [r.values() for r in records]
+        reader.release()
+        other = PackedRecordLayout.BIG_ENDIAN \
+            if PackedRecordLayout.BYTE_ORDER == PackedRecordLayout.LITTLE_ENDIAN \
+            else PackedRecordLayout.LITTLE_ENDIAN
+        struct.pack_into("<H", data, 6, other)
+        assert not PackedRecordLayout.is_readable(data)
+        with pytest.raises(ValueError, match="byte order"):
+            PackedRecordReader(data)
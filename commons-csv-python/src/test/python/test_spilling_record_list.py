@@ -0,0 +1,63 @@
+import pytest
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.spilling_record_list import SpillingRecordList
+
+
+class TestSpillingRecordList:
+
+    @pytest.fixture(autouse=True)
+    def set_up(self):
+        inp = "id,name\n" + "".join(f"{i},name {i}\n" for i in range(500))
+        self.records = CSVParser.parse(
+            inp, CSVFormat.DEFAULT.with_first_record_as_header()
+        ).get_records()
+
+    def test_spill_and_reload(self):
+        with SpillingRecordList(max_bytes=2000, batch_size=20) as records:
+            records.extend(self.records)
+            assert len(records) == 500
+            assert records.get_spilled_batch_count() > 0
+            assert records.get_size() <= 2000 + 20 * 1000
+            assert [r.to_list() for r in records] == [r.to_list() for r in self.records]
+            assert records[3].get("name") == "name 3"
+            assert records[3].mapping is records[499].mapping
+            assert [r.get("id") for r in records[10:13]] == ["10", "11", "12"]
+            assert records[-1].get_character_position() == \
+                self.records[-1].get_character_position()
+            with pytest.raises(IndexError):
+                records[500]
+
+    def test_append_after_read(self):
+        with SpillingRecordList(max_bytes=0, batch_size=8) as records:
+            for i, record in enumerate(self.records[:20]):
+                records.append(record)
+                # Loading an earlier batch must not drop the batch being filled
+                assert records[i // 2].get("id") == str(i // 2)
+                assert records[i].get("id") == str(i)
+            assert len(records) == 20
+            assert [r.get("id") for r in records] == [str(i) for i in range(20)]
+            assert records[10].get("id") == "10"
+            assert records[11].get("id") == "11"
+
+    def test_within_budget(self):
+        records = SpillingRecordList(batch_size=20)
+        records.extend(self.records)
+        assert records.get_spilled_batch_count() == 0
+        assert records.file is None
+        assert records.index(records[42]) == 42
+
+    def test_close(self):
+        records = SpillingRecordList(max_bytes=0, batch_size=10)
+        records.extend(self.records)
+        spill_file = records.file
+        records.close()
+        assert spill_file.closed
+        with pytest.raises(ValueError):
+            records[0]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            SpillingRecordList(max_bytes=-1)
+        with pytest.raises(ValueError):
+            SpillingRecordList(batch_size=0)
@@ -0,0 +1,84 @@
+import pytest
+from main.python import vectorized_lexer
+from main.python.csv_format import CSVFormat
+from main.python.csv_parser import CSVParser
+from main.python.lexer import Lexer
+from main.python.parse_engine import ParseEngine
+from main.python.vectorized_lexer import VectorizedLexer
+
+
+class TestVectorizedLexer:
+
+    INPUTS = [
+        "a,b,c\n1,2,3\r\n\"x\ny\",\"q\"\"r\",z\r\n\n\nlast,row",
+        "\"\",\"\"\n,\n",
+        "a,b,",
+        "a\rb\r\rc",
+        "é,ü\n\"€\",\"\U0001F600\"\n",
+        "",
+    ]
+
+    FORMATS = [
+        CSVFormat.DEFAULT,
+        CSVFormat.EXCEL,
+        CSVFormat.RFC4180.with_header("A", "B", "C"),
+        CSVFormat.EXCEL.with_trailing_delimiter().with_trim().with_null_string(""),
+        CSVFormat.DEFAULT.with_quote(None).with_delimiter("\t"),
+    ]
+
+    def describe(self, parser):
+        result = [
+            (r.values(), r.get_record_number(), r.get_character_position())
+            for r in parser
+        ]
+        result.append((parser.get_header_map(), parser.get_first_end_of_line(),
+                       parser.get_current_line_number()))
+        return result
+
+    def test_matches_lexer(self):
+        pytest.importorskip("numpy")
+        for inp in self.INPUTS:
+            for format in self.FORMATS:
+                expected = self.describe(CSVParser.parse(inp, format))
+                parser = CSVParser.parse(inp, format.with_engine(ParseEngine.NUMPY))
+                assert isinstance(parser.lexer, VectorizedLexer)
+                assert self.describe(parser) == expected
+
+    def test_header(self):
+        pytest.importorskip("numpy")
+        format = CSVFormat.DEFAULT.with_first_record_as_header()
+        inp = self.INPUTS[0]
+        expected = self.describe(CSVParser.parse(inp, format))
+        parser = CSVParser.parse(inp, format.with_engine(ParseEngine.NUMPY))
+        assert self.describe(parser) == expected
+        assert parser.get_header_map() == {"a": 0, "b": 1, "c": 2}
+
+    @pytest.mark.parametrize("inp", ["x,\"a\"b\n", "x,a\"b\n", "\"open\n", "a,\"b\" ,c\n"])
+    def test_falls_back_for_lexer_rules(self, inp):
+        pytest.importorskip("numpy")
+        format = CSVFormat.DEFAULT.with_engine(ParseEngine.NUMPY)
+        parser = CSVParser.parse(inp, format)
+        assert isinstance(parser.lexer, Lexer)
+
+    def test_falls_back_for_field_limit(self):
+        pytest.importorskip("numpy")
+        format = CSVFormat.DEFAULT.with_engine(ParseEngine.NUMPY).with_max_field_size(3)
+        assert isinstance(CSVParser.parse("a,bcd\n", format).lexer, VectorizedLexer)
+        parser = CSVParser.parse("a,bcde\n", format)
+        assert isinstance(parser.lexer, Lexer)
+        with pytest.raises(IOError, match="field exceeds"):
+            parser.get_records()
+
+    def test_unsupported_formats(self):
+        for format in (CSVFormat.MYSQL, CSVFormat.TDF,
+                       CSVFormat.DEFAULT.with_comment_marker("#")):
+            parser = CSVParser.parse("a\n", format.with_engine(ParseEngine.NUMPY))
+            assert isinstance(parser.lexer, Lexer)
+            assert not VectorizedLexer.is_supported(format)
+
+    def test_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(vectorized_lexer, "np", None)
+        format = CSVFormat.DEFAULT.with_engine(ParseEngine.NUMPY)
+        parser = CSVParser.parse("a,b\n1,2\n", format)
+        assert isinstance(parser.lexer, Lexer)
+        assert [r.values() for r in parser] == [["a", "b"], ["1", "2"]]